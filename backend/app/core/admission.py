@@ -0,0 +1,105 @@
+"""Adaptive concurrency limits per endpoint class.
+
+Each class (llm, external, bulk, db) has its own AIMD limit: the limit
+grows by about one request per limit's worth of fast completions and is cut
+multiplicatively when requests run slower than the class latency target or
+fail. Requests over the limit are rejected straight away so a saturated
+class can't make the others queue behind it.
+
+Latency is measured to the start of the response, so a streamed export is
+judged on how quickly it started rather than how long the client took to
+download it. Uploads and batch syncs spend most of their time receiving
+the request body and get the bulk class's longer target.
+"""
+import math
+import time
+from typing import Dict, Optional
+from app.core.config import settings
+from app.core.metrics import registry
+
+admission_limit = registry.gauge("admission_limit", "Current concurrency limit", ["endpoint_class"])
+admission_in_flight = registry.gauge("admission_in_flight", "Admitted requests in flight", ["endpoint_class"])
+admission_rejected = registry.counter("admission_rejected_total", "Requests shed with 503", ["endpoint_class"])
+
+# Matched in order; paths not listed are not limited
+ENDPOINT_CLASSES = [
+    ("/api/chat/message", "llm"),
+    ("/api/weather", "external"),
+    ("/api/dashboard", "external"),
+    ("/api/export/", "bulk"),
+    ("/api/media/", "bulk"),
+    ("/api/farm/activities/batch", "bulk"),
+    ("/api/", "db"),
+]
+
+def classify(path: str) -> Optional[str]:
+    for prefix, endpoint_class in ENDPOINT_CLASSES:
+        if path.startswith(prefix):
+            return endpoint_class
+    return None
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit driven by observed latency"""
+
+    def __init__(self, name: str, initial: int, min_limit: int, max_limit: int,
+                 target_latency: float, backoff: float = 0.75):
+        self.name = name
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.target_latency = target_latency
+        self.backoff = backoff
+        self.in_flight = 0
+        self.avg_latency = target_latency / 2
+        self._last_decrease = 0.0
+        admission_limit.set(int(self.limit), endpoint_class=name)
+
+    def try_acquire(self) -> bool:
+        if self.in_flight >= int(self.limit):
+            admission_rejected.inc(endpoint_class=self.name)
+            return False
+        self.in_flight += 1
+        admission_in_flight.set(self.in_flight, endpoint_class=self.name)
+        return True
+
+    def release(self, latency: float, failed: bool = False):
+        self.in_flight -= 1
+        admission_in_flight.set(self.in_flight, endpoint_class=self.name)
+        self.avg_latency += 0.1 * (latency - self.avg_latency)
+
+        now = time.monotonic()
+        if failed or latency > self.target_latency:
+            # Back off at most once per target interval so one slow burst doesn't collapse the limit
+            if now - self._last_decrease >= self.target_latency:
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                self._last_decrease = now
+        else:
+            # Recover whenever requests meet the target, even if the class is quiet,
+            # so one slow spell doesn't leave the limit cut until the next burst
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        admission_limit.set(int(self.limit), endpoint_class=self.name)
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely to free up"""
+        return max(1, math.ceil(self.avg_latency))
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "avg_latency_ms": round(self.avg_latency * 1000, 1),
+            "target_latency_ms": round(self.target_latency * 1000, 1)
+        }
+
+def _limiter(name: str) -> AdaptiveLimiter:
+    prefix = f"ADMISSION_{name.upper()}"
+    return AdaptiveLimiter(
+        name,
+        initial=getattr(settings, f"{prefix}_INITIAL_LIMIT"),
+        min_limit=getattr(settings, f"{prefix}_MIN_LIMIT"),
+        max_limit=getattr(settings, f"{prefix}_MAX_LIMIT"),
+        target_latency=getattr(settings, f"{prefix}_TARGET_MS") / 1000
+    )
+
+# Global instances, one per endpoint class
+limiters: Dict[str, AdaptiveLimiter] = {name: _limiter(name) for name in ("llm", "external", "bulk", "db")}
@@ -0,0 +1,245 @@
+"""Pluggable cache with in-memory, SQLite (shared per host) and Redis backends.
+
+The backend is chosen by CACHE_URL:
+
+    memory://?max_entries=10000     per-process LRU
+    sqlite:///var/tmp/krishi.db     one file shared by every worker on the host
+    redis://localhost:6379/0        shared across hosts
+
+The shared backends store values as BSON, so they come back with the same types
+Mongo documents do and reading an entry never runs code, whoever wrote it.
+"""
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional
+from urllib.parse import urlparse, parse_qs
+from bson import encode, decode
+from app.core.config import settings
+from app.core.metrics import registry
+from app.core.registry import services
+
+logger = logging.getLogger(__name__)
+
+cache_requests = registry.counter("cache_requests_total", "Cache lookups by result", ["namespace", "result"])
+
+def _encode(value: Any) -> bytes:
+    # BSON documents need a top-level mapping
+    return encode({"v": value})
+
+def _decode(data: bytes) -> Any:
+    return decode(data)["v"]
+
+class CacheBackend:
+    """Interface shared by every backend; keys are strings, ttl is in seconds"""
+
+    async def get(self, key: str) -> Optional[Any]:
+        return (await self.get_many([key])).get(key)
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        await self.set_many({key: value}, ttl)
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    async def set_many(self, items: Dict[str, Any], ttl: Optional[float] = None):
+        raise NotImplementedError
+
+    async def delete(self, key: str):
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+class MemoryCache(CacheBackend):
+    """Per-process LRU with expiry"""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        now = time.monotonic()
+        found = {}
+        for key in keys:
+            entry = self._entries.get(key)
+            if entry is None:
+                continue
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= now:
+                del self._entries[key]
+                continue
+            self._entries.move_to_end(key)
+            found[key] = value
+        return found
+
+    async def set_many(self, items: Dict[str, Any], ttl: Optional[float] = None):
+        expires_at = time.monotonic() + ttl if ttl else None
+        for key, value in items.items():
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def delete(self, key: str):
+        self._entries.pop(key, None)
+
+class SQLiteCache(CacheBackend):
+    """File-backed cache every worker on a host can share.
+
+    WAL mode lets readers proceed while another worker writes; calls run in a
+    thread so disk I/O never blocks the event loop.
+    """
+
+    def __init__(self, path: str, purge_interval: float = 300):
+        self.path = path
+        self.purge_interval = purge_interval
+        self._last_purge = 0.0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB, expires_at REAL)"
+        )
+
+    def _get_many(self, keys: list) -> Dict[str, Any]:
+        now = time.time()
+        placeholders = ",".join("?" * len(keys))
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT key, value FROM cache WHERE key IN ({placeholders}) "
+                "AND (expires_at IS NULL OR expires_at > ?)",
+                (*keys, now)
+            ).fetchall()
+        return {key: _decode(value) for key, value in rows}
+
+    def _set_many(self, items: Dict[str, Any], ttl: Optional[float]):
+        now = time.time()
+        expires_at = now + ttl if ttl else None
+        rows = [(key, _encode(value), expires_at) for key, value in items.items()]
+        with self._lock:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)", rows
+            )
+            if now - self._last_purge > self.purge_interval:
+                self._connection.execute("DELETE FROM cache WHERE expires_at <= ?", (now,))
+                self._last_purge = now
+
+    def _delete(self, key: str):
+        with self._lock:
+            self._connection.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        keys = list(keys)
+        if not keys:
+            return {}
+        return await asyncio.to_thread(self._get_many, keys)
+
+    async def set_many(self, items: Dict[str, Any], ttl: Optional[float] = None):
+        if items:
+            await asyncio.to_thread(self._set_many, items, ttl)
+
+    async def delete(self, key: str):
+        await asyncio.to_thread(self._delete, key)
+
+    async def close(self):
+        with self._lock:
+            self._connection.close()
+
+class RedisCache(CacheBackend):
+    """Redis-protocol backend (Redis, Valkey, KeyDB...)"""
+
+    def __init__(self, url: str):
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise RuntimeError("The redis package is required for redis:// cache URLs")
+        self._client = redis.Redis.from_url(url)
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        keys = list(keys)
+        if not keys:
+            return {}
+        values = await self._client.mget(keys)
+        return {key: _decode(value) for key, value in zip(keys, values) if value is not None}
+
+    async def set_many(self, items: Dict[str, Any], ttl: Optional[float] = None):
+        if not items:
+            return
+        async with self._client.pipeline(transaction=False) as pipe:
+            for key, value in items.items():
+                pipe.set(key, _encode(value), px=int(ttl * 1000) if ttl else None)
+            await pipe.execute()
+
+    async def delete(self, key: str):
+        await self._client.delete(key)
+
+    async def close(self):
+        await self._client.aclose()
+
+class NamespacedCache:
+    """View of the shared backend with a key prefix and a default TTL.
+
+    Backend errors are logged and treated as misses so an unavailable cache
+    only costs latency, never availability.
+    """
+
+    def __init__(self, backend: CacheBackend, namespace: str, ttl: Optional[float] = None):
+        self.backend = backend
+        self.prefix = f"{settings.CACHE_KEY_PREFIX}:{namespace}:"
+        self.namespace = namespace
+        self.ttl = ttl
+
+    async def get(self, key: str) -> Optional[Any]:
+        return (await self.get_many([key])).get(key)
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        await self.set_many({key: value}, ttl)
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        keys = list(keys)
+        try:
+            found = await self.backend.get_many([self.prefix + key for key in keys])
+        except Exception as e:
+            logger.warning(f"Cache read failed for {self.namespace}: {e}")
+            found = {}
+        result = {key: found[self.prefix + key] for key in keys if self.prefix + key in found}
+        cache_requests.inc(len(result), namespace=self.namespace, result="hit")
+        cache_requests.inc(len(keys) - len(result), namespace=self.namespace, result="miss")
+        return result
+
+    async def set_many(self, items: Dict[str, Any], ttl: Optional[float] = None):
+        try:
+            await self.backend.set_many(
+                {self.prefix + key: value for key, value in items.items()},
+                ttl if ttl is not None else self.ttl
+            )
+        except Exception as e:
+            logger.warning(f"Cache write failed for {self.namespace}: {e}")
+
+    async def delete(self, key: str):
+        try:
+            await self.backend.delete(self.prefix + key)
+        except Exception as e:
+            logger.warning(f"Cache delete failed for {self.namespace}: {e}")
+
+def create_cache_backend(url: str) -> CacheBackend:
+    parsed = urlparse(url)
+    if parsed.scheme == "memory":
+        options = parse_qs(parsed.query)
+        return MemoryCache(int(options.get("max_entries", [10000])[0]))
+    if parsed.scheme == "sqlite":
+        return SQLiteCache(parsed.path)
+    if parsed.scheme in ("redis", "rediss"):
+        return RedisCache(url)
+    raise ValueError(f"Unsupported cache URL: {url}")
+
+# Shared backend, created on first use
+cache_backend = services.register("cache", lambda: create_cache_backend(settings.CACHE_URL))
+
+def namespace(name: str, ttl: Optional[float] = None) -> NamespacedCache:
+    return NamespacedCache(cache_backend, name, ttl)
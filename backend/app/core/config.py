@@ -1,4 +1,4 @@
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from typing import List
 import os
 
@@ -9,9 +9,18 @@ class Settings(BaseSettings):
     
     # Database
     MONGODB_URI: str = os.getenv("MONGODB_URI", "mongodb://localhost:27017/krishi-sakhi")
+    MONGODB_MAX_POOL_SIZE: int = int(os.getenv("MONGODB_MAX_POOL_SIZE", 100))
+    MONGODB_MIN_POOL_SIZE: int = int(os.getenv("MONGODB_MIN_POOL_SIZE", 10))
+    MONGODB_MAX_IDLE_TIME_MS: int = int(os.getenv("MONGODB_MAX_IDLE_TIME_MS", 300000))
+    MONGODB_WAIT_QUEUE_TIMEOUT_MS: int = int(os.getenv("MONGODB_WAIT_QUEUE_TIMEOUT_MS", 5000))
+    MONGODB_SERVER_SELECTION_TIMEOUT_MS: int = int(os.getenv("MONGODB_SERVER_SELECTION_TIMEOUT_MS", 10000))
+    MONGODB_COMPRESSORS: str = os.getenv("MONGODB_COMPRESSORS", "zlib")
+    MONGODB_READ_PREFERENCE: str = os.getenv("MONGODB_READ_PREFERENCE", "primary")
+    CREATE_INDEXES_ON_STARTUP: bool = os.getenv("CREATE_INDEXES_ON_STARTUP", "true").lower() == "true"
     
     # Security
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-here")
+    ADMIN_API_KEY: str = os.getenv("ADMIN_API_KEY", "")
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     
@@ -27,16 +36,134 @@ class Settings(BaseSettings):
     IBM_API_KEY: str = os.getenv("IBM_API_KEY", "")
     IBM_PROJECT_ID: str = os.getenv("IBM_PROJECT_ID", "")
     IBM_API_URL: str = os.getenv("IBM_API_URL", "https://us-south.ml.cloud.ibm.com")
+    IBM_IAM_URL: str = os.getenv("IBM_IAM_URL", "https://iam.cloud.ibm.com/identity/token")
     
     # Amazon Translate
     AWS_ACCESS_KEY_ID: str = os.getenv("AWS_ACCESS_KEY_ID", "")
     AWS_SECRET_ACCESS_KEY: str = os.getenv("AWS_SECRET_ACCESS_KEY", "")
     AWS_REGION: str = os.getenv("AWS_REGION", "us-east-1")
+    AWS_TRANSLATE_ENDPOINT_URL: str = os.getenv("AWS_TRANSLATE_ENDPOINT_URL", "")
     
     # Weather API
     WEATHER_API_KEY: str = os.getenv("WEATHER_API_KEY", "")
-    
-    class Config:
-        env_file = ".env"
+    WEATHER_API_URL: str = os.getenv("WEATHER_API_URL", "https://api.openweathermap.org/data/2.5")
+
+    # Create all registered services at startup instead of on first use
+    PRELOAD_SERVICES: bool = os.getenv("PRELOAD_SERVICES", "false").lower() == "true"
+
+    # Responses smaller than this are sent uncompressed
+    GZIP_MINIMUM_SIZE: int = int(os.getenv("GZIP_MINIMUM_SIZE", 1000))
+    GZIP_COMPRESS_LEVEL: int = int(os.getenv("GZIP_COMPRESS_LEVEL", 6))
+
+    # Request tracing (Server-Timing header and slow trace buffer)
+    TRACING_ENABLED: bool = os.getenv("TRACING_ENABLED", "true").lower() == "true"
+    SERVER_TIMING_ENABLED: bool = os.getenv("SERVER_TIMING_ENABLED", "true").lower() == "true"
+    TRACE_SLOW_THRESHOLD_MS: float = float(os.getenv("TRACE_SLOW_THRESHOLD_MS", 2000))
+    TRACE_SAMPLE_RATE: float = float(os.getenv("TRACE_SAMPLE_RATE", 1.0))
+    TRACE_BUFFER_SIZE: int = int(os.getenv("TRACE_BUFFER_SIZE", 200))
+
+    # Cache (memory://, sqlite:///path or redis://host:port/db)
+    CACHE_URL: str = os.getenv("CACHE_URL", "memory://")
+    CACHE_KEY_PREFIX: str = os.getenv("CACHE_KEY_PREFIX", "krishi")
+    WEATHER_CACHE_TTL: int = int(os.getenv("WEATHER_CACHE_TTL", 600))
+    FORECAST_CACHE_TTL: int = int(os.getenv("FORECAST_CACHE_TTL", 1800))
+    TRANSLATION_CACHE_TTL: int = int(os.getenv("TRANSLATION_CACHE_TTL", 7 * 24 * 3600))
+    FARM_CACHE_TTL: int = int(os.getenv("FARM_CACHE_TTL", 300))
+
+    # Rate limiting (limits per route class, keyed on client IP)
+    RATE_LIMIT_STORAGE_URI: str = os.getenv("RATE_LIMIT_STORAGE_URI", "memory://")
+    RATE_LIMIT_STRATEGY: str = os.getenv("RATE_LIMIT_STRATEGY", "moving-window")
+    RATE_LIMIT_READ: str = os.getenv("RATE_LIMIT_READ", "30/minute")
+    RATE_LIMIT_WRITE: str = os.getenv("RATE_LIMIT_WRITE", "20/minute")
+    RATE_LIMIT_DELETE: str = os.getenv("RATE_LIMIT_DELETE", "10/minute")
+    RATE_LIMIT_HEAVY: str = os.getenv("RATE_LIMIT_HEAVY", "5/minute")
+    RATE_LIMIT_LLM: str = os.getenv("RATE_LIMIT_LLM", "20/minute")
+    RATE_LIMIT_EXTERNAL: str = os.getenv("RATE_LIMIT_EXTERNAL", "60/minute")
+
+    # Admission control: adaptive concurrency limits per endpoint class
+    ADMISSION_CONTROL_ENABLED: bool = os.getenv("ADMISSION_CONTROL_ENABLED", "true").lower() == "true"
+    ADMISSION_LLM_INITIAL_LIMIT: int = int(os.getenv("ADMISSION_LLM_INITIAL_LIMIT", 32))
+    ADMISSION_LLM_MIN_LIMIT: int = int(os.getenv("ADMISSION_LLM_MIN_LIMIT", 4))
+    ADMISSION_LLM_MAX_LIMIT: int = int(os.getenv("ADMISSION_LLM_MAX_LIMIT", 128))
+    ADMISSION_LLM_TARGET_MS: float = float(os.getenv("ADMISSION_LLM_TARGET_MS", 15000))
+    ADMISSION_EXTERNAL_INITIAL_LIMIT: int = int(os.getenv("ADMISSION_EXTERNAL_INITIAL_LIMIT", 64))
+    ADMISSION_EXTERNAL_MIN_LIMIT: int = int(os.getenv("ADMISSION_EXTERNAL_MIN_LIMIT", 8))
+    ADMISSION_EXTERNAL_MAX_LIMIT: int = int(os.getenv("ADMISSION_EXTERNAL_MAX_LIMIT", 256))
+    ADMISSION_EXTERNAL_TARGET_MS: float = float(os.getenv("ADMISSION_EXTERNAL_TARGET_MS", 3000))
+    ADMISSION_BULK_INITIAL_LIMIT: int = int(os.getenv("ADMISSION_BULK_INITIAL_LIMIT", 16))
+    ADMISSION_BULK_MIN_LIMIT: int = int(os.getenv("ADMISSION_BULK_MIN_LIMIT", 4))
+    ADMISSION_BULK_MAX_LIMIT: int = int(os.getenv("ADMISSION_BULK_MAX_LIMIT", 64))
+    ADMISSION_BULK_TARGET_MS: float = float(os.getenv("ADMISSION_BULK_TARGET_MS", 10000))
+    ADMISSION_DB_INITIAL_LIMIT: int = int(os.getenv("ADMISSION_DB_INITIAL_LIMIT", 128))
+    ADMISSION_DB_MIN_LIMIT: int = int(os.getenv("ADMISSION_DB_MIN_LIMIT", 16))
+    ADMISSION_DB_MAX_LIMIT: int = int(os.getenv("ADMISSION_DB_MAX_LIMIT", 512))
+    ADMISSION_DB_TARGET_MS: float = float(os.getenv("ADMISSION_DB_TARGET_MS", 500))
+
+    # Daily cohort digests (one LLM call per crop/soil/district cohort)
+    DIGEST_LANGUAGES: str = os.getenv("DIGEST_LANGUAGES", "en,ml")
+    DIGEST_MAX_AGE_DAYS: int = int(os.getenv("DIGEST_MAX_AGE_DAYS", 1))
+    DIGEST_RETENTION_DAYS: int = int(os.getenv("DIGEST_RETENTION_DAYS", 7))
+    DIGEST_CACHE_TTL: int = int(os.getenv("DIGEST_CACHE_TTL", 900))
+
+    # Dashboard (timeouts in seconds)
+    DASHBOARD_SECTIONS: str = os.getenv("DASHBOARD_SECTIONS", "profile,weather,forecast,alerts,activities")
+    DASHBOARD_SECTION_TIMEOUT: float = float(os.getenv("DASHBOARD_SECTION_TIMEOUT", 1.5))
+    DASHBOARD_EXTERNAL_TIMEOUT: float = float(os.getenv("DASHBOARD_EXTERNAL_TIMEOUT", 3.0))
+
+    # Image uploads, stored on local disk and served from MEDIA_URL
+    MEDIA_ROOT: str = os.getenv("MEDIA_ROOT", "media")
+    MEDIA_URL: str = os.getenv("MEDIA_URL", "/media")
+    MEDIA_MAX_UPLOAD_BYTES: int = int(os.getenv("MEDIA_MAX_UPLOAD_BYTES", 10 * 1024 * 1024))
+    MEDIA_MAX_PIXELS: int = int(os.getenv("MEDIA_MAX_PIXELS", 40_000_000))
+    MEDIA_MAX_DIMENSION: int = int(os.getenv("MEDIA_MAX_DIMENSION", 1600))
+    MEDIA_THUMBNAIL_DIMENSION: int = int(os.getenv("MEDIA_THUMBNAIL_DIMENSION", 320))
+    MEDIA_JPEG_QUALITY: int = int(os.getenv("MEDIA_JPEG_QUALITY", 82))
+    MEDIA_PROCESS_WORKERS: int = int(os.getenv("MEDIA_PROCESS_WORKERS", 2))
+
+    # Advisory knowledge base answering common questions without the LLM
+    ADVISORY_ENABLED: bool = os.getenv("ADVISORY_ENABLED", "true").lower() == "true"
+    ADVISORY_DATA_PATH: str = os.getenv("ADVISORY_DATA_PATH", "")
+    ADVISORY_DIRECT_THRESHOLD: float = float(os.getenv("ADVISORY_DIRECT_THRESHOLD", 0.75))
+    ADVISORY_GROUNDING_THRESHOLD: float = float(os.getenv("ADVISORY_GROUNDING_THRESHOLD", 0.35))
+    ADVISORY_GROUNDING_CHARS: int = int(os.getenv("ADVISORY_GROUNDING_CHARS", 400))
+
+    # Retention: soft-deleted and cold documents are moved to compressed archive batches
+    ARCHIVE_DELETED_AFTER_DAYS: int = int(os.getenv("ARCHIVE_DELETED_AFTER_DAYS", 30))
+    ARCHIVE_CHAT_COLD_DAYS: int = int(os.getenv("ARCHIVE_CHAT_COLD_DAYS", 180))
+    ARCHIVE_BATCH_SIZE: int = int(os.getenv("ARCHIVE_BATCH_SIZE", 500))
+    ARCHIVE_COMPRESSION_LEVEL: int = int(os.getenv("ARCHIVE_COMPRESSION_LEVEL", 9))
+
+    # Event loop monitoring; a non-zero budget turns on test mode (asyncio debug)
+    LOOP_MONITOR_ENABLED: bool = os.getenv("LOOP_MONITOR_ENABLED", "true").lower() == "true"
+    LOOP_MONITOR_INTERVAL_MS: int = int(os.getenv("LOOP_MONITOR_INTERVAL_MS", 50))
+    LOOP_BLOCK_THRESHOLD_MS: int = int(os.getenv("LOOP_BLOCK_THRESHOLD_MS", 200))
+    LOOP_BLOCK_LOG_INTERVAL: int = int(os.getenv("LOOP_BLOCK_LOG_INTERVAL", 60))
+    LOOP_LAG_WINDOW: int = int(os.getenv("LOOP_LAG_WINDOW", 1200))
+    LOOP_BLOCK_BUDGET_MS: int = int(os.getenv("LOOP_BLOCK_BUDGET_MS", 0))
+
+    # Profiling (admin only)
+    PROFILER_ENABLED: bool = os.getenv("PROFILER_ENABLED", "true").lower() == "true"
+    PROFILER_MAX_SECONDS: int = int(os.getenv("PROFILER_MAX_SECONDS", 60))
+    REQUEST_PROFILING_ENABLED: bool = os.getenv("REQUEST_PROFILING_ENABLED", "true").lower() == "true"
+    REQUEST_PROFILE_BUFFER_SIZE: int = int(os.getenv("REQUEST_PROFILE_BUFFER_SIZE", 20))
+    REQUEST_PROFILE_TOP_FUNCTIONS: int = int(os.getenv("REQUEST_PROFILE_TOP_FUNCTIONS", 60))
+
+    # Activity rollup rebuilds replace this many rollups per bulk write
+    ROLLUP_REBUILD_BATCH_SIZE: int = int(os.getenv("ROLLUP_REBUILD_BATCH_SIZE", 500))
+
+    # Exports
+    EXPORT_BATCH_SIZE: int = int(os.getenv("EXPORT_BATCH_SIZE", 500))
+
+    # Idempotency-Key handling for chat messages (seconds)
+    IDEMPOTENCY_TTL: int = int(os.getenv("IDEMPOTENCY_TTL", 24 * 3600))
+    IDEMPOTENCY_WAIT_TIMEOUT: float = float(os.getenv("IDEMPOTENCY_WAIT_TIMEOUT", 60))
+    IDEMPOTENCY_LOCK_TIMEOUT: float = float(os.getenv("IDEMPOTENCY_LOCK_TIMEOUT", 180))
+    IDEMPOTENCY_POLL_INTERVAL: float = float(os.getenv("IDEMPOTENCY_POLL_INTERVAL", 0.25))
+
+    # LLM fair scheduling
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", 8))
+
+    # .env may carry variables for other tools (e.g. Cloudinary), so ignore unknown keys
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
 settings = Settings()
\ No newline at end of file
@@ -0,0 +1,133 @@
+import threading
+import time
+from typing import Dict, Any, Tuple
+from pymongo import monitoring
+from app.core.metrics import registry
+
+# Pool checkouts are normally sub-millisecond; waits show up in the upper buckets
+CHECKOUT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+class MongoMetricsListener(monitoring.CommandListener, monitoring.ConnectionPoolListener):
+    """Collect pool checkout waits and per-command latency from pymongo events"""
+
+    def __init__(self):
+        self.checkout_wait = registry.histogram(
+            "mongodb_pool_checkout_wait_seconds",
+            "Time spent waiting for a pooled MongoDB connection",
+            buckets=CHECKOUT_BUCKETS
+        ).labels()
+        self.commands = registry.histogram(
+            "mongodb_command_duration_seconds",
+            "MongoDB command latency",
+            ["collection", "operation"]
+        )
+        self.connections_gauge = registry.gauge(
+            "mongodb_pool_connections",
+            "Pooled MongoDB connections",
+            ["state"]
+        )
+        registry.add_collector(self._collect)
+        self.command_failures = 0
+        self.checkout_failures = 0
+        self.connections_open = 0
+        self.connections_checked_out = 0
+        self._started: Dict[Tuple[int, Any], Tuple[str, str]] = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    # Command events
+
+    def started(self, event):
+        collection = event.command.get(event.command_name)
+        if not isinstance(collection, str):
+            # getMore and a few others name the collection separately
+            collection = event.command.get("collection", event.database_name)
+        with self._lock:
+            self._started[(event.request_id, event.connection_id)] = (collection, event.command_name)
+
+    def succeeded(self, event):
+        self._finish(event)
+
+    def failed(self, event):
+        self._finish(event)
+        with self._lock:
+            self.command_failures += 1
+
+    def _finish(self, event):
+        with self._lock:
+            key = self._started.pop((event.request_id, event.connection_id), None)
+        if key is None:
+            return
+        collection, operation = key
+        self.commands.observe(event.duration_micros / 1_000_000, collection=collection, operation=operation)
+
+    # Connection pool events
+
+    def connection_check_out_started(self, event):
+        # Motor runs each operation on one executor thread, so a thread-local pairs the events
+        self._local.checkout_started = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        started = getattr(self._local, "checkout_started", None)
+        if started is not None:
+            self.checkout_wait.observe(time.perf_counter() - started)
+            self._local.checkout_started = None
+        with self._lock:
+            self.connections_checked_out += 1
+
+    def connection_check_out_failed(self, event):
+        self._local.checkout_started = None
+        with self._lock:
+            self.checkout_failures += 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.connections_checked_out -= 1
+
+    def connection_created(self, event):
+        with self._lock:
+            self.connections_open += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.connections_open -= 1
+
+    def connection_ready(self, event):
+        pass
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def _collect(self):
+        with self._lock:
+            self.connections_gauge.set(self.connections_open, state="open")
+            self.connections_gauge.set(self.connections_checked_out, state="checked_out")
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            pool = {
+                "connections_open": self.connections_open,
+                "connections_checked_out": self.connections_checked_out,
+                "checkout_failures": self.checkout_failures
+            }
+            command_failures = self.command_failures
+        return {
+            "pool": {**pool, "checkout_wait": self.checkout_wait.snapshot()},
+            "commands": {
+                f"{collection}.{operation}": histogram.snapshot()
+                for (collection, operation), histogram in self.commands.items()
+            },
+            "command_failures": command_failures
+        }
+
+# Global instance registered on the Motor client
+mongo_metrics = MongoMetricsListener()
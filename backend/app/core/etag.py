@@ -0,0 +1,63 @@
+"""Strong ETags and conditional GET for read endpoints.
+
+Two ways to derive a tag:
+
+- version tags hash a cheap version lookup (e.g. the latest ``updated_at``)
+  together with the request parameters, so a matching If-None-Match can be
+  answered before the full query runs;
+- content tags hash the serialized body, for data without a stored version
+  (weather, chat history). They still save the transfer, not the work.
+"""
+import hashlib
+from typing import Any, Optional
+from fastapi import Request
+from fastapi.responses import Response
+from app.core.responses import MongoJSONResponse, dumps
+
+# Clients may keep a copy but must revalidate before every use
+CACHE_CONTROL = "private, no-cache"
+
+def make_etag(*parts: Any) -> str:
+    """Strong ETag from the parts that identify a representation"""
+    digest = hashlib.sha1(dumps(parts)).hexdigest()
+    return f'"{digest}"'
+
+def content_etag(body: bytes) -> str:
+    return f'"{hashlib.sha1(body).hexdigest()}"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True if If-None-Match lists this tag (weak comparison, as RFC 9110 requires)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+def conditional_response(request: Request, content: Any, etag: Optional[str] = None) -> Response:
+    """Respond with content tagged by etag, or 304 if the client already has it.
+
+    Without an etag the tag is a hash of the serialized body.
+    """
+    if etag is None:
+        body = dumps(content)
+        etag = content_etag(body)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        return Response(
+            body,
+            media_type="application/json",
+            headers={"ETag": etag, "Cache-Control": CACHE_CONTROL}
+        )
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return MongoJSONResponse(content, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
@@ -0,0 +1,207 @@
+"""Event loop lag monitoring and blocking-call detection.
+
+A task on the loop sleeps for a fixed interval and records how late it wakes
+up: that lag is time every other request on the worker also waited. A
+watchdog thread notices when the loop has stopped ticking for longer than
+LOOP_BLOCK_THRESHOLD_MS and logs the loop thread's stack at that moment,
+which points at the blocking call.
+
+Test mode (LOOP_BLOCK_BUDGET_MS > 0) uses asyncio debug mode to record every
+callback that runs longer than the budget; a test suite can fail on them:
+
+    @pytest.fixture(autouse=True)
+    def no_blocking_calls():
+        yield
+        loop_monitor.assert_within_budget()
+"""
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from app.core.config import settings
+from app.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+loop_lag = registry.histogram(
+    "event_loop_lag_seconds",
+    "How late the event loop ran a scheduled callback",
+    buckets=LAG_BUCKETS
+).labels()
+loop_lag_recent = registry.gauge(
+    "event_loop_lag_recent_seconds",
+    "Event loop lag percentiles over the recent window",
+    ["quantile"]
+)
+loop_blocked = registry.counter(
+    "event_loop_blocked_total",
+    "Times the event loop stopped ticking for longer than the block threshold"
+)
+
+class LoopBlockedError(AssertionError):
+    """Raised in test mode when callbacks exceeded the blocking budget"""
+
+class _SlowCallbackHandler(logging.Handler):
+    """Collects asyncio debug mode's "Executing <handle> took N seconds" warnings"""
+
+    def __init__(self, monitor: "LoopMonitor"):
+        super().__init__(logging.WARNING)
+        self.monitor = monitor
+
+    def emit(self, record: logging.LogRecord):
+        message = record.getMessage()
+        if message.startswith("Executing "):
+            with self.monitor._lock:
+                self.monitor.violations.append(message)
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+class LoopMonitor:
+    def __init__(self, interval: float, threshold: float, log_interval: float, window: int):
+        self.interval = interval
+        self.threshold = threshold
+        self.log_interval = log_interval
+        self.recent: deque = deque(maxlen=window)
+        self.blocks = 0
+        self.last_block: Optional[Dict[str, Any]] = None
+        self.violations: List[str] = []
+        self.budget_ms: Optional[float] = None
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._last_log = 0.0
+        self._suppressed = 0
+        self._lock = threading.Lock()
+        registry.add_collector(self._collect)
+
+    def start(self):
+        """Start monitoring the running loop; call from a startup hook"""
+        loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop.clear()
+        self._task = loop.create_task(self._measure())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+        if settings.LOOP_BLOCK_BUDGET_MS:
+            self.enforce_budget(loop, settings.LOOP_BLOCK_BUDGET_MS)
+
+    async def stop(self):
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _measure(self):
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - start - self.interval)
+            self._heartbeat = now
+            loop_lag.observe(lag)
+            self.recent.append(lag)
+
+    def _watch(self):
+        reported = None
+        while not self._stop.wait(min(self.threshold / 2, 1.0)):
+            heartbeat = self._heartbeat
+            stalled = time.monotonic() - heartbeat - self.interval
+            # Report each stall once, while it is still happening
+            if stalled < self.threshold or heartbeat == reported:
+                continue
+            reported = heartbeat
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame is not None else "<unavailable>\n"
+            del frame
+            self._report(stalled, stack)
+
+    def _report(self, stalled: float, stack: str):
+        loop_blocked.inc()
+        now = time.monotonic()
+        with self._lock:
+            self.blocks += 1
+            self.last_block = {
+                "detected_at": datetime.utcnow(),
+                "blocked_ms": round(stalled * 1000, 1),
+                "stack": stack
+            }
+            if now - self._last_log < self.log_interval:
+                self._suppressed += 1
+                return
+            suppressed, self._suppressed = self._suppressed, 0
+            self._last_log = now
+
+        note = f" ({suppressed} similar reports suppressed)" if suppressed else ""
+        logger.warning(
+            f"Event loop blocked for at least {stalled * 1000:.0f} ms{note}; loop thread stack:\n{stack}"
+        )
+
+    def enforce_budget(self, loop: asyncio.AbstractEventLoop, budget_ms: float):
+        """Test mode: record every callback running longer than budget_ms"""
+        self.budget_ms = budget_ms
+        loop.set_debug(True)
+        loop.slow_callback_duration = budget_ms / 1000
+        asyncio_logger = logging.getLogger("asyncio")
+        if not any(isinstance(handler, _SlowCallbackHandler) for handler in asyncio_logger.handlers):
+            asyncio_logger.addHandler(_SlowCallbackHandler(self))
+
+    def assert_within_budget(self):
+        """Raise LoopBlockedError if any callback exceeded the budget since the last check"""
+        with self._lock:
+            violations, self.violations = self.violations, []
+        if violations:
+            raise LoopBlockedError(
+                f"{len(violations)} callbacks blocked the event loop for more than "
+                f"{self.budget_ms:g} ms:\n" + "\n".join(violations)
+            )
+
+    def _collect(self):
+        recent = list(self.recent)
+        for name, q in (("0.5", 0.50), ("0.95", 0.95), ("0.99", 0.99), ("1", 1.0)):
+            loop_lag_recent.set(percentile(recent, q), quantile=name)
+
+    def snapshot(self) -> Dict[str, Any]:
+        recent = list(self.recent)
+        lifetime = loop_lag.snapshot()
+        with self._lock:
+            last_block = self.last_block
+            blocks = self.blocks
+        return {
+            "running": self._task is not None,
+            "interval_ms": self.interval * 1000,
+            "threshold_ms": self.threshold * 1000,
+            "window_samples": len(recent),
+            "lag_ms": {
+                name: round(percentile(recent, q) * 1000, 2)
+                for name, q in (("p50", 0.50), ("p95", 0.95), ("p99", 0.99), ("max", 1.0))
+            },
+            "lifetime_lag_ms": {key: round(lifetime[key] * 1000, 2) for key in ("mean", "p95", "p99", "max")},
+            "blocks": blocks,
+            "last_block": last_block
+        }
+
+# Global instance, started by the app on startup
+loop_monitor = LoopMonitor(
+    settings.LOOP_MONITOR_INTERVAL_MS / 1000,
+    settings.LOOP_BLOCK_THRESHOLD_MS / 1000,
+    settings.LOOP_BLOCK_LOG_INTERVAL,
+    settings.LOOP_LAG_WINDOW
+)
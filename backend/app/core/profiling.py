@@ -0,0 +1,174 @@
+"""On-demand profiling for running workers.
+
+SamplingProfiler periodically records the Python stack of the event loop
+thread (or every thread) from a background thread, so it can run under
+production traffic with low overhead. Results are rendered as collapsed
+stacks (flamegraph.pl, speedscope, inferno) or as a speedscope JSON file.
+
+RequestProfiles keeps recent per-request cProfile reports produced by
+ProfilingMiddleware (app.middleware.profiling).
+"""
+import io
+import itertools
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from app.core.config import settings
+
+Frame = Tuple[str, str, int]
+
+class ProfilerBusy(Exception):
+    """Another profile is already running in this worker"""
+
+def _is_idle(stack: Tuple[Frame, ...]) -> bool:
+    # An idle event loop sits in its selector waiting for I/O
+    name, filename, _ = stack[-1]
+    return filename.endswith("selectors.py") and name in ("select", "poll")
+
+class Profile:
+    def __init__(self, interval: float, started_at: datetime):
+        self.interval = interval
+        self.started_at = started_at
+        self.duration = 0.0
+        self.samples = 0
+        self.stacks: Counter = Counter()
+
+    def collapsed(self) -> str:
+        """One line per distinct stack: root;...;leaf <count>"""
+        lines = []
+        for stack, count in self.stacks.most_common():
+            frames = ";".join(f"{name} ({os.path.basename(filename)}:{line})" for name, filename, line in stack)
+            lines.append(f"{frames} {count}")
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self, name: str) -> Dict[str, Any]:
+        """Speedscope file format, one weighted sample per distinct stack"""
+        frames: Dict[Frame, int] = {}
+        samples, weights = [], []
+        # Sleeping and GIL waits stretch the interval; weight by the observed sampling period
+        period = self.duration / self.samples if self.samples else self.interval
+        for stack, count in self.stacks.most_common():
+            samples.append([frames.setdefault(frame, len(frames)) for frame in stack])
+            weights.append(round(count * period * 1000, 3))
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "krishi-sakhi",
+            "activeProfileIndex": 0,
+            "shared": {
+                "frames": [
+                    {"name": function, "file": filename, "line": line} for function, filename, line in frames
+                ]
+            },
+            "profiles": [{
+                "type": "sampled",
+                "name": name,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": round(sum(weights), 3),
+                "samples": samples,
+                "weights": weights
+            }]
+        }
+
+class SamplingProfiler:
+    """Samples thread stacks via sys._current_frames; one profile at a time per worker"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    def _stack(self, frame) -> Tuple[Frame, ...]:
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append((code.co_name, code.co_filename, frame.f_lineno))
+            frame = frame.f_back
+        stack.reverse()
+        return tuple(stack)
+
+    def run(self, seconds: float, interval: float, thread_id: Optional[int] = None,
+            include_idle: bool = False) -> Profile:
+        """Sample for the given time; blocks, so call it off the event loop.
+
+        With thread_id only that thread is sampled, otherwise every thread
+        but the sampler itself, each stack rooted at its thread name.
+        """
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusy()
+        try:
+            own_id = threading.get_ident()
+            profile = Profile(interval, datetime.utcnow())
+            start = time.perf_counter()
+            deadline = start + seconds
+            while time.perf_counter() < deadline:
+                frames = sys._current_frames()
+                if thread_id is not None:
+                    targets = {thread_id: frames.get(thread_id)}
+                else:
+                    targets = {ident: frame for ident, frame in frames.items() if ident != own_id}
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+                for ident, frame in targets.items():
+                    if frame is None:
+                        continue
+                    stack = self._stack(frame)
+                    if not include_idle and _is_idle(stack):
+                        continue
+                    if thread_id is None:
+                        stack = ((names.get(ident, str(ident)), "<thread>", 0),) + stack
+                    profile.stacks[stack] += 1
+                profile.samples += 1
+                del frames, targets
+                time.sleep(interval)
+            profile.duration = time.perf_counter() - start
+            return profile
+        finally:
+            self._lock.release()
+
+class RequestProfiles:
+    """Most recent per-request cProfile reports, by id"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._profiles: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def add(self, method: str, path: str, duration: float, profiler) -> int:
+        output = io.StringIO()
+        stats = pstats.Stats(profiler, stream=output)
+        stats.sort_stats("cumulative").print_stats(settings.REQUEST_PROFILE_TOP_FUNCTIONS)
+        with self._lock:
+            profile_id = next(self._ids)
+            self._profiles[profile_id] = {
+                "id": profile_id,
+                "method": method,
+                "path": path,
+                "created_at": datetime.utcnow(),
+                "duration_ms": round(duration * 1000, 2),
+                "report": output.getvalue()
+            }
+            while len(self._profiles) > self.capacity:
+                self._profiles.popitem(last=False)
+        return profile_id
+
+    def get(self, profile_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+    def list(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            profiles = list(self._profiles.values())
+        return [{key: value for key, value in profile.items() if key != "report"} for profile in reversed(profiles)]
+
+# Global instances
+sampling_profiler = SamplingProfiler()
+request_profiles = RequestProfiles(settings.REQUEST_PROFILE_BUFFER_SIZE)
@@ -0,0 +1,21 @@
+from typing import Dict, Optional, Sequence
+
+def build_projection(
+    fields: Optional[str],
+    allowed: Sequence[str],
+    default: Sequence[str],
+    prefix: str = ""
+) -> Dict[str, int]:
+    """Turn a comma-separated fields selector into a Mongo projection.
+
+    Raises ValueError if any requested field is not in the allow-list.
+    """
+    if fields:
+        selected = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = [field for field in selected if field not in allowed]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    else:
+        selected = default
+
+    return {f"{prefix}{field}": 1 for field in selected}
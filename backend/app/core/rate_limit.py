@@ -0,0 +1,25 @@
+from fastapi import Request
+from slowapi import Limiter
+from slowapi.util import get_remote_address
+from app.core.config import settings
+
+def get_rate_limit_key(request: Request) -> str:
+    """Key rate limits on the client IP"""
+    # X-User-Id is client-supplied and unauthenticated, so keying on it would let a
+    # caller reset its limits by rotating the header
+    return f"ip:{get_remote_address(request)}"
+
+# Single limiter shared by the app and every router
+limiter = Limiter(
+    key_func=get_rate_limit_key,
+    strategy=settings.RATE_LIMIT_STRATEGY,
+    storage_uri=settings.RATE_LIMIT_STORAGE_URI
+)
+
+# Limits per route class
+READ_LIMIT = settings.RATE_LIMIT_READ
+WRITE_LIMIT = settings.RATE_LIMIT_WRITE
+DELETE_LIMIT = settings.RATE_LIMIT_DELETE
+HEAVY_LIMIT = settings.RATE_LIMIT_HEAVY
+LLM_LIMIT = settings.RATE_LIMIT_LLM
+EXTERNAL_LIMIT = settings.RATE_LIMIT_EXTERNAL
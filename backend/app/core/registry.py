@@ -0,0 +1,51 @@
+import threading
+from typing import Any, Callable, Dict
+
+class ServiceRegistry:
+    """Create global services on first use instead of at import time"""
+
+    def __init__(self):
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, factory: Callable[[], Any]) -> "LazyService":
+        self._factories[name] = factory
+        return LazyService(self, name)
+
+    def get(self, name: str) -> Any:
+        instance = self._instances.get(name)
+        if instance is None:
+            with self._lock:
+                instance = self._instances.get(name)
+                if instance is None:
+                    instance = self._instances[name] = self._factories[name]()
+        return instance
+
+    def initialize(self, *names: str):
+        """Create services ahead of first use, e.g. from the startup hook"""
+        for name in names or list(self._factories):
+            self.get(name)
+
+    def is_initialized(self, name: str) -> bool:
+        return name in self._instances
+
+class LazyService:
+    """Stand-in for a registered service that resolves it on attribute access"""
+
+    def __init__(self, registry: ServiceRegistry, name: str):
+        object.__setattr__(self, "_registry", registry)
+        object.__setattr__(self, "_name", name)
+
+    def __getattr__(self, attribute: str) -> Any:
+        return getattr(self._registry.get(self._name), attribute)
+
+    def __setattr__(self, attribute: str, value: Any):
+        setattr(self._registry.get(self._name), attribute, value)
+
+    def __repr__(self) -> str:
+        state = "initialized" if self._registry.is_initialized(self._name) else "lazy"
+        return f"<LazyService {self._name} ({state})>"
+
+# Global registry
+services = ServiceRegistry()
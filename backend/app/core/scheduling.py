@@ -0,0 +1,80 @@
+import asyncio
+import heapq
+import itertools
+from contextlib import asynccontextmanager
+from typing import Dict, List, Tuple
+from app.core.config import settings
+from app.core.tracing import span
+
+class FairScheduler:
+    """Weighted fair queuing for a fixed number of concurrent slots.
+
+    Each waiter is tagged with a virtual finish time based on how much work
+    its key has already been granted, so a client flooding the queue only
+    delays its own requests while other keys keep getting slots.
+    """
+
+    def __init__(self, max_concurrency: int):
+        self.max_concurrency = max(1, max_concurrency)
+        self.active = 0
+        self._virtual_time = 0.0
+        self._finish_tags: Dict[str, float] = {}
+        self._waiters: List[Tuple[float, int, asyncio.Future]] = []
+        self._counter = itertools.count()
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for _, _, future in self._waiters if not future.done())
+
+    @asynccontextmanager
+    async def slot(self, key: str, weight: float = 1.0, cost: float = 1.0):
+        """Hold one slot for the duration of the block"""
+        with span("llm_queue"):
+            await self._acquire(key, weight, cost)
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def _acquire(self, key: str, weight: float, cost: float):
+        start = max(self._virtual_time, self._finish_tags.get(key, 0.0))
+        tag = start + cost / max(weight, 1e-6)
+        self._finish_tags[key] = tag
+
+        if self.active < self.max_concurrency and not self.queued:
+            self.active += 1
+            self._virtual_time = start
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (tag, next(self._counter), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Slot was handed over just as we were cancelled
+                self._release()
+            raise
+
+    def _release(self):
+        self.active -= 1
+        while self._waiters:
+            tag, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue
+            self.active += 1
+            self._virtual_time = tag
+            future.set_result(None)
+            break
+        self._prune()
+
+    def _prune(self):
+        # Keys whose tags are behind virtual time have no backlog to remember
+        if len(self._finish_tags) > 1024:
+            self._finish_tags = {
+                key: tag for key, tag in self._finish_tags.items()
+                if tag > self._virtual_time
+            }
+
+# Global instance for Granite calls
+llm_scheduler = FairScheduler(settings.LLM_MAX_CONCURRENCY)
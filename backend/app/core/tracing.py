@@ -0,0 +1,128 @@
+"""Lightweight per-request tracing.
+
+TracingMiddleware (app.middleware.tracing) starts a trace per request and
+keeps it in a context variable; any code on the request path can time a
+stage with
+
+    with span("translate_in"):
+        ...
+
+Spans outside a request (jobs, startup) are no-ops. Finished traces are
+reported in the Server-Timing header, and slow ones are kept in a bounded
+buffer for /internal/traces.
+"""
+import random
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from app.core.config import settings
+
+class Trace:
+    def __init__(self, method: str, path: str):
+        self.method = method
+        self.path = path
+        self.route: Optional[str] = None
+        self.status: Optional[int] = None
+        self.started_at = datetime.utcnow()
+        self.start = time.perf_counter()
+        self.duration: Optional[float] = None
+        self.spans: List[tuple] = []
+
+    def add_span(self, name: str, start: float, duration: float):
+        self.spans.append((name, start - self.start, duration))
+
+    def finish(self):
+        if self.duration is None:
+            self.duration = time.perf_counter() - self.start
+
+    def elapsed(self) -> float:
+        return self.duration if self.duration is not None else time.perf_counter() - self.start
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "status": self.status,
+            "started_at": self.started_at,
+            "duration_ms": round(self.elapsed() * 1000, 2),
+            "spans": [
+                {"name": name, "start_ms": round(offset * 1000, 2), "duration_ms": round(duration * 1000, 2)}
+                for name, offset, duration in self.spans
+            ]
+        }
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+def activate(trace: Trace) -> Token:
+    return _current_trace.set(trace)
+
+def deactivate(token: Token):
+    _current_trace.reset(token)
+
+@contextmanager
+def span(name: str):
+    """Time a stage of the current request; does nothing outside a trace"""
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add_span(name, start, time.perf_counter() - start)
+
+_TOKEN_INVALID = re.compile(r"[^A-Za-z0-9!#$%&'*+.^_`|~-]")
+
+def server_timing(trace: Trace) -> str:
+    """Render spans as a Server-Timing header value"""
+    metrics = [
+        f"{_TOKEN_INVALID.sub('_', name)};dur={duration * 1000:.1f}"
+        for name, _, duration in trace.spans
+    ]
+    metrics.append(f"total;dur={trace.elapsed() * 1000:.1f}")
+    return ", ".join(metrics)
+
+class SlowTraceBuffer:
+    """Ring buffer of traces slower than the threshold"""
+
+    def __init__(self, capacity: int, threshold_ms: float, sample_rate: float = 1.0):
+        self.threshold = threshold_ms / 1000
+        self.sample_rate = sample_rate
+        self._traces: deque = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+
+    def offer(self, trace: Trace) -> bool:
+        if trace.elapsed() < self.threshold or random.random() >= self.sample_rate:
+            return False
+        with self._lock:
+            self._traces.append(trace)
+        return True
+
+    def snapshot(self, limit: Optional[int] = None, route: Optional[str] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            traces = list(self._traces)
+        traces.reverse()
+        if route:
+            traces = [trace for trace in traces if trace.route == route]
+        return [trace.to_dict() for trace in traces[:limit]]
+
+    def clear(self):
+        with self._lock:
+            self._traces.clear()
+
+# Global instance
+slow_traces = SlowTraceBuffer(
+    settings.TRACE_BUFFER_SIZE,
+    settings.TRACE_SLOW_THRESHOLD_MS,
+    settings.TRACE_SAMPLE_RATE
+)
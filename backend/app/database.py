@@ -1,5 +1,8 @@
 from motor.motor_asyncio import AsyncIOMotorClient
 from app.core.config import settings
+from app.core.db_metrics import mongo_metrics
+from app.indexes import ensure_indexes
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
@@ -13,15 +16,42 @@ db = Database()
 async def get_database():
     return db.database
 
+def get_client_options() -> dict:
+    """Connection pool options from settings"""
+    options = {
+        "maxPoolSize": settings.MONGODB_MAX_POOL_SIZE,
+        "minPoolSize": settings.MONGODB_MIN_POOL_SIZE,
+        "maxIdleTimeMS": settings.MONGODB_MAX_IDLE_TIME_MS,
+        "waitQueueTimeoutMS": settings.MONGODB_WAIT_QUEUE_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": settings.MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+        "readPreference": settings.MONGODB_READ_PREFERENCE,
+        "event_listeners": [mongo_metrics]
+    }
+    if settings.MONGODB_COMPRESSORS:
+        options["compressors"] = settings.MONGODB_COMPRESSORS
+    return options
+
+async def warm_connection_pool():
+    """Open the minimum number of pooled connections before serving traffic"""
+    # Concurrent pings each need their own connection, so the pool fills up
+    count = settings.MONGODB_MIN_POOL_SIZE
+    if count > 1:
+        await asyncio.gather(*(db.client.admin.command('ping') for _ in range(count)))
+
 async def connect_to_mongo():
     """Create database connection"""
     try:
-        db.client = AsyncIOMotorClient(settings.MONGODB_URI)
+        db.client = AsyncIOMotorClient(settings.MONGODB_URI, **get_client_options())
         db.database = db.client.get_default_database()
         
         # Test connection
         await db.client.admin.command('ping')
         logger.info("📊 Connected to MongoDB")
+        
+        await warm_connection_pool()
+        
+        if settings.CREATE_INDEXES_ON_STARTUP:
+            await ensure_indexes(db.database)
     except Exception as e:
         logger.error(f"❌ Failed to connect to MongoDB: {e}")
         raise
@@ -0,0 +1,186 @@
+"""Declarative registry of MongoDB indexes and the query shapes they serve.
+
+Add an index here whenever a router introduces a new query shape, and add the
+shape to QUERY_SHAPES (built with the app.queries builder the router uses) so
+verify_query_plans can check it is served by an index.
+"""
+from typing import Dict, List, Any
+from datetime import datetime, date
+from pymongo import IndexModel, ASCENDING, DESCENDING, GEOSPHERE
+from app import queries
+from app.services.geo_service import geo_service
+import logging
+
+logger = logging.getLogger(__name__)
+
+INDEXES: Dict[str, List[IndexModel]] = {
+    "farms": [
+        IndexModel([("user_id", ASCENDING), ("is_active", ASCENDING)]),
+        # One active farm per user, even when profile upserts race
+        IndexModel(
+            [("user_id", ASCENDING)],
+            unique=True,
+            partialFilterExpression={"is_active": True}
+        ),
+        IndexModel([("coordinates", GEOSPHERE)]),
+    ],
+    "activities": [
+        IndexModel(
+            [("user_id", ASCENDING), ("is_deleted", ASCENDING), ("created_at", DESCENDING)]
+        ),
+        # Offline sync replays are deduplicated on their client-supplied key
+        IndexModel(
+            [("user_id", ASCENDING), ("idempotency_key", ASCENDING)],
+            unique=True,
+            partialFilterExpression={"idempotency_key": {"$exists": True}}
+        ),
+    ],
+    "activity_rollups": [
+        IndexModel([("user_id", ASCENDING), ("date", ASCENDING)]),
+    ],
+    "chats": [
+        IndexModel(
+            [("user_id", ASCENDING), ("session_id", ASCENDING), ("created_at", DESCENDING)]
+        ),
+        IndexModel(
+            [("user_id", ASCENDING), ("is_active", ASCENDING), ("created_at", DESCENDING)]
+        ),
+    ],
+    "alerts": [
+        IndexModel(
+            [("user_id", ASCENDING), ("is_active", ASCENDING),
+             ("priority", ASCENDING), ("created_at", DESCENDING)]
+        ),
+        IndexModel(
+            [("user_id", ASCENDING), ("is_active", ASCENDING), ("is_read", ASCENDING),
+             ("priority", ASCENDING), ("created_at", DESCENDING)]
+        ),
+        # Export streams every active alert oldest first
+        IndexModel([("user_id", ASCENDING), ("is_active", ASCENDING), ("created_at", DESCENDING)]),
+    ],
+    "advisory_digests": [
+        IndexModel(
+            [("crop", ASCENDING), ("soil_type", ASCENDING), ("district", ASCENDING), ("date", DESCENDING)],
+            unique=True
+        ),
+        IndexModel([("date", ASCENDING)]),
+        IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+    ],
+    "archive_batches": [
+        IndexModel([("collection", ASCENDING), ("created_at", DESCENDING)]),
+        # Restoring a user's data finds the batches that hold it
+        IndexModel([("user_ids", ASCENDING)]),
+    ],
+    # Records are looked up by _id; this only expires them
+    "idempotency_keys": [
+        IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+    ],
+}
+
+# Query shapes issued by the routers and services: (name, collection, filter, sort).
+# Each is built with the same builder its caller uses.
+QUERY_SHAPES: List[tuple] = [
+    ("active farm", "farms", queries.active_farm("u"), None),
+    ("activity list", "activities", queries.activities("u"), queries.ACTIVITY_SORT),
+    ("activity export", "activities", queries.activities("u"), queries.EXPORT_SORT),
+    ("latest activity of type", "activities",
+     queries.activities_of_type_on("u", "irrigated", datetime(2024, 1, 1)), queries.ACTIVITY_SORT),
+    ("activity rollups", "activity_rollups",
+     queries.rollups_between("u", date(2024, 1, 1), date(2024, 1, 31)), queries.ROLLUP_SORT),
+    ("chat session", "chats", queries.chat_session("u", "s"), None),
+    ("chat history", "chats", queries.chat_history("u"), queries.CHAT_SORT),
+    ("chat session history", "chats", queries.chat_history("u", "s"), queries.CHAT_SORT),
+    ("alert list", "alerts", queries.alerts("u"), queries.ALERT_SORT),
+    ("alert list by type", "alerts", queries.alerts("u", type="pest"), queries.ALERT_SORT),
+    ("alert list by priority", "alerts", queries.alerts("u", priority="high"), queries.ALERT_SORT),
+    ("alert list unread", "alerts", queries.alerts("u", unread_only=True), queries.ALERT_SORT),
+    ("alert unread count", "alerts", queries.alerts("u", unread_only=True), None),
+    ("alert export", "alerts", queries.alerts("u"), queries.EXPORT_SORT),
+    ("cohort digest", "advisory_digests",
+     queries.cohort_digest({"crop": "paddy", "soil_type": "laterite", "district": "thrissur"}, datetime(2024, 1, 1)),
+     queries.DIGEST_SORT),
+    ("digests generated today", "advisory_digests", queries.digests_on(datetime(2024, 1, 1)), None),
+    ("farms in circle", "farms", geo_service.region_filter(lat=10.5, lon=76.2, radius_km=25), None),
+    ("farms in polygon", "farms",
+     geo_service.region_filter(polygon=[[76.0, 10.0], [76.5, 10.0], [76.5, 10.5], [76.0, 10.5], [76.0, 10.0]]),
+     None),
+]
+
+# Aggregations issued by the routers: (name, collection, pipeline)
+PIPELINE_SHAPES: List[tuple] = [
+    ("chat export", "chats", queries.chat_export("u", ["session_id", "content", "timestamp"])),
+]
+
+class IndexBuildError(RuntimeError):
+    """Raised after ensure_indexes when any registered index could not be built"""
+
+async def ensure_indexes(database) -> Dict[str, List[str]]:
+    """Create every registered index; safe to run repeatedly.
+
+    Raises IndexBuildError if any index failed: the unique indexes carry the
+    upsert and deduplication guarantees, so running without one is an error.
+    """
+    created = {}
+    failures = []
+    for collection, indexes in INDEXES.items():
+        created[collection] = []
+        for index in indexes:
+            try:
+                created[collection].extend(await database[collection].create_indexes([index]))
+            except Exception as e:
+                # Build the rest before failing, e.g. when only unmigrated geo data is in the way
+                logger.error(f"❌ Could not create index {index.document['name']} on {collection}: {e}")
+                failures.append(f"{collection}.{index.document['name']}: {e}")
+    if failures:
+        raise IndexBuildError("Could not create indexes: " + "; ".join(failures))
+    return created
+
+def _plan_stages(plan: Dict[str, Any]) -> List[str]:
+    stages = [plan.get("stage")]
+    for key in ("inputStage", "outerStage", "innerStage"):
+        if key in plan:
+            stages.extend(_plan_stages(plan[key]))
+    for child in plan.get("inputStages", []):
+        stages.extend(_plan_stages(child))
+    return stages
+
+def _stage_problems(name: str, collection: str, stages: List[str]) -> List[str]:
+    problems = []
+    if "COLLSCAN" in stages:
+        problems.append(f"{name}: collection scan on {collection}")
+    if "SORT" in stages or "$sort" in stages:
+        problems.append(f"{name}: in-memory sort on {collection}")
+    return problems
+
+def _winning_stages(query_planner: Dict[str, Any]) -> List[str]:
+    winning_plan = query_planner["winningPlan"]
+    # Slot-based engine wraps the classic plan under queryPlan
+    return _plan_stages(winning_plan.get("queryPlan", winning_plan))
+
+async def plan_problems(database, name: str, collection: str, query: Dict[str, Any], sort) -> List[str]:
+    """Explain one query shape and report a collection scan or in-memory sort"""
+    cursor = database[collection].find(query)
+    if sort:
+        cursor = cursor.sort(sort)
+    explain = await cursor.explain()
+    return _stage_problems(name, collection, _winning_stages(explain["queryPlanner"]))
+
+async def pipeline_problems(database, name: str, collection: str, pipeline: List[Dict[str, Any]]) -> List[str]:
+    """Explain an aggregation; stages the query layer couldn't absorb show up as $-stages"""
+    explain = await database.command("aggregate", collection, pipeline=pipeline, explain=True)
+    if "queryPlanner" in explain:
+        stages = _winning_stages(explain["queryPlanner"])
+    else:
+        cursor = explain["stages"][0]["$cursor"]
+        stages = _winning_stages(cursor["queryPlanner"])
+        stages += [next(iter(stage)) for stage in explain["stages"][1:]]
+    return _stage_problems(name, collection, stages)
+
+async def verify_query_plans(database) -> List[str]:
+    """Explain every registered query shape and report collection scans or in-memory sorts"""
+    problems = []
+    for shape in QUERY_SHAPES:
+        problems.extend(await plan_problems(database, *shape))
+    for shape in PIPELINE_SHAPES:
+        problems.extend(await pipeline_problems(database, *shape))
+    return problems
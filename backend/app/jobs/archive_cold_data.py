@@ -0,0 +1,73 @@
+"""Archive soft-deleted and cold chats, activities and alerts.
+
+Matching documents are compressed into archive_batches and removed from
+their collection; --restore-batch and --restore-user put them back.
+
+Usage: python -m app.jobs.archive_cold_data [--collections chats,alerts]
+    [--dry-run] [--compact]
+       python -m app.jobs.archive_cold_data --restore-batch BATCH_ID
+       python -m app.jobs.archive_cold_data --restore-user USER_ID [--collections chats]
+"""
+import argparse
+import asyncio
+import logging
+
+from app.database import db, connect_to_mongo, close_mongo_connection
+from app.services.archive_service import archive_service
+
+logger = logging.getLogger(__name__)
+
+def _mb(size: int) -> str:
+    return f"{size / (1024 * 1024):.2f} MB"
+
+async def run(collections: list = None, dry_run: bool = False, compact: bool = False) -> dict:
+    await connect_to_mongo()
+    try:
+        report = await archive_service.run(db.database, collections, dry_run, compact)
+        for collection, stats in report.items():
+            reclaimed = stats["reclaimed"]
+            logger.info(
+                f"{collection}: {'would archive' if dry_run else 'archived'} {stats['archived']} documents "
+                f"in {stats['batches']} batches ({_mb(stats['raw_bytes'])} -> {_mb(stats['compressed_bytes'])}); "
+                f"reclaimed {_mb(reclaimed['size'])} data, {_mb(reclaimed['index_size'])} indexes, "
+                f"{_mb(reclaimed['storage_size'])} on disk"
+            )
+        return report
+    finally:
+        await close_mongo_connection()
+
+async def restore(batch_id: str = None, user_id: str = None, collection: str = None) -> int:
+    await connect_to_mongo()
+    try:
+        if batch_id:
+            restored = await archive_service.restore_batch(db.database, batch_id)
+        else:
+            restored = await archive_service.restore_user(db.database, user_id, collection)
+        logger.info(f"Restored {restored} documents")
+        return restored
+    finally:
+        await close_mongo_connection()
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive soft-deleted and cold documents")
+    parser.add_argument("--collections", help="Comma-separated collections (default: chats,activities,alerts)")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would be archived")
+    parser.add_argument("--compact", action="store_true", help="Compact collections to release disk space")
+    parser.add_argument("--restore-batch", help="Restore every document in an archive batch")
+    parser.add_argument("--restore-user", help="Restore one user's archived documents")
+    args = parser.parse_args()
+
+    collections = args.collections.split(",") if args.collections else None
+    if collections and any(name not in archive_service.collections for name in collections):
+        parser.error(f"collections must be among {', '.join(archive_service.collections)}")
+
+    logging.basicConfig(level=logging.INFO)
+    if args.restore_batch or args.restore_user:
+        if args.restore_user and collections and len(collections) > 1:
+            parser.error("--restore-user takes at most one collection")
+        asyncio.run(restore(args.restore_batch, args.restore_user, collections[0] if collections else None))
+    else:
+        asyncio.run(run(collections, args.dry_run, args.compact))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Create the registered MongoDB indexes and optionally verify query plans.
+
+Usage: python -m app.jobs.ensure_indexes [--verify]
+
+With --verify, every query shape in app.indexes.QUERY_SHAPES is explained and
+the command exits non-zero if any of them needs a collection scan or an
+in-memory sort.
+"""
+import argparse
+import asyncio
+import logging
+import sys
+
+from app.database import db, connect_to_mongo, close_mongo_connection
+from app.indexes import ensure_indexes, verify_query_plans
+
+logger = logging.getLogger(__name__)
+
+async def run(verify: bool = False) -> list:
+    await connect_to_mongo()
+    try:
+        created = await ensure_indexes(db.database)
+        for collection, names in created.items():
+            logger.info(f"{collection}: {', '.join(names) or 'no indexes'}")
+        
+        if not verify:
+            return []
+        
+        problems = await verify_query_plans(db.database)
+        for problem in problems:
+            logger.error(f"❌ {problem}")
+        if not problems:
+            logger.info("All query shapes are served by indexes")
+        return problems
+    finally:
+        await close_mongo_connection()
+
+def main():
+    parser = argparse.ArgumentParser(description="Create MongoDB indexes")
+    parser.add_argument("--verify", action="store_true", help="Explain registered query shapes")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    problems = asyncio.run(run(args.verify))
+    sys.exit(1 if problems else 0)
+
+if __name__ == "__main__":
+    main()
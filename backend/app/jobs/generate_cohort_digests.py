@@ -0,0 +1,45 @@
+"""Generate the daily advisory digest for every farm cohort.
+
+Farms are grouped by (crop, soil_type, district); each cohort gets one LLM
+call and one translation per language, and every member reads the result.
+
+Usage: python -m app.jobs.generate_cohort_digests [--date YYYY-MM-DD]
+    [--concurrency N] [--limit N] [--force]
+"""
+import argparse
+import asyncio
+import logging
+import sys
+from datetime import date
+
+from app.database import db, connect_to_mongo, close_mongo_connection
+from app.services.digest_service import digest_service
+
+logger = logging.getLogger(__name__)
+
+async def run(day: date = None, concurrency: int = 4, limit: int = None, force: bool = False) -> dict:
+    await connect_to_mongo()
+    try:
+        stats = await digest_service.generate_all(db.database, day, concurrency, force, limit)
+        logger.info(
+            f"Generated {stats['generated']} of {stats['cohorts']} cohort digests "
+            f"covering {stats['farms_covered']} farms ({stats['failed']} failed)"
+        )
+        return stats
+    finally:
+        await close_mongo_connection()
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate daily cohort advisory digests")
+    parser.add_argument("--date", type=date.fromisoformat, help="Digest date (default: today, UTC)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Cohorts generated in parallel")
+    parser.add_argument("--limit", type=int, help="Only the N largest cohorts")
+    parser.add_argument("--force", action="store_true", help="Regenerate digests that already exist")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    stats = asyncio.run(run(args.date, args.concurrency, args.limit, args.force))
+    sys.exit(1 if stats["cohorts"] and not stats["generated"] else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Convert legacy farm coordinates to GeoJSON points and build the geo index.
+
+Usage: python -m app.jobs.migrate_farm_coordinates
+"""
+import asyncio
+import logging
+
+from pymongo import UpdateOne, GEOSPHERE
+
+from app.database import db, connect_to_mongo, close_mongo_connection
+from app.models.farm import to_geojson_point
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+
+async def run() -> dict:
+    await connect_to_mongo()
+    try:
+        stats = {"migrated": 0, "cleared": 0}
+        operations = []
+        cursor = db.database.farms.find(
+            {"coordinates": {"$ne": None}, "coordinates.type": {"$ne": "Point"}},
+            {"coordinates": 1}
+        )
+        async for farm in cursor:
+            try:
+                point = to_geojson_point(farm["coordinates"])
+                operations.append(UpdateOne({"_id": farm["_id"]}, {"$set": {"coordinates": point}}))
+                stats["migrated"] += 1
+            except ValueError:
+                # Unusable coordinates would block the 2dsphere index
+                logger.warning(f"Clearing invalid coordinates on farm {farm['_id']}")
+                operations.append(UpdateOne({"_id": farm["_id"]}, {"$set": {"coordinates": None}}))
+                stats["cleared"] += 1
+            
+            if len(operations) >= BATCH_SIZE:
+                await db.database.farms.bulk_write(operations, ordered=False)
+                operations = []
+        
+        if operations:
+            await db.database.farms.bulk_write(operations, ordered=False)
+        
+        await db.database.farms.create_index([("coordinates", GEOSPHERE)])
+        logger.info(f"Farm coordinates migration: {stats}")
+        return stats
+    finally:
+        await close_mongo_connection()
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""Recompute daily activity rollups from raw activity records.
+
+Usage: python -m app.jobs.rebuild_activity_rollups [--user-id USER_ID]
+"""
+import argparse
+import asyncio
+import logging
+
+from app.database import db, connect_to_mongo, close_mongo_connection
+from app.services.analytics_service import analytics_service
+
+logger = logging.getLogger(__name__)
+
+async def run(user_id: str = None) -> int:
+    await connect_to_mongo()
+    try:
+        count = await analytics_service.rebuild(db.database, user_id)
+        logger.info(f"Rebuilt {count} activity rollups")
+        return count
+    finally:
+        await close_mongo_connection()
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild activity analytics rollups")
+    parser.add_argument("--user-id", help="Only rebuild rollups for this user")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run(args.user_id))
+
+if __name__ == "__main__":
+    main()
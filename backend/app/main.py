@@ -1,27 +1,34 @@
 from fastapi import FastAPI, HTTPException, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.responses import JSONResponse
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
+from fastapi.responses import JSONResponse, PlainTextResponse
+from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 import os
 from dotenv import load_dotenv
 
 from app.database import connect_to_mongo, close_mongo_connection
-from app.routers import farm, chat, alerts, weather
+from app.routers import farm, chat, alerts, weather, export, internal, media, dashboard
 from app.middleware.auth import get_current_user_id
+from app.middleware.metrics import MetricsMiddleware
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.admission import AdmissionControlMiddleware
+from app.middleware.tracing import TracingMiddleware
+from app.middleware.profiling import ProfilingMiddleware
 from app.core.config import settings
+from app.core.metrics import registry
+from app.core.registry import services
+from app.core.loop_monitor import loop_monitor
+from app.core.rate_limit import limiter
+from app.core.responses import MongoJSONResponse
 
 load_dotenv()
 
-# Rate limiter
-limiter = Limiter(key_func=get_remote_address)
-
 app = FastAPI(
     title="Krishi Sakhi API",
     description="Digital Farming Assistant API with AI Chat and Weather Alerts",
     version="2.0.0",
+    default_response_class=MongoJSONResponse,
     docs_url="/docs" if settings.ENVIRONMENT == "development" else None,
     redoc_url="/redoc" if settings.ENVIRONMENT == "development" else None
 )
@@ -30,6 +37,9 @@ app = FastAPI(
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
+# Shed load per endpoint class (innermost, so rejections still get CORS headers)
+app.add_middleware(AdmissionControlMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -37,6 +47,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "PATCH"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Server-Timing"],
 )
 
 # Trusted host middleware
@@ -45,14 +56,42 @@ app.add_middleware(
     allowed_hosts=settings.ALLOWED_HOSTS
 )
 
+# Compress larger responses for clients on slow mobile links
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.GZIP_MINIMUM_SIZE,
+    compresslevel=settings.GZIP_COMPRESS_LEVEL
+)
+
+# cProfile single requests sent with X-Debug-Profile and the admin key
+app.add_middleware(ProfilingMiddleware)
+
+# Per-request stage timings in Server-Timing
+app.add_middleware(TracingMiddleware)
+
+# Request metrics (outermost so it sees every response)
+app.add_middleware(MetricsMiddleware)
+
 # Database events
 @app.on_event("startup")
 async def startup_db_client():
     await connect_to_mongo()
+    if settings.LOOP_MONITOR_ENABLED:
+        loop_monitor.start()
+    if settings.PRELOAD_SERVICES:
+        services.initialize()
+    else:
+        # The advisory index is small; building it now keeps it off the first chat request
+        services.initialize("advisory")
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    await loop_monitor.stop()
     await close_mongo_connection()
+    if services.is_initialized("cache"):
+        await services.get("cache").close()
+    if services.is_initialized("media"):
+        services.get("media").close()
 
 # Health check
 @app.get("/health")
@@ -63,11 +102,23 @@ async def health_check():
         "environment": settings.ENVIRONMENT
     }
 
+# Prometheus metrics for this worker
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
 # Include routers
 app.include_router(farm.router, prefix="/api/farm", tags=["farm"])
 app.include_router(chat.router, prefix="/api/chat", tags=["chat"])
 app.include_router(alerts.router, prefix="/api/alerts", tags=["alerts"])
 app.include_router(weather.router, prefix="/api/weather", tags=["weather"])
+app.include_router(export.router, prefix="/api/export", tags=["export"])
+app.include_router(media.router, prefix="/api/media", tags=["media"])
+app.include_router(dashboard.router, prefix="/api/dashboard", tags=["dashboard"])
+app.include_router(internal.router, prefix="/internal", tags=["internal"])
+
+# Uploaded images, addressed by content hash
+app.mount(settings.MEDIA_URL, media.MediaFiles(directory=settings.MEDIA_ROOT, check_dir=False), name="media")
 
 # Global exception handler
 @app.exception_handler(Exception)
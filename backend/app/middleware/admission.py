@@ -0,0 +1,46 @@
+import time
+from fastapi.responses import JSONResponse
+from app.core.admission import classify, limiters
+from app.core.config import settings
+
+class AdmissionControlMiddleware:
+    """Shed requests with 503 when their endpoint class is at its concurrency limit"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.ADMISSION_CONTROL_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        endpoint_class = classify(scope["path"])
+        if endpoint_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        limiter = limiters[endpoint_class]
+        if not limiter.try_acquire():
+            response = JSONResponse(
+                {"success": False, "message": "Server is busy, please retry shortly"},
+                status_code=503,
+                headers={"Retry-After": str(limiter.retry_after())}
+            )
+            await response(scope, receive, send)
+            return
+
+        status = {"code": 500, "started": None}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                status["started"] = time.perf_counter()
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Time to the response headers; streamed bodies still hold the slot until sent
+            latency = (status["started"] or time.perf_counter()) - start
+            limiter.release(latency, failed=status["code"] >= 500)
@@ -1,5 +1,7 @@
 from fastapi import Header, HTTPException
+from app.core.config import settings
 import hashlib
+import hmac
 
 async def get_current_user_id(x_user_id: str = Header(None)) -> str:
     """Get or generate user ID from headers"""
@@ -9,6 +11,13 @@ async def get_current_user_id(x_user_id: str = Header(None)) -> str:
     # Generate a default user ID if not provided
     return "default_user"
 
+async def require_admin(x_admin_key: str = Header(None)) -> None:
+    """Allow only callers presenting the configured admin key"""
+    if not settings.ADMIN_API_KEY:
+        raise HTTPException(status_code=403, detail="Admin API is disabled")
+    if not x_admin_key or not hmac.compare_digest(x_admin_key, settings.ADMIN_API_KEY):
+        raise HTTPException(status_code=403, detail="Forbidden")
+
 def generate_user_id(ip_address: str, user_agent: str) -> str:
     """Generate user ID from IP and user agent"""
     identifier = f"{ip_address}-{user_agent}"
@@ -0,0 +1,11 @@
+from fastapi.middleware.gzip import GZipMiddleware
+from app.core.config import settings
+
+class CompressionMiddleware(GZipMiddleware):
+    """GZip responses, except stored media, which is already compressed"""
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].startswith(settings.MEDIA_URL + "/"):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
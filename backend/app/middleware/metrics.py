@@ -0,0 +1,48 @@
+import time
+from app.core.metrics import registry
+
+request_duration = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route",
+    ["method", "route"]
+)
+requests_total = registry.counter(
+    "http_requests_total",
+    "HTTP requests by route and status",
+    ["method", "route", "status"]
+)
+requests_in_flight = registry.gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being served"
+)
+
+class MetricsMiddleware:
+    """Record latency, status counts and in-flight requests per route"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        requests_in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            requests_in_flight.dec()
+            # Label by route template so path parameters don't explode cardinality
+            route = scope.get("route")
+            route_path = getattr(route, "path", "unmatched")
+            method = scope["method"]
+            request_duration.observe(time.perf_counter() - start, method=method, route=route_path)
+            requests_total.inc(method=method, route=route_path, status=str(status["code"]))
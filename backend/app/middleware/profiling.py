@@ -0,0 +1,63 @@
+import cProfile
+import hmac
+import threading
+import time
+from app.core.config import settings
+from app.core.profiling import request_profiles
+
+def _header(scope, name: bytes):
+    for key, value in scope.get("headers", []):
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+class ProfilingMiddleware:
+    """Run a request under cProfile when it carries X-Debug-Profile and the admin key.
+
+    The report is kept in request_profiles and its id returned in X-Profile-Id.
+    cProfile sees everything the worker's event loop runs meanwhile, so profile
+    on a quiet worker for a clean picture. One request is profiled at a time.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._lock = threading.Lock()
+
+    def _requested(self, scope) -> bool:
+        if not settings.REQUEST_PROFILING_ENABLED or not settings.ADMIN_API_KEY:
+            return False
+        if not _header(scope, b"x-debug-profile"):
+            return False
+        admin_key = _header(scope, b"x-admin-key")
+        return bool(admin_key) and hmac.compare_digest(admin_key, settings.ADMIN_API_KEY)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._requested(scope) or not self._lock.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        profiler = cProfile.Profile()
+        state = {"profiling": True}
+        start = time.perf_counter()
+
+        def finish() -> int:
+            profiler.disable()
+            state["profiling"] = False
+            self._lock.release()
+            return request_profiles.add(scope["method"], scope["path"], time.perf_counter() - start, profiler)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and state["profiling"]:
+                # The handler is done once the response starts; streaming the body isn't profiled
+                profile_id = finish()
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-id", str(profile_id).encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if state["profiling"]:
+                finish()
@@ -0,0 +1,44 @@
+from app.core.config import settings
+from app.core.tracing import Trace, activate, deactivate, server_timing, slow_traces
+
+def _header(scope, name: bytes):
+    for key, value in scope.get("headers", []):
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+class TracingMiddleware:
+    """Trace each request and report its stages in Server-Timing"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.TRACING_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        trace = Trace(scope["method"], scope["path"])
+        token = activate(trace)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                # Spans are complete once the handler has produced its response
+                trace.status = message["status"]
+                if settings.SERVER_TIMING_ENABLED:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", server_timing(trace).encode("latin-1")))
+                    # Let the allowed frontends read the timings from the Resource Timing API
+                    origin = _header(scope, b"origin")
+                    if origin and origin in settings.ALLOWED_ORIGINS:
+                        headers.append((b"timing-allow-origin", origin.encode("latin-1")))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            deactivate(token)
+            trace.finish()
+            trace.route = getattr(scope.get("route"), "path", None)
+            slow_traces.offer(trace)
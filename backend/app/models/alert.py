@@ -1,12 +1,16 @@
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field
+from pydantic_core import core_schema
+from typing import Optional, List
 from datetime import datetime, timedelta
 from bson import ObjectId
 
 class PyObjectId(ObjectId):
     @classmethod
-    def __get_validators__(cls):
-        yield cls.validate
+    def __get_pydantic_core_schema__(cls, source_type, handler):
+        return core_schema.no_info_plain_validator_function(
+            cls.validate,
+            serialization=core_schema.plain_serializer_function_ser_schema(str, when_used="json")
+        )
 
     @classmethod
     def validate(cls, v):
@@ -15,12 +19,19 @@ class PyObjectId(ObjectId):
         return ObjectId(v)
 
     @classmethod
-    def __modify_schema__(cls, field_schema):
-        field_schema.update(type="string")
+    def __get_pydantic_json_schema__(cls, schema, handler):
+        return {"type": "string"}
+
+# Fields a client may select on alert lists, and the default list view
+ALERT_FIELDS = [
+    "type", "priority", "title", "message", "location", "crop",
+    "is_read", "expires_at", "created_at"
+]
+ALERT_LIST_FIELDS = ALERT_FIELDS
 
 class AlertBase(BaseModel):
-    type: str = Field(..., regex="^(weather|price|scheme|irrigation|pest|fertilizer|harvest)$")
-    priority: str = Field(..., regex="^(high|medium|low)$")
+    type: str = Field(..., pattern="^(weather|price|scheme|irrigation|pest|fertilizer|harvest)$")
+    priority: str = Field(..., pattern="^(high|medium|low)$")
     title: str = Field(..., min_length=1, max_length=200)
     message: str = Field(..., min_length=1, max_length=1000)
     location: Optional[str] = None
@@ -37,7 +48,15 @@ class Alert(AlertBase):
     expires_at: datetime = Field(default_factory=lambda: datetime.utcnow() + timedelta(days=7))
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
-    class Config:
-        allow_population_by_field_name = True
-        arbitrary_types_allowed = True
-        json_encoders = {ObjectId: str}
\ No newline at end of file
+    model_config = ConfigDict(populate_by_name=True, arbitrary_types_allowed=True)
+
+class Region(BaseModel):
+    # Either a circle (lat/lon/radius_km) or a polygon ring of [lon, lat] pairs
+    lat: Optional[float] = Field(None, ge=-90, le=90)
+    lon: Optional[float] = Field(None, ge=-180, le=180)
+    radius_km: Optional[float] = Field(None, gt=0, le=500)
+    polygon: Optional[List[List[float]]] = None
+
+class RegionalAlertCreate(AlertCreate):
+    region: Region
+    expires_in_hours: int = Field(24, ge=1, le=168)
@@ -1,12 +1,16 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
+from pydantic_core import core_schema
 from typing import Optional, List
 from datetime import datetime
 from bson import ObjectId
 
 class PyObjectId(ObjectId):
     @classmethod
-    def __get_validators__(cls):
-        yield cls.validate
+    def __get_pydantic_core_schema__(cls, source_type, handler):
+        return core_schema.no_info_plain_validator_function(
+            cls.validate,
+            serialization=core_schema.plain_serializer_function_ser_schema(str, when_used="json")
+        )
 
     @classmethod
     def validate(cls, v):
@@ -15,15 +19,21 @@ class PyObjectId(ObjectId):
         return ObjectId(v)
 
     @classmethod
-    def __modify_schema__(cls, field_schema):
-        field_schema.update(type="string")
+    def __get_pydantic_json_schema__(cls, schema, handler):
+        return {"type": "string"}
+
+# Message fields a client may select on chat history, and the default view
+MESSAGE_FIELDS = ["id", "content", "sender", "has_image", "image_url", "thumbnail_url", "language", "timestamp"]
+# Lists carry the thumbnail; clients fetch image_url when a message is opened
+MESSAGE_LIST_FIELDS = [field for field in MESSAGE_FIELDS if field != "image_url"]
 
 class MessageBase(BaseModel):
     content: str = Field(..., min_length=1, max_length=2000)
-    sender: str = Field(..., regex="^(user|ai)$")
+    sender: str = Field(..., pattern="^(user|ai)$")
     has_image: bool = False
     image_url: Optional[str] = None
-    language: str = Field(default="en", regex="^(en|ml)$")
+    thumbnail_url: Optional[str] = None
+    language: str = Field(default="en", pattern="^(en|ml)$")
 
 class MessageCreate(MessageBase):
     pass
@@ -46,17 +56,15 @@ class ChatSession(ChatSessionBase):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
-    class Config:
-        allow_population_by_field_name = True
-        arbitrary_types_allowed = True
-        json_encoders = {ObjectId: str}
+    model_config = ConfigDict(populate_by_name=True, arbitrary_types_allowed=True)
 
 class ChatRequest(BaseModel):
     message: str = Field(..., min_length=1, max_length=2000)
     session_id: Optional[str] = None
-    language: str = Field(default="en", regex="^(en|ml)$")
+    language: str = Field(default="en", pattern="^(en|ml)$")
     has_image: bool = False
     image_url: Optional[str] = None
+    thumbnail_url: Optional[str] = None
 
 class ChatResponse(BaseModel):
     user_message: Message
@@ -1,12 +1,16 @@
-from pydantic import BaseModel, Field
-from typing import Optional, List
-from datetime import datetime
+from pydantic import BaseModel, ConfigDict, Field, BeforeValidator, AfterValidator
+from pydantic_core import core_schema
+from typing import Optional, List, Any, Annotated
+from datetime import datetime, timezone
 from bson import ObjectId
 
 class PyObjectId(ObjectId):
     @classmethod
-    def __get_validators__(cls):
-        yield cls.validate
+    def __get_pydantic_core_schema__(cls, source_type, handler):
+        return core_schema.no_info_plain_validator_function(
+            cls.validate,
+            serialization=core_schema.plain_serializer_function_ser_schema(str, when_used="json")
+        )
 
     @classmethod
     def validate(cls, v):
@@ -15,18 +19,66 @@ class PyObjectId(ObjectId):
         return ObjectId(v)
 
     @classmethod
-    def __modify_schema__(cls, field_schema):
-        field_schema.update(type="string")
+    def __get_pydantic_json_schema__(cls, schema, handler):
+        return {"type": "string"}
+
+# Fields returned for the farm profile
+FARM_PROFILE_FIELDS = [
+    "name", "location", "land_size", "land_unit", "current_crop", "soil_type",
+    "irrigation", "coordinates", "user_id", "is_active", "created_at", "updated_at"
+]
+
+# Fields a client may select on activity lists, and the default list view
+ACTIVITY_FIELDS = [
+    "type", "crop", "notes", "location", "weather", "images", "images.thumbnail_url", "farm_id",
+    "idempotency_key", "created_at"
+]
+# Lists carry image thumbnails only; "images" selects the full references
+ACTIVITY_LIST_FIELDS = ["type", "crop", "notes", "location", "images.thumbnail_url", "created_at"]
+
+def to_geojson_point(value: Any) -> Optional[dict]:
+    """Normalise farm coordinates to a GeoJSON point"""
+    if value is None:
+        return None
+    
+    if isinstance(value, dict):
+        if value.get("type") == "Point":
+            lon, lat = value.get("coordinates") or (None, None)
+        else:
+            lat = value.get("latitude", value.get("lat"))
+            lon = value.get("longitude", value.get("lon", value.get("lng")))
+    elif isinstance(value, (list, tuple)) and len(value) == 2:
+        lon, lat = value
+    else:
+        raise ValueError("Invalid coordinates")
+    
+    try:
+        lon, lat = float(lon), float(lat)
+    except (TypeError, ValueError):
+        raise ValueError("Invalid coordinates")
+    
+    if not (-180 <= lon <= 180 and -90 <= lat <= 90):
+        raise ValueError("Coordinates out of range")
+    
+    return {"type": "Point", "coordinates": [lon, lat]}
+
+def to_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Stored timestamps are naive UTC; convert client times that carry an offset"""
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+Coordinates = Annotated[Optional[dict], BeforeValidator(to_geojson_point)]
 
 class FarmBase(BaseModel):
     name: str = Field(..., min_length=1, max_length=100)
     location: str = Field(..., min_length=1, max_length=100)
     land_size: float = Field(..., gt=0)
-    land_unit: str = Field(..., regex="^(cents|hectares)$")
-    current_crop: str = Field(..., regex="^(paddy|coconut|rubber|banana|brinjal|pepper|cardamom|ginger|turmeric)$")
-    soil_type: str = Field(..., regex="^(laterite|alluvial|coastal|forest)$")
+    land_unit: str = Field(..., pattern="^(cents|hectares)$")
+    current_crop: str = Field(..., pattern="^(paddy|coconut|rubber|banana|brinjal|pepper|cardamom|ginger|turmeric)$")
+    soil_type: str = Field(..., pattern="^(laterite|alluvial|coastal|forest)$")
     irrigation: bool = False
-    coordinates: Optional[dict] = None
+    coordinates: Coordinates = None
 
 class FarmCreate(FarmBase):
     pass
@@ -35,11 +87,11 @@ class FarmUpdate(BaseModel):
     name: Optional[str] = Field(None, min_length=1, max_length=100)
     location: Optional[str] = Field(None, min_length=1, max_length=100)
     land_size: Optional[float] = Field(None, gt=0)
-    land_unit: Optional[str] = Field(None, regex="^(cents|hectares)$")
-    current_crop: Optional[str] = Field(None, regex="^(paddy|coconut|rubber|banana|brinjal|pepper|cardamom|ginger|turmeric)$")
-    soil_type: Optional[str] = Field(None, regex="^(laterite|alluvial|coastal|forest)$")
+    land_unit: Optional[str] = Field(None, pattern="^(cents|hectares)$")
+    current_crop: Optional[str] = Field(None, pattern="^(paddy|coconut|rubber|banana|brinjal|pepper|cardamom|ginger|turmeric)$")
+    soil_type: Optional[str] = Field(None, pattern="^(laterite|alluvial|coastal|forest)$")
     irrigation: Optional[bool] = None
-    coordinates: Optional[dict] = None
+    coordinates: Coordinates = None
 
 class Farm(FarmBase):
     id: PyObjectId = Field(default_factory=PyObjectId, alias="_id")
@@ -48,13 +100,10 @@ class Farm(FarmBase):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
-    class Config:
-        allow_population_by_field_name = True
-        arbitrary_types_allowed = True
-        json_encoders = {ObjectId: str}
+    model_config = ConfigDict(populate_by_name=True, arbitrary_types_allowed=True)
 
 class ActivityBase(BaseModel):
-    type: str = Field(..., regex="^(sowedSeeds|appliedFertilizer|irrigated|pestDisease|weeding|harvested)$")
+    type: str = Field(..., pattern="^(sowedSeeds|appliedFertilizer|irrigated|pestDisease|weeding|harvested)$")
     crop: str = Field(..., min_length=1, max_length=50)
     notes: Optional[str] = Field(None, max_length=500)
     location: str = Field(..., min_length=1, max_length=100)
@@ -71,7 +120,12 @@ class Activity(ActivityBase):
     is_deleted: bool = False
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
-    class Config:
-        allow_population_by_field_name = True
-        arbitrary_types_allowed = True
-        json_encoders = {ObjectId: str}
\ No newline at end of file
+    model_config = ConfigDict(populate_by_name=True, arbitrary_types_allowed=True)
+
+class ActivityBatchItem(ActivityCreate):
+    idempotency_key: str = Field(..., min_length=1, max_length=100)
+    created_at: Annotated[Optional[datetime], AfterValidator(to_naive_utc)] = None
+
+class ActivityBatch(BaseModel):
+    # Items are validated one by one so a bad item doesn't reject the batch
+    items: List[dict] = Field(..., min_length=1, max_length=500)
@@ -0,0 +1,74 @@
+"""Filters, sorts and pipelines for the queries the routers and services run.
+
+app.indexes explains these same builders, so changing a query here changes
+the shape whose plan is verified.
+"""
+from typing import Dict, Any, List, Optional
+from datetime import datetime, date, time, timedelta
+from pymongo import ASCENDING, DESCENDING
+
+ACTIVITY_SORT = [("created_at", DESCENDING)]
+ALERT_SORT = [("priority", ASCENDING), ("created_at", DESCENDING)]
+CHAT_SORT = [("created_at", DESCENDING)]
+DIGEST_SORT = [("date", DESCENDING)]
+ROLLUP_SORT = [("date", ASCENDING)]
+# Exports stream oldest first
+EXPORT_SORT = [("created_at", ASCENDING)]
+
+def active_farm(user_id: str) -> Dict[str, Any]:
+    return {"user_id": user_id, "is_active": True}
+
+def activities(user_id: str) -> Dict[str, Any]:
+    return {"user_id": user_id, "is_deleted": False}
+
+def activities_of_type_on(user_id: str, activity_type: str, day: datetime) -> Dict[str, Any]:
+    return {
+        **activities(user_id),
+        "created_at": {"$gte": day, "$lt": day + timedelta(days=1)},
+        "type": activity_type
+    }
+
+def rollups_between(user_id: str, start: date, end: date) -> Dict[str, Any]:
+    return {
+        "user_id": user_id,
+        "date": {"$gte": datetime.combine(start, time.min), "$lte": datetime.combine(end, time.min)}
+    }
+
+def chat_session(user_id: str, session_id: str) -> Dict[str, Any]:
+    return {"user_id": user_id, "session_id": session_id}
+
+def chat_history(user_id: str, session_id: Optional[str] = None) -> Dict[str, Any]:
+    query = {"user_id": user_id, "is_active": True}
+    if session_id:
+        query["session_id"] = session_id
+    return query
+
+def chat_export(user_id: str, fields: List[str]) -> List[Dict[str, Any]]:
+    """One record per message, unwound server-side"""
+    return [
+        {"$match": chat_history(user_id)},
+        {"$sort": dict(EXPORT_SORT)},
+        {"$unwind": "$messages"},
+        {"$project": {
+            "_id": 0,
+            "session_id": 1,
+            **{field: f"$messages.{field}" for field in fields if field != "session_id"}
+        }}
+    ]
+
+def alerts(user_id: str, type: Optional[str] = None, priority: Optional[str] = None,
+           unread_only: bool = False) -> Dict[str, Any]:
+    query = {"user_id": user_id, "is_active": True}
+    if type:
+        query["type"] = type
+    if priority:
+        query["priority"] = priority
+    if unread_only:
+        query["is_read"] = False
+    return query
+
+def cohort_digest(cohort: Dict[str, str], oldest: datetime) -> Dict[str, Any]:
+    return {**cohort, "date": {"$gte": oldest}}
+
+def digests_on(day: datetime) -> Dict[str, Any]:
+    return {"date": day}
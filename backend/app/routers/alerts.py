@@ -1,20 +1,26 @@
 from fastapi import APIRouter, HTTPException, Depends, Query
 from typing import Optional
-from app.models.alert import Alert, AlertCreate
+from app.models.alert import Alert, AlertCreate, RegionalAlertCreate, ALERT_FIELDS, ALERT_LIST_FIELDS
+from app.core.projection import build_projection
 from app.database import get_database
-from app.middleware.auth import get_current_user_id
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+from app import queries
+from app.core.responses import MongoJSONResponse
+from app.core.etag import make_etag, etag_matches, not_modified, conditional_response
+from app.middleware.auth import get_current_user_id, require_admin
+from app.services.geo_service import geo_service
+from app.services.alert_version_service import alert_version_service
 from fastapi import Request
+from app.core.rate_limit import (
+    limiter, DELETE_LIMIT, HEAVY_LIMIT, READ_LIMIT, WRITE_LIMIT
+)
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
-limiter = Limiter(key_func=get_remote_address)
 
 @router.get("/")
-@limiter.limit("30/minute")
+@limiter.limit(READ_LIMIT)
 async def get_alerts(
     request: Request,
     page: int = Query(1, ge=1),
@@ -22,34 +28,37 @@ async def get_alerts(
     type: Optional[str] = Query(None),
     priority: Optional[str] = Query(None),
     unread_only: bool = Query(False),
+    fields: Optional[str] = Query(None),
     user_id: str = Depends(get_current_user_id),
     db = Depends(get_database)
 ):
     """Get alerts"""
     try:
-        skip = (page - 1) * limit
+        try:
+            projection = build_projection(fields, ALERT_FIELDS, ALERT_LIST_FIELDS)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        # Revalidation only needs the user's alert version, not the list; first loads
+        # are tagged by content and get the version tag on their first revalidation
+        etag = None
+        if request.headers.get("if-none-match"):
+            version = await alert_version_service.get(db, user_id)
+            etag = make_etag("alerts", user_id, version, page, limit, type, priority, unread_only, fields)
+            if etag_matches(request, etag):
+                return not_modified(etag)
         
-        query = {"user_id": user_id, "is_active": True}
-        if type:
-            query["type"] = type
-        if priority:
-            query["priority"] = priority
-        if unread_only:
-            query["is_read"] = False
+        skip = (page - 1) * limit
         
-        alerts = await db.alerts.find(query).sort([
-            ("priority", 1),  # High priority first (assuming high=1, medium=2, low=3)
-            ("created_at", -1)
-        ]).skip(skip).limit(limit).to_list(length=limit)
+        query = queries.alerts(user_id, type, priority, unread_only)
+        alerts = await db.alerts.find(query, projection).sort(
+            queries.ALERT_SORT
+        ).skip(skip).limit(limit).to_list(length=limit)
         
         total = await db.alerts.count_documents(query)
-        unread_count = await db.alerts.count_documents({
-            "user_id": user_id,
-            "is_active": True,
-            "is_read": False
-        })
+        unread_count = await db.alerts.count_documents(queries.alerts(user_id, unread_only=True))
         
-        return {
+        return conditional_response(request, {
             "success": True,
             "data": alerts,
             "unread_count": unread_count,
@@ -59,13 +68,15 @@ async def get_alerts(
                 "total": total,
                 "pages": (total + limit - 1) // limit
             }
-        }
+        }, etag)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Get alerts error: {e}")
         raise HTTPException(status_code=500, detail="Server error")
 
 @router.patch("/{alert_id}/read")
-@limiter.limit("30/minute")
+@limiter.limit(WRITE_LIMIT)
 async def mark_alert_as_read(
     request: Request,
     alert_id: str,
@@ -78,19 +89,20 @@ async def mark_alert_as_read(
         
         result = await db.alerts.update_one(
             {"_id": ObjectId(alert_id), "user_id": user_id, "is_active": True},
-            {"$set": {"is_read": True}}
+            {"$set": {"is_read": True, "updated_at": datetime.utcnow()}}
         )
         
         if result.matched_count == 0:
             raise HTTPException(status_code=404, detail="Alert not found")
+        await alert_version_service.bump(db, [user_id])
         
-        return {"success": True, "message": "Alert marked as read"}
+        return MongoJSONResponse({"success": True, "message": "Alert marked as read"})
     except Exception as e:
         logger.error(f"Mark alert as read error: {e}")
         raise HTTPException(status_code=500, detail="Server error")
 
 @router.patch("/read-all")
-@limiter.limit("10/minute")
+@limiter.limit(WRITE_LIMIT)
 async def mark_all_alerts_as_read(
     request: Request,
     user_id: str = Depends(get_current_user_id),
@@ -98,18 +110,20 @@ async def mark_all_alerts_as_read(
 ):
     """Mark all alerts as read"""
     try:
-        await db.alerts.update_many(
+        result = await db.alerts.update_many(
             {"user_id": user_id, "is_active": True, "is_read": False},
-            {"$set": {"is_read": True}}
+            {"$set": {"is_read": True, "updated_at": datetime.utcnow()}}
         )
+        if result.modified_count:
+            await alert_version_service.bump(db, [user_id])
         
-        return {"success": True, "message": "All alerts marked as read"}
+        return MongoJSONResponse({"success": True, "message": "All alerts marked as read"})
     except Exception as e:
         logger.error(f"Mark all alerts as read error: {e}")
         raise HTTPException(status_code=500, detail="Server error")
 
 @router.post("/generate")
-@limiter.limit("5/minute")
+@limiter.limit(HEAVY_LIMIT)
 async def generate_alerts(
     request: Request,
     user_id: str = Depends(get_current_user_id),
@@ -118,7 +132,10 @@ async def generate_alerts(
     """Generate alerts for user"""
     try:
         # Get user's farm data
-        farm = await db.farms.find_one({"user_id": user_id, "is_active": True})
+        farm = await db.farms.find_one(
+            queries.active_farm(user_id),
+            {"location": 1, "current_crop": 1}
+        )
         if not farm:
             raise HTTPException(status_code=404, detail="Farm profile not found")
         
@@ -159,26 +176,90 @@ async def generate_alerts(
                 "crop": crop
             })
         
-        # Insert alerts
+        # Insert alerts; insert_many sets _id on each document in place
         if alerts_to_create:
-            result = await db.alerts.insert_many(alerts_to_create)
-            created_alerts = await db.alerts.find({
-                "_id": {"$in": result.inserted_ids}
-            }).to_list(length=len(result.inserted_ids))
+            now = datetime.utcnow()
+            for alert in alerts_to_create:
+                alert.update({
+                    "is_read": False,
+                    "is_active": True,
+                    "expires_at": now + timedelta(days=7),
+                    "created_at": now,
+                    "updated_at": now
+                })
+            await db.alerts.insert_many(alerts_to_create)
+            await alert_version_service.bump(db, [user_id])
             
-            return {
+            return MongoJSONResponse({
                 "success": True,
-                "message": f"Generated {len(created_alerts)} alerts",
-                "data": created_alerts
-            }
+                "message": f"Generated {len(alerts_to_create)} alerts",
+                "data": alerts_to_create
+            })
         
-        return {"success": True, "message": "No new alerts to generate"}
+        return MongoJSONResponse({"success": True, "message": "No new alerts to generate"})
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Generate alerts error: {e}")
         raise HTTPException(status_code=500, detail="Server error")
 
+@router.post("/regional", dependencies=[Depends(require_admin)])
+@limiter.limit(HEAVY_LIMIT)
+async def create_regional_alert(
+    request: Request,
+    alert_data: RegionalAlertCreate,
+    db = Depends(get_database)
+):
+    """Send an alert to every farm inside a region"""
+    try:
+        region = alert_data.region.model_dump()
+        try:
+            geo_service.region_filter(**region)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        alert_fields = alert_data.model_dump(exclude={"region", "expires_in_hours"})
+        now = datetime.utcnow()
+        expires_at = now + timedelta(hours=alert_data.expires_in_hours)
+        
+        # One indexed geo query; insert in batches as the cursor is consumed
+        sent = 0
+        batch = []
+        async for farm in geo_service.find_farms(db, region):
+            batch.append({
+                **alert_fields,
+                "user_id": farm["user_id"],
+                "location": alert_fields.get("location") or farm.get("location"),
+                "crop": alert_fields.get("crop") or farm.get("current_crop"),
+                "is_read": False,
+                "is_active": True,
+                "expires_at": expires_at,
+                "created_at": now,
+                "updated_at": now
+            })
+            if len(batch) >= 500:
+                await db.alerts.insert_many(batch, ordered=False)
+                await alert_version_service.bump(db, (alert["user_id"] for alert in batch))
+                sent += len(batch)
+                batch = []
+        if batch:
+            await db.alerts.insert_many(batch, ordered=False)
+            await alert_version_service.bump(db, (alert["user_id"] for alert in batch))
+            sent += len(batch)
+        
+        return MongoJSONResponse({
+            "success": True,
+            "message": f"Sent alert to {sent} farms",
+            "data": {"sent": sent}
+        })
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Create regional alert error: {e}")
+        raise HTTPException(status_code=500, detail="Server error")
+
 @router.delete("/{alert_id}")
-@limiter.limit("10/minute")
+@limiter.limit(DELETE_LIMIT)
 async def delete_alert(
     request: Request,
     alert_id: str,
@@ -191,13 +272,14 @@ async def delete_alert(
         
         result = await db.alerts.update_one(
             {"_id": ObjectId(alert_id), "user_id": user_id, "is_active": True},
-            {"$set": {"is_active": False}}
+            {"$set": {"is_active": False, "updated_at": datetime.utcnow()}}
         )
         
         if result.matched_count == 0:
             raise HTTPException(status_code=404, detail="Alert not found")
+        await alert_version_service.bump(db, [user_id])
         
-        return {"success": True, "message": "Alert deleted successfully"}
+        return MongoJSONResponse({"success": True, "message": "Alert deleted successfully"})
     except Exception as e:
         logger.error(f"Delete alert error: {e}")
         raise HTTPException(status_code=500, detail="Server error")
\ No newline at end of file
@@ -1,149 +1,207 @@
-from fastapi import APIRouter, HTTPException, Depends
-from app.models.chat import ChatRequest, ChatResponse, Message
+from fastapi import APIRouter, HTTPException, Depends, Header, Query
+from app.models.chat import ChatRequest, ChatResponse, Message, MESSAGE_FIELDS, MESSAGE_LIST_FIELDS
+from app.core.projection import build_projection
+from typing import Optional
 from app.database import get_database
+from app import queries
+from app.core.responses import MongoJSONResponse
+from app.core.etag import conditional_response
 from app.middleware.auth import get_current_user_id
 from app.services.llm_service import granite_service
 from app.services.translation_service import translation_service
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+from app.services.farm_service import farm_service
+from app.services.advisory_service import advisory_service, AdvisoryResult
+from app.services.digest_service import digest_service
+from app.services.idempotency_service import idempotency_service, IdempotencyConflict, IdempotencyInProgress
 from fastapi import Request
+from app.core.rate_limit import limiter, HEAVY_LIMIT, LLM_LIMIT, READ_LIMIT
+from app.core.scheduling import llm_scheduler
+from app.core.tracing import span
+import heapq
 import uuid
 import logging
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
-limiter = Limiter(key_func=get_remote_address)
 
 @router.get("/history")
-@limiter.limit("30/minute")
+@limiter.limit(READ_LIMIT)
 async def get_chat_history(
     request: Request,
     session_id: str = None,
+    fields: Optional[str] = Query(None),
     user_id: str = Depends(get_current_user_id),
     db = Depends(get_database)
 ):
     """Get chat history"""
     try:
-        query = {"user_id": user_id, "is_active": True}
-        if session_id:
-            query["session_id"] = session_id
-        
-        chats = await db.chats.find(query).sort("created_at", -1).limit(10).to_list(length=10)
+        try:
+            projection = build_projection(fields, MESSAGE_FIELDS, MESSAGE_LIST_FIELDS, prefix="messages.")
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        # Messages are sorted by timestamp, so always fetch it
+        projection["messages.timestamp"] = 1
+        projection["_id"] = 0
         
-        # Flatten messages from all chat sessions
-        messages = []
-        for chat in chats:
-            messages.extend(chat.get("messages", []))
+        chats = await db.chats.find(
+            queries.chat_history(user_id, session_id), projection
+        ).sort(queries.CHAT_SORT).limit(10).to_list(length=10)
         
-        # Sort messages by timestamp
-        messages.sort(key=lambda x: x.get("timestamp", datetime.min))
+        # Each session's messages are stored in order, so merge them instead of re-sorting
+        messages = list(heapq.merge(
+            *(chat.get("messages", []) for chat in chats),
+            key=lambda x: x.get("timestamp", datetime.min)
+        ))
         
-        return {"success": True, "data": messages}
+        return conditional_response(request, {"success": True, "data": messages})
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Get chat history error: {e}")
         raise HTTPException(status_code=500, detail="Server error")
 
 @router.post("/message")
-@limiter.limit("20/minute")
+@limiter.limit(LLM_LIMIT)
 async def send_message(
     request: Request,
     chat_request: ChatRequest,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
     user_id: str = Depends(get_current_user_id),
     db = Depends(get_database)
 ):
     """Send message and get AI response"""
     try:
-        session_id = chat_request.session_id or str(uuid.uuid4())
-        
-        # Find or create chat session
-        chat = await db.chats.find_one({"user_id": user_id, "session_id": session_id})
-        if not chat:
-            chat = {
-                "user_id": user_id,
-                "session_id": session_id,
-                "messages": [],
-                "is_active": True,
-                "created_at": datetime.utcnow(),
-                "updated_at": datetime.utcnow()
-            }
-            await db.chats.insert_one(chat)
+        if not idempotency_key:
+            return MongoJSONResponse(await _process_message(chat_request, user_id, db))
         
-        # Get farm context for better AI responses
-        farm = await db.farms.find_one({"user_id": user_id, "is_active": True})
-        context = {}
-        if farm:
-            context = {
-                "current_crop": farm.get("current_crop"),
-                "soil_type": farm.get("soil_type"),
-                "location": farm.get("location")
-            }
+        # Client retries with the same key get the first response instead of another LLM call
+        try:
+            response, replayed = await idempotency_service.run(
+                db, "chat_message", user_id, idempotency_key,
+                fingerprint=idempotency_service.fingerprint(chat_request.model_dump()),
+                compute=lambda: _process_message(chat_request, user_id, db)
+            )
+        except IdempotencyConflict:
+            raise HTTPException(
+                status_code=422,
+                detail="Idempotency-Key was already used with a different request"
+            )
+        except IdempotencyInProgress:
+            raise HTTPException(
+                status_code=409,
+                detail="A request with this Idempotency-Key is still being processed"
+            )
         
-        # Detect language if not provided
-        if not chat_request.language or chat_request.language == "auto":
+        return MongoJSONResponse(response, headers={"Idempotent-Replayed": "true"} if replayed else None)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Send message error: {e}")
+        raise HTTPException(status_code=500, detail="Server error")
+
+async def _process_message(chat_request: ChatRequest, user_id: str, db) -> dict:
+    """Run the chat pipeline and store both messages; returns the response body"""
+    session_id = chat_request.session_id or str(uuid.uuid4())
+    
+    # Get farm context for better AI responses
+    with span("farm_context"):
+        context = await farm_service.get_context(db, user_id)
+    
+    # Detect language if not provided
+    if not chat_request.language or chat_request.language == "auto":
+        with span("detect_language"):
             detected_lang = await translation_service.detect_language(chat_request.message)
-            chat_request.language = detected_lang
-        
-        # Create user message
-        user_message = Message(
-            content=chat_request.message,
-            sender="user",
-            has_image=chat_request.has_image,
-            image_url=chat_request.image_url,
-            language=chat_request.language
-        )
-        
+        chat_request.language = detected_lang
+    
+    # Create user message
+    user_message = Message(
+        content=chat_request.message,
+        sender="user",
+        has_image=chat_request.has_image,
+        image_url=chat_request.image_url,
+        thumbnail_url=chat_request.thumbnail_url,
+        language=chat_request.language
+    )
+    
+    # "What should I do this week?" is answered from the farm's cohort digest;
+    # questions about a pest, symptom or another crop go on to the advisory lookup
+    digest = None
+    if digest_service.is_weekly_question(chat_request.message, context.get("current_crop")):
+        with span("digest"):
+            digest = await digest_service.get_for_farm(db, context)
+    
+    # Common questions are answered from the advisory index in either language
+    advisory = AdvisoryResult()
+    if not digest:
+        with span("advisory"):
+            advisory = advisory_service.lookup(chat_request.message, context.get("current_crop"))
+    
+    if digest:
+        ai_response_text = digest_service.text(digest, chat_request.language)
+    elif advisory.direct:
+        ai_response_text = advisory_service.answer(advisory.direct, chat_request.language)
+    else:
         # Translate message to English for AI processing if needed
         message_for_ai = chat_request.message
         if chat_request.language == "ml":
-            message_for_ai = await translation_service.translate_text(
-                chat_request.message, "ml", "en"
-            )
+            with span("translate_in"):
+                message_for_ai = await translation_service.translate_text(
+                    chat_request.message, "ml", "en"
+                )
+        
+        # Partial matches ground the LLM instead
+        if advisory.grounding:
+            context = {**context, "advisories": advisory_service.grounding_notes(advisory.grounding)}
         
-        # Generate AI response
-        ai_response_text = await granite_service.generate_response(message_for_ai, context)
+        # Generate AI response, sharing Granite capacity fairly across users
+        with span("llm"):
+            async with llm_scheduler.slot(user_id):
+                ai_response_text = await granite_service.generate_response(message_for_ai, context)
         
         # Translate AI response back to user's language if needed
         if chat_request.language == "ml":
-            ai_response_text = await translation_service.translate_text(
-                ai_response_text, "en", "ml"
-            )
-        
-        # Create AI message
-        ai_message = Message(
-            content=ai_response_text,
-            sender="ai",
-            language=chat_request.language
-        )
-        
-        # Update chat session
+            with span("translate_out"):
+                ai_response_text = await translation_service.translate_text(
+                    ai_response_text, "en", "ml"
+                )
+    
+    # Create AI message
+    ai_message = Message(
+        content=ai_response_text,
+        sender="ai",
+        language=chat_request.language
+    )
+    
+    # Append to the chat session, creating it on first message
+    now = datetime.utcnow()
+    with span("save_messages"):
         await db.chats.update_one(
-            {"user_id": user_id, "session_id": session_id},
+            queries.chat_session(user_id, session_id),
             {
                 "$push": {
                     "messages": {
-                        "$each": [user_message.dict(), ai_message.dict()],
+                        "$each": [user_message.model_dump(), ai_message.model_dump()],
                         "$slice": -50  # Keep only last 50 messages
                     }
                 },
-                "$set": {"updated_at": datetime.utcnow()}
-            }
+                "$set": {"updated_at": now},
+                "$setOnInsert": {"is_active": True, "created_at": now}
+            },
+            upsert=True
         )
-        
-        return {
-            "success": True,
-            "data": {
-                "user_message": user_message,
-                "ai_message": ai_message,
-                "session_id": session_id
-            }
+    
+    return {
+        "success": True,
+        "data": {
+            "user_message": user_message.model_dump(),
+            "ai_message": ai_message.model_dump(),
+            "session_id": session_id
         }
-    except Exception as e:
-        logger.error(f"Send message error: {e}")
-        raise HTTPException(status_code=500, detail="Server error")
+    }
 
 @router.delete("/history")
-@limiter.limit("5/minute")
+@limiter.limit(HEAVY_LIMIT)
 async def clear_chat_history(
     request: Request,
     session_id: str = None,
@@ -155,15 +213,15 @@ async def clear_chat_history(
         if session_id:
             await db.chats.update_one(
                 {"user_id": user_id, "session_id": session_id},
-                {"$set": {"is_active": False}}
+                {"$set": {"is_active": False, "updated_at": datetime.utcnow()}}
             )
         else:
             await db.chats.update_many(
                 {"user_id": user_id},
-                {"$set": {"is_active": False}}
+                {"$set": {"is_active": False, "updated_at": datetime.utcnow()}}
             )
         
-        return {"success": True, "message": "Chat history cleared successfully"}
+        return MongoJSONResponse({"success": True, "message": "Chat history cleared successfully"})
     except Exception as e:
         logger.error(f"Clear chat history error: {e}")
         raise HTTPException(status_code=500, detail="Server error")
\ No newline at end of file
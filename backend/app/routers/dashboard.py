@@ -0,0 +1,43 @@
+from fastapi import APIRouter, HTTPException, Depends, Query
+from typing import Optional
+from app.database import get_database
+from app.core.responses import MongoJSONResponse
+from app.middleware.auth import get_current_user_id
+from fastapi import Request
+from app.core.rate_limit import limiter, READ_LIMIT
+from app.services.dashboard_service import dashboard_service
+import logging
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+@router.get("/")
+@limiter.limit(READ_LIMIT)
+async def get_dashboard(
+    request: Request,
+    sections: Optional[str] = Query(None),
+    items: int = Query(3, ge=1, le=20),
+    location: Optional[str] = Query(None),
+    user_id: str = Depends(get_current_user_id),
+    db = Depends(get_database)
+):
+    """Get the farm profile, weather, forecast, alerts and recent activities in one request"""
+    try:
+        try:
+            selected = dashboard_service.parse_sections(sections)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        result = await dashboard_service.load(db, user_id, selected, items, location)
+        
+        return MongoJSONResponse({
+            "success": True,
+            "data": result["data"],
+            "errors": result["errors"],
+            "partial": bool(result["errors"])
+        })
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Get dashboard error: {e}")
+        raise HTTPException(status_code=500, detail="Server error")
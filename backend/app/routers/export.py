@@ -0,0 +1,150 @@
+from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import StreamingResponse
+from app.database import get_database
+from app import queries
+from app.middleware.auth import get_current_user_id
+from app.core.config import settings
+from fastapi import Request
+from app.core.rate_limit import limiter, HEAVY_LIMIT
+from app.core.responses import dumps
+from datetime import datetime
+from typing import AsyncIterator, List
+import csv
+import io
+import logging
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+FORMAT_PATTERN = "^(ndjson|csv)$"
+
+ACTIVITY_FIELDS = ["_id", "type", "crop", "location", "notes", "created_at"]
+ALERT_FIELDS = ["_id", "type", "priority", "title", "message", "location", "crop", "is_read", "created_at"]
+CHAT_FIELDS = ["session_id", "id", "timestamp", "sender", "language", "content", "has_image", "image_url"]
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+async def _stream_ndjson(cursor, batch_size: int, name: str) -> AsyncIterator[bytes]:
+    """Yield documents as NDJSON, one chunk per batch.
+
+    The status is sent before the first document, so a failure mid-stream is
+    reported as a final {"error": ...} record.
+    """
+    lines = []
+    try:
+        async for document in cursor:
+            lines.append(dumps(document))
+            if len(lines) >= batch_size:
+                yield b"\n".join(lines) + b"\n"
+                lines = []
+    except Exception as e:
+        logger.error(f"Export {name} failed mid-stream: {e}")
+        lines.append(dumps({"error": "Export failed before completion", "complete": False}))
+    if lines:
+        yield b"\n".join(lines) + b"\n"
+
+async def _stream_csv(cursor, fields: List[str], batch_size: int, name: str) -> AsyncIterator[str]:
+    """Yield documents as CSV rows, one chunk per batch.
+
+    CSV has no room for an error record, so a failure mid-stream is re-raised
+    and the connection is dropped before the final chunk: clients see a
+    truncated body, not a short but valid file.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    rows = 0
+    try:
+        async for document in cursor:
+            writer.writerow([_csv_value(document.get(field)) for field in fields])
+            rows += 1
+            if rows >= batch_size:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+                rows = 0
+    except Exception as e:
+        logger.error(f"Export {name} failed mid-stream: {e}")
+        raise
+    yield buffer.getvalue()
+
+def _export_response(cursor, fields: List[str], format: str, name: str) -> StreamingResponse:
+    batch_size = settings.EXPORT_BATCH_SIZE
+    if format == "csv":
+        body = _stream_csv(cursor, fields, batch_size, name)
+        media_type = "text/csv"
+    else:
+        body = _stream_ndjson(cursor, batch_size, name)
+        media_type = "application/x-ndjson"
+
+    filename = f"{name}-{datetime.utcnow().strftime('%Y%m%d')}.{format}"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@router.get("/activities")
+@limiter.limit(HEAVY_LIMIT)
+async def export_activities(
+    request: Request,
+    format: str = Query("ndjson", pattern=FORMAT_PATTERN),
+    user_id: str = Depends(get_current_user_id),
+    db = Depends(get_database)
+):
+    """Export all activities"""
+    try:
+        cursor = db.activities.find(
+            queries.activities(user_id),
+            {field: 1 for field in ACTIVITY_FIELDS}
+        ).sort(queries.EXPORT_SORT).batch_size(settings.EXPORT_BATCH_SIZE)
+        
+        return _export_response(cursor, ACTIVITY_FIELDS, format, "activities")
+    except Exception as e:
+        logger.error(f"Export activities error: {e}")
+        raise HTTPException(status_code=500, detail="Server error")
+
+@router.get("/alerts")
+@limiter.limit(HEAVY_LIMIT)
+async def export_alerts(
+    request: Request,
+    format: str = Query("ndjson", pattern=FORMAT_PATTERN),
+    user_id: str = Depends(get_current_user_id),
+    db = Depends(get_database)
+):
+    """Export all alerts"""
+    try:
+        cursor = db.alerts.find(
+            queries.alerts(user_id),
+            {field: 1 for field in ALERT_FIELDS}
+        ).sort(queries.EXPORT_SORT).batch_size(settings.EXPORT_BATCH_SIZE)
+        
+        return _export_response(cursor, ALERT_FIELDS, format, "alerts")
+    except Exception as e:
+        logger.error(f"Export alerts error: {e}")
+        raise HTTPException(status_code=500, detail="Server error")
+
+@router.get("/chats")
+@limiter.limit(HEAVY_LIMIT)
+async def export_chat_history(
+    request: Request,
+    format: str = Query("ndjson", pattern=FORMAT_PATTERN),
+    user_id: str = Depends(get_current_user_id),
+    db = Depends(get_database)
+):
+    """Export chat history, one record per message"""
+    try:
+        # Unwind sessions server-side so each message streams as its own record
+        cursor = db.chats.aggregate(
+            queries.chat_export(user_id, CHAT_FIELDS), batchSize=settings.EXPORT_BATCH_SIZE
+        )
+        
+        return _export_response(cursor, CHAT_FIELDS, format, "chat-history")
+    except Exception as e:
+        logger.error(f"Export chat history error: {e}")
+        raise HTTPException(status_code=500, detail="Server error")
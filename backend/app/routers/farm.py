@@ -1,19 +1,31 @@
 from fastapi import APIRouter, HTTPException, Depends, Query
 from typing import List, Optional
-from app.models.farm import Farm, FarmCreate, FarmUpdate, Activity, ActivityCreate
+from app.models.farm import (
+    Farm, FarmCreate, FarmUpdate, Activity, ActivityCreate, ActivityBatch, ActivityBatchItem,
+    FARM_PROFILE_FIELDS, ACTIVITY_FIELDS, ACTIVITY_LIST_FIELDS
+)
+from app.core.projection import build_projection
 from app.database import get_database
+from app import queries
+from app.core.responses import MongoJSONResponse
+from app.core.etag import make_etag, etag_matches, not_modified, conditional_response
 from app.middleware.auth import get_current_user_id
-from slowapi import Limiter
-from slowapi.util import get_remote_address
 from fastapi import Request
+from app.core.rate_limit import limiter, DELETE_LIMIT, READ_LIMIT, WRITE_LIMIT
+from app.services.analytics_service import analytics_service
+from app.services.farm_service import farm_service
+from app.services.digest_service import digest_service
+from pydantic import ValidationError
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 import logging
+from datetime import datetime, date, timedelta
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
-limiter = Limiter(key_func=get_remote_address)
 
 @router.get("/profile")
-@limiter.limit("30/minute")
+@limiter.limit(READ_LIMIT)
 async def get_farm_profile(
     request: Request,
     user_id: str = Depends(get_current_user_id),
@@ -21,17 +33,66 @@ async def get_farm_profile(
 ):
     """Get farm profile"""
     try:
-        farm = await db.farms.find_one({"user_id": user_id, "is_active": True})
+        query = queries.active_farm(user_id)
+        
+        # Revalidation only needs the version, not the whole profile
+        if request.headers.get("if-none-match"):
+            version = await db.farms.find_one(query, {"updated_at": 1})
+            if version:
+                etag = make_etag("farm", version["_id"], version.get("updated_at"))
+                if etag_matches(request, etag):
+                    return not_modified(etag)
+        
+        farm = await db.farms.find_one(query, {field: 1 for field in FARM_PROFILE_FIELDS})
         if not farm:
             raise HTTPException(status_code=404, detail="Farm profile not found")
         
-        return {"success": True, "data": farm}
+        etag = make_etag("farm", farm["_id"], farm.get("updated_at"))
+        return conditional_response(request, {"success": True, "data": farm}, etag)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Get farm profile error: {e}")
         raise HTTPException(status_code=500, detail="Server error")
 
+@router.get("/digest")
+@limiter.limit(READ_LIMIT)
+async def get_farm_digest(
+    request: Request,
+    language: str = Query("en", pattern="^(en|ml)$"),
+    user_id: str = Depends(get_current_user_id),
+    db = Depends(get_database)
+):
+    """Get today's advisory digest for the farm's crop, soil and district"""
+    try:
+        context = await farm_service.get_context(db, user_id)
+        if not context:
+            raise HTTPException(status_code=404, detail="Farm profile not found")
+        
+        digest = await digest_service.get_for_farm(db, context)
+        if not digest:
+            raise HTTPException(status_code=404, detail="No digest available for this farm yet")
+        
+        return conditional_response(request, {
+            "success": True,
+            "data": {
+                "crop": digest["crop"],
+                "soil_type": digest["soil_type"],
+                "district": digest["district"],
+                "date": digest["date"],
+                "language": language if language in digest["text"] else "en",
+                "text": digest_service.text(digest, language),
+                "forecast_summary": digest.get("forecast_summary")
+            }
+        })
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Get farm digest error: {e}")
+        raise HTTPException(status_code=500, detail="Server error")
+
 @router.post("/profile")
-@limiter.limit("10/minute")
+@limiter.limit(WRITE_LIMIT)
 async def create_farm_profile(
     request: Request,
     farm_data: FarmCreate,
@@ -40,51 +101,61 @@ async def create_farm_profile(
 ):
     """Create or update farm profile"""
     try:
-        # Check if farm already exists
-        existing_farm = await db.farms.find_one({"user_id": user_id})
-        
-        farm_dict = farm_data.dict()
+        farm_dict = farm_data.model_dump()
         farm_dict["user_id"] = user_id
+        now = datetime.utcnow()
+        
+        # Upsert and read back in a single round trip; a deactivated farm is left
+        # alone and the user gets a new active one
+        upsert = lambda: db.farms.find_one_and_update(
+            queries.active_farm(user_id),
+            {
+                "$set": {**farm_dict, "updated_at": now},
+                "$setOnInsert": {"is_active": True, "created_at": now}
+            },
+            projection={field: 1 for field in FARM_PROFILE_FIELDS},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        try:
+            farm = await upsert()
+        except DuplicateKeyError:
+            # A concurrent first save inserted the farm; this one now matches and updates it
+            farm = await upsert()
+        await farm_service.invalidate(user_id)
         
-        if existing_farm:
-            # Update existing farm
-            await db.farms.update_one(
-                {"user_id": user_id},
-                {"$set": {**farm_dict, "updated_at": datetime.utcnow()}}
-            )
-            farm = await db.farms.find_one({"user_id": user_id})
-        else:
-            # Create new farm
-            result = await db.farms.insert_one(farm_dict)
-            farm = await db.farms.find_one({"_id": result.inserted_id})
-        
-        return {"success": True, "message": "Farm profile saved successfully", "data": farm}
+        return MongoJSONResponse({"success": True, "message": "Farm profile saved successfully", "data": farm})
     except Exception as e:
         logger.error(f"Save farm profile error: {e}")
         raise HTTPException(status_code=500, detail="Server error")
 
 @router.get("/activities")
-@limiter.limit("30/minute")
+@limiter.limit(READ_LIMIT)
 async def get_activities(
     request: Request,
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
+    fields: Optional[str] = Query(None),
     user_id: str = Depends(get_current_user_id),
     db = Depends(get_database)
 ):
     """Get farm activities"""
     try:
+        try:
+            projection = build_projection(fields, ACTIVITY_FIELDS, ACTIVITY_LIST_FIELDS)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
         skip = (page - 1) * limit
         
-        activities = await db.activities.find(
-            {"user_id": user_id, "is_deleted": False}
-        ).sort("created_at", -1).skip(skip).limit(limit).to_list(length=limit)
+        query = queries.activities(user_id)
+        activities = await db.activities.find(query, projection).sort(
+            queries.ACTIVITY_SORT
+        ).skip(skip).limit(limit).to_list(length=limit)
         
-        total = await db.activities.count_documents(
-            {"user_id": user_id, "is_deleted": False}
-        )
+        total = await db.activities.count_documents(query)
         
-        return {
+        return MongoJSONResponse({
             "success": True,
             "data": activities,
             "pagination": {
@@ -93,13 +164,40 @@ async def get_activities(
                 "total": total,
                 "pages": (total + limit - 1) // limit
             }
-        }
+        })
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Get activities error: {e}")
         raise HTTPException(status_code=500, detail="Server error")
 
+@router.get("/analytics")
+@limiter.limit(READ_LIMIT)
+async def get_activity_analytics(
+    request: Request,
+    start: Optional[date] = Query(None),
+    end: Optional[date] = Query(None),
+    user_id: str = Depends(get_current_user_id),
+    db = Depends(get_database)
+):
+    """Get activity counts by type and crop from daily rollups"""
+    try:
+        end = end or datetime.utcnow().date()
+        start = start or end - timedelta(days=30)
+        if start > end:
+            raise HTTPException(status_code=400, detail="start must not be after end")
+        
+        summary = await analytics_service.get_summary(db, user_id, start, end)
+        
+        return MongoJSONResponse({"success": True, "data": summary})
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Get activity analytics error: {e}")
+        raise HTTPException(status_code=500, detail="Server error")
+
 @router.post("/activities")
-@limiter.limit("20/minute")
+@limiter.limit(WRITE_LIMIT)
 async def add_activity(
     request: Request,
     activity_data: ActivityCreate,
@@ -109,28 +207,116 @@ async def add_activity(
     """Add farm activity"""
     try:
         # Get user's farm
-        farm = await db.farms.find_one({"user_id": user_id, "is_active": True})
+        farm = await db.farms.find_one(queries.active_farm(user_id), {"_id": 1})
         if not farm:
             raise HTTPException(status_code=404, detail="Farm profile not found")
         
-        activity_dict = activity_data.dict()
-        activity_dict["user_id"] = user_id
-        activity_dict["farm_id"] = farm["_id"]
+        activity = activity_data.model_dump()
+        activity["user_id"] = user_id
+        activity["farm_id"] = farm["_id"]
+        activity["is_deleted"] = False
+        activity["created_at"] = datetime.utcnow()
         
-        result = await db.activities.insert_one(activity_dict)
-        activity = await db.activities.find_one({"_id": result.inserted_id})
+        # insert_one sets _id on the document, so no read-back is needed
+        await db.activities.insert_one(activity)
+        await analytics_service.record(db, [activity])
         
-        return {
+        return MongoJSONResponse({
             "success": True,
             "message": "Activity added successfully",
             "data": activity
-        }
+        })
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Add activity error: {e}")
         raise HTTPException(status_code=500, detail="Server error")
 
+@router.post("/activities/batch")
+@limiter.limit(WRITE_LIMIT)
+async def add_activities_batch(
+    request: Request,
+    batch: ActivityBatch,
+    user_id: str = Depends(get_current_user_id),
+    db = Depends(get_database)
+):
+    """Add a batch of activities recorded offline"""
+    try:
+        # Resolve the farm once for the whole batch
+        farm = await db.farms.find_one(queries.active_farm(user_id), {"_id": 1})
+        if not farm:
+            raise HTTPException(status_code=404, detail="Farm profile not found")
+        
+        now = datetime.utcnow()
+        results = []
+        activities = []
+        positions = []
+        seen_keys = set()
+        
+        for index, item in enumerate(batch.items):
+            result = {"index": index, "idempotency_key": item.get("idempotency_key")}
+            results.append(result)
+            
+            try:
+                activity_data = ActivityBatchItem(**item)
+            except ValidationError as e:
+                result.update({"status": "invalid", "errors": e.errors(include_url=False, include_context=False)})
+                continue
+            
+            if activity_data.idempotency_key in seen_keys:
+                result["status"] = "duplicate"
+                continue
+            seen_keys.add(activity_data.idempotency_key)
+            
+            activity = activity_data.model_dump()
+            activity["user_id"] = user_id
+            activity["farm_id"] = farm["_id"]
+            activity["is_deleted"] = False
+            # Keep the time the activity was recorded offline, but never in the future
+            activity["created_at"] = min(activity["created_at"] or now, now)
+            activities.append(activity)
+            positions.append(index)
+            result["status"] = "created"
+        
+        if activities:
+            write_errors = []
+            try:
+                # Unordered so one duplicate doesn't stop the rest of the batch
+                await db.activities.insert_many(activities, ordered=False)
+            except BulkWriteError as e:
+                write_errors = e.details.get("writeErrors", [])
+            
+            for activity, index in zip(activities, positions):
+                results[index]["id"] = activity.get("_id")
+            for error in write_errors:
+                result = results[positions[error["index"]]]
+                result["id"] = None
+                # Unique index on (user_id, idempotency_key) rejects replays
+                result["status"] = "duplicate" if error.get("code") == 11000 else "error"
+            
+            await analytics_service.record(db, [
+                activity for activity, index in zip(activities, positions)
+                if results[index]["status"] == "created"
+            ])
+        
+        summary = {"created": 0, "duplicate": 0, "invalid": 0, "error": 0}
+        for result in results:
+            summary[result["status"]] += 1
+        
+        return MongoJSONResponse({
+            "success": summary["invalid"] == 0 and summary["error"] == 0,
+            "message": f"Synced {summary['created']} activities",
+            "summary": summary,
+            "data": results
+        })
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Add activities batch error: {e}")
+        raise HTTPException(status_code=500, detail="Server error")
+
 @router.delete("/activities/{activity_id}")
-@limiter.limit("10/minute")
+@limiter.limit(DELETE_LIMIT)
 async def delete_activity(
     request: Request,
     activity_id: str,
@@ -141,15 +327,20 @@ async def delete_activity(
     try:
         from bson import ObjectId
         
-        result = await db.activities.update_one(
-            {"_id": ObjectId(activity_id), "user_id": user_id},
-            {"$set": {"is_deleted": True}}
+        activity = await db.activities.find_one_and_update(
+            {"_id": ObjectId(activity_id), "user_id": user_id, "is_deleted": False},
+            {"$set": {"is_deleted": True, "deleted_at": datetime.utcnow()}},
+            projection={"user_id": 1, "type": 1, "crop": 1, "created_at": 1}
         )
         
-        if result.matched_count == 0:
+        if not activity:
             raise HTTPException(status_code=404, detail="Activity not found")
         
-        return {"success": True, "message": "Activity deleted successfully"}
+        await analytics_service.record(db, [activity], delta=-1)
+        
+        return MongoJSONResponse({"success": True, "message": "Activity deleted successfully"})
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Delete activity error: {e}")
         raise HTTPException(status_code=500, detail="Server error")
\ No newline at end of file
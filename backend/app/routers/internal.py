@@ -0,0 +1,163 @@
+from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import PlainTextResponse
+from typing import Optional
+from app.core.config import settings
+from app.core.db_metrics import mongo_metrics
+from app.core.tracing import slow_traces
+from app.core.admission import limiters
+from app.core.profiling import sampling_profiler, request_profiles, ProfilerBusy
+from app.core.loop_monitor import loop_monitor
+from app.middleware.auth import require_admin
+from app.database import get_database
+from app.services.archive_service import archive_service
+import asyncio
+import os
+import threading
+from app.core.responses import MongoJSONResponse
+import logging
+
+logger = logging.getLogger(__name__)
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+@router.get("/metrics/db")
+async def get_db_metrics():
+    """Get MongoDB pool and command latency statistics for this worker"""
+    try:
+        return MongoJSONResponse({
+            "success": True,
+            "data": {
+                "pid": os.getpid(),
+                "pool_options": {
+                    "max_pool_size": settings.MONGODB_MAX_POOL_SIZE,
+                    "min_pool_size": settings.MONGODB_MIN_POOL_SIZE,
+                    "wait_queue_timeout_ms": settings.MONGODB_WAIT_QUEUE_TIMEOUT_MS
+                },
+                **mongo_metrics.snapshot()
+            }
+        })
+    except Exception as e:
+        logger.error(f"Get db metrics error: {e}")
+        raise HTTPException(status_code=500, detail="Server error")
+
+@router.get("/traces")
+async def get_slow_traces(
+    limit: int = Query(50, ge=1, le=500),
+    route: Optional[str] = Query(None)
+):
+    """Get the slowest recent requests on this worker, newest first"""
+    try:
+        return MongoJSONResponse({
+            "success": True,
+            "data": {
+                "pid": os.getpid(),
+                "threshold_ms": settings.TRACE_SLOW_THRESHOLD_MS,
+                "traces": slow_traces.snapshot(limit, route)
+            }
+        })
+    except Exception as e:
+        logger.error(f"Get slow traces error: {e}")
+        raise HTTPException(status_code=500, detail="Server error")
+
+@router.get("/admission")
+async def get_admission_limits():
+    """Get the current concurrency limit and load of each endpoint class"""
+    try:
+        return MongoJSONResponse({
+            "success": True,
+            "data": {
+                "pid": os.getpid(),
+                "enabled": settings.ADMISSION_CONTROL_ENABLED,
+                "classes": {name: limiter.snapshot() for name, limiter in limiters.items()}
+            }
+        })
+    except Exception as e:
+        logger.error(f"Get admission limits error: {e}")
+        raise HTTPException(status_code=500, detail="Server error")
+
+@router.get("/loop")
+async def get_loop_health():
+    """Get event loop lag percentiles and the last detected blocking stack"""
+    try:
+        return MongoJSONResponse({
+            "success": True,
+            "data": {"pid": os.getpid(), **loop_monitor.snapshot()}
+        })
+    except Exception as e:
+        logger.error(f"Get loop health error: {e}")
+        raise HTTPException(status_code=500, detail="Server error")
+
+@router.get("/archive")
+async def get_archive_summary(db = Depends(get_database)):
+    """Get archived document counts and compressed sizes per collection"""
+    try:
+        return MongoJSONResponse({"success": True, "data": await archive_service.summary(db)})
+    except Exception as e:
+        logger.error(f"Get archive summary error: {e}")
+        raise HTTPException(status_code=500, detail="Server error")
+
+@router.get("/profile")
+async def sample_profile(
+    seconds: float = Query(10, gt=0),
+    interval_ms: float = Query(5, ge=1, le=1000),
+    format: str = Query("collapsed", pattern="^(collapsed|speedscope)$"),
+    threads: str = Query("loop", pattern="^(loop|all)$"),
+    idle: bool = Query(False)
+):
+    """Sample this worker's stacks for a number of seconds.
+
+    Returns collapsed stacks (one "frame;frame;... count" line per stack) or a
+    speedscope profile. Only the event loop thread is sampled unless
+    threads=all; samples of the loop waiting for I/O are dropped unless idle.
+    """
+    try:
+        if not settings.PROFILER_ENABLED:
+            raise HTTPException(status_code=403, detail="Profiler is disabled")
+        if seconds > settings.PROFILER_MAX_SECONDS:
+            raise HTTPException(status_code=400, detail=f"seconds must be at most {settings.PROFILER_MAX_SECONDS}")
+        
+        # Sample from a worker thread while the loop keeps serving traffic
+        loop_thread = threading.get_ident() if threads == "loop" else None
+        try:
+            profile = await asyncio.to_thread(
+                sampling_profiler.run, seconds, interval_ms / 1000, loop_thread, idle
+            )
+        except ProfilerBusy:
+            raise HTTPException(status_code=409, detail="A profile is already running on this worker")
+        
+        headers = {"X-Worker-Pid": str(os.getpid()), "X-Profile-Samples": str(profile.samples)}
+        if format == "speedscope":
+            name = f"pid {os.getpid()} {profile.started_at.isoformat()} ({seconds:g}s)"
+            return MongoJSONResponse(profile.speedscope(name), headers=headers)
+        return PlainTextResponse(profile.collapsed(), headers=headers)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Sample profile error: {e}")
+        raise HTTPException(status_code=500, detail="Server error")
+
+@router.get("/profile/requests")
+async def list_request_profiles():
+    """List recent single-request profiles on this worker, newest first"""
+    try:
+        return MongoJSONResponse({
+            "success": True,
+            "data": {"pid": os.getpid(), "profiles": request_profiles.list()}
+        })
+    except Exception as e:
+        logger.error(f"List request profiles error: {e}")
+        raise HTTPException(status_code=500, detail="Server error")
+
+@router.get("/profile/requests/{profile_id}")
+async def get_request_profile(profile_id: int):
+    """Get the cProfile report of a request sent with X-Debug-Profile"""
+    try:
+        profile = request_profiles.get(profile_id)
+        if not profile:
+            raise HTTPException(status_code=404, detail="Profile not found on this worker")
+        
+        return PlainTextResponse(profile["report"])
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Get request profile error: {e}")
+        raise HTTPException(status_code=500, detail="Server error")
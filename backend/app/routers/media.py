@@ -0,0 +1,48 @@
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.staticfiles import StaticFiles
+from app.database import get_database
+from app.core.responses import MongoJSONResponse
+from app.middleware.auth import get_current_user_id
+from app.core.config import settings
+from app.services.media_service import media_service, InvalidUpload, UploadTooLarge
+from fastapi import Request
+from app.core.rate_limit import limiter, WRITE_LIMIT
+import logging
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+class MediaFiles(StaticFiles):
+    """Serve stored images; their URLs embed the content hash, so they never change"""
+
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
+
+@router.post("/images")
+@limiter.limit(WRITE_LIMIT)
+async def upload_image(
+    request: Request,
+    user_id: str = Depends(get_current_user_id),
+    db = Depends(get_database)
+):
+    """Upload an image as the "file" field of a multipart form"""
+    try:
+        try:
+            upload = await media_service.receive(request)
+            image = await media_service.store_image(db, upload, user_id)
+        except UploadTooLarge:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Images are limited to {settings.MEDIA_MAX_UPLOAD_BYTES // (1024 * 1024)} MB"
+            )
+        except InvalidUpload as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        return MongoJSONResponse({"success": True, "data": image})
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Upload image error: {e}")
+        raise HTTPException(status_code=500, detail="Server error")
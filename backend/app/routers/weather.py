@@ -1,16 +1,20 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Depends, Query
 from app.services.weather_service import weather_service
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+from app.services.geo_service import geo_service
+from app.models.alert import Region
+from app.database import get_database
+from app.middleware.auth import require_admin
+from app.core.responses import MongoJSONResponse
 from fastapi import Request
+from app.core.rate_limit import limiter, EXTERNAL_LIMIT, HEAVY_LIMIT
+from app.core.etag import conditional_response
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
-limiter = Limiter(key_func=get_remote_address)
 
 @router.get("/current")
-@limiter.limit("60/minute")
+@limiter.limit(EXTERNAL_LIMIT)
 async def get_current_weather(
     request: Request,
     location: str = Query(None),
@@ -30,13 +34,13 @@ async def get_current_weather(
         
         weather_data = await weather_service.get_current_weather(location)
         
-        return {"success": True, "data": weather_data}
+        return conditional_response(request, {"success": True, "data": weather_data})
     except Exception as e:
         logger.error(f"Get weather data error: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch weather data")
 
 @router.get("/forecast")
-@limiter.limit("30/minute")
+@limiter.limit(EXTERNAL_LIMIT)
 async def get_weather_forecast(
     request: Request,
     location: str = Query(None),
@@ -57,7 +61,35 @@ async def get_weather_forecast(
         
         forecast_data = await weather_service.get_weather_forecast(location, days)
         
-        return {"success": True, "data": forecast_data}
+        return conditional_response(request, {"success": True, "data": forecast_data})
     except Exception as e:
         logger.error(f"Get weather forecast error: {e}")
-        raise HTTPException(status_code=500, detail="Failed to fetch weather forecast")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Failed to fetch weather forecast")
+
+@router.post("/refresh", dependencies=[Depends(require_admin)])
+@limiter.limit(HEAVY_LIMIT)
+async def refresh_regional_weather(
+    request: Request,
+    region: Region,
+    db = Depends(get_database)
+):
+    """Re-fetch cached weather for every farm location inside a region"""
+    try:
+        try:
+            # One indexed geo query for the distinct locations to refresh
+            locations = await geo_service.farm_locations(db, region.model_dump())
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        refreshed = await weather_service.refresh_locations(locations)
+        
+        return MongoJSONResponse({
+            "success": True,
+            "message": f"Refreshed weather for {refreshed} locations",
+            "data": {"locations": locations}
+        })
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Refresh regional weather error: {e}")
+        raise HTTPException(status_code=500, detail="Server error")
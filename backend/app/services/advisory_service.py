@@ -0,0 +1,195 @@
+from typing import Dict, Any, List, Optional
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from app.core.config import settings
+from app.core.metrics import registry
+from app.core.registry import services
+import json
+import logging
+import math
+import os
+import re
+
+logger = logging.getLogger(__name__)
+
+advisory_lookups = registry.counter(
+    "advisory_lookups_total",
+    "Chat questions checked against the advisory index, by outcome",
+    ["result"]
+)
+
+DEFAULT_DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "advisories.json")
+
+# Malayalam letters and signs, plus the joiners used in chillu forms
+_TOKEN = re.compile(r"[a-z0-9]+|[\u0d00-\u0d7f\u200c\u200d]+")
+_MALAYALAM_PREFIX = 5
+
+STOPWORDS = {
+    "a", "an", "and", "are", "at", "be", "can", "could", "do", "does", "for", "from", "how", "i",
+    "in", "is", "it", "me", "my", "of", "on", "or", "please", "should", "the", "there", "this",
+    "to", "what", "when", "which", "why", "will", "with", "your", "control", "manage", "treat",
+    "prevent", "help", "tell", "about", "get", "rid", "crop", "plant", "plants", "farm",
+    "ഞാൻ", "എന്റെ", "എന്ത്", "എന്താണ്", "എങ്ങനെ", "ആണ്", "ഉണ്ട്", "ചെയ്യണം", "ചെയ്യാം",
+    "എന്തു", "ഇത്", "ഈ", "ഒരു", "കൃഷി",
+}
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with light stemming for English and Malayalam"""
+    tokens = []
+    for token in _TOKEN.findall(text.lower()):
+        if token in STOPWORDS:
+            continue
+        if token.isascii():
+            if token.endswith("ies") and len(token) > 4:
+                token = token[:-3] + "y"
+            elif token.endswith("s") and not token.endswith("ss") and len(token) > 3:
+                token = token[:-1]
+        else:
+            # Malayalam attaches case suffixes to the stem (തെങ്ങ്, തെങ്ങിലെ, തെങ്ങിന്);
+            # a short prefix matches the inflected forms
+            token = token.replace("\u200c", "").replace("\u200d", "")[:_MALAYALAM_PREFIX]
+        tokens.append(token)
+    return tokens
+
+@dataclass
+class AdvisoryMatch:
+    document: Dict[str, Any]
+    score: float
+    confidence: float
+    matched_terms: int
+
+@dataclass
+class AdvisoryResult:
+    direct: Optional[AdvisoryMatch] = None
+    grounding: List[AdvisoryMatch] = field(default_factory=list)
+
+class BM25Index:
+    """In-memory inverted index scored with Okapi BM25"""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, List[tuple]] = defaultdict(list)
+        self.doc_lengths: List[int] = []
+        self.idf: Dict[str, float] = {}
+        self.avg_length = 0.0
+
+    def build(self, documents: List[List[str]]):
+        for doc_id, tokens in enumerate(documents):
+            self.doc_lengths.append(len(tokens))
+            for term, frequency in Counter(tokens).items():
+                self.postings[term].append((doc_id, frequency))
+        count = len(documents)
+        self.avg_length = sum(self.doc_lengths) / count if count else 0.0
+        self.idf = {
+            term: math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self.postings.items()
+        }
+
+    def search(self, terms: List[str]) -> Dict[int, tuple]:
+        """Map doc_id -> (score, idf mass of matched terms, matched term count)"""
+        results: Dict[int, list] = {}
+        for term in set(terms):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for doc_id, frequency in self.postings[term]:
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / self.avg_length)
+                entry = results.setdefault(doc_id, [0.0, 0.0, 0])
+                entry[0] += idf * frequency * (self.k1 + 1) / (frequency + norm)
+                entry[1] += idf
+                entry[2] += 1
+        return {doc_id: tuple(entry) for doc_id, entry in results.items()}
+
+    def query_weight(self, terms: List[str]) -> float:
+        """Idf mass of a query; terms the index has never seen count as the rarest term"""
+        unseen = max(self.idf.values(), default=1.0)
+        return sum(self.idf.get(term, unseen) for term in set(terms))
+
+class AdvisoryService:
+    """Curated Kerala crop advisories, searchable in English and Malayalam.
+
+    Each advisory is indexed in both languages, so a question matches whichever
+    language it was asked in. Confidence is the share of the question's idf
+    mass that an advisory covers: confident matches are answered directly,
+    weaker ones are passed to the LLM as grounding.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        path = path or settings.ADVISORY_DATA_PATH or DEFAULT_DATA_PATH
+        with open(path, encoding="utf-8") as f:
+            self.documents: List[Dict[str, Any]] = json.load(f)
+
+        self.index = BM25Index()
+        self.index.build([self._document_tokens(document) for document in self.documents])
+        logger.info(f"Indexed {len(self.documents)} advisories with {len(self.index.idf)} terms")
+
+    def _document_tokens(self, document: Dict[str, Any]) -> List[str]:
+        tokens = []
+        for language in ("en", "ml"):
+            # Titles and keywords count double
+            headline = " ".join([document["title"].get(language, "")] + document["keywords"].get(language, []))
+            tokens.extend(tokenize(headline) * 2)
+            tokens.extend(tokenize(document["text"].get(language, "")))
+        if document.get("crop"):
+            tokens.extend(tokenize(document["crop"]))
+        return tokens
+
+    def search(self, query: str, crop: Optional[str] = None, limit: int = 3) -> List[AdvisoryMatch]:
+        return self._search(tokenize(query), crop, limit)
+
+    def _search(self, terms: List[str], crop: Optional[str], limit: int) -> List[AdvisoryMatch]:
+        if not terms:
+            return []
+        query_weight = self.index.query_weight(terms)
+        matches = []
+        for doc_id, (score, matched_weight, matched_terms) in self.index.search(terms).items():
+            document = self.documents[doc_id]
+            if crop and document.get("crop") == crop.lower():
+                score *= 1.3
+            matches.append(AdvisoryMatch(document, score, matched_weight / query_weight, matched_terms))
+        matches.sort(key=lambda match: match.score, reverse=True)
+        return matches[:limit]
+
+    def lookup(self, query: str, crop: Optional[str] = None) -> AdvisoryResult:
+        """Classify the best matches for a chat question"""
+        if not settings.ADVISORY_ENABLED:
+            return AdvisoryResult()
+
+        terms = tokenize(query)
+        matches = self._search(terms, crop, 3)
+        result = AdvisoryResult()
+        if matches:
+            best = matches[0]
+            # Advice for a crop other than the farm's is only used directly when asked for by name
+            best_crop = best.document.get("crop")
+            crop_fits = not best_crop or not crop or best_crop == crop.lower() or best_crop in terms
+            if (best.confidence >= settings.ADVISORY_DIRECT_THRESHOLD and best.matched_terms >= 2
+                    and crop_fits):
+                result.direct = best
+            else:
+                result.grounding = [
+                    match for match in matches[:2]
+                    if match.confidence >= settings.ADVISORY_GROUNDING_THRESHOLD
+                ]
+
+        advisory_lookups.inc(result="direct" if result.direct else "grounded" if result.grounding else "miss")
+        return result
+
+    def answer(self, match: AdvisoryMatch, language: str = "en") -> str:
+        text = match.document["text"]
+        return text.get(language) or text["en"]
+
+    def grounding_notes(self, matches: List[AdvisoryMatch]) -> List[str]:
+        """Compact English notes for the LLM prompt"""
+        limit = settings.ADVISORY_GROUNDING_CHARS
+        notes = []
+        for match in matches:
+            text = match.document["text"]["en"]
+            if len(text) > limit:
+                text = text[:limit].rsplit(" ", 1)[0] + "..."
+            notes.append(f"{match.document['title']['en']}: {text}")
+        return notes
+
+# Global instance, built at startup
+advisory_service = services.register("advisory", AdvisoryService)
@@ -0,0 +1,28 @@
+from typing import Iterable
+from pymongo import UpdateOne
+from app.core.registry import services
+
+class AlertVersionService:
+    """Per-user counter behind the alert list ETag.
+
+    Every write to a user's alerts bumps it, including archiving and
+    restoring, so revalidating an alert list is one _id lookup however many
+    alerts the user has.
+    """
+
+    collection_name = "alert_versions"
+
+    async def get(self, db, user_id: str) -> int:
+        version = await db[self.collection_name].find_one({"_id": user_id}, {"version": 1})
+        return version["version"] if version else 0
+
+    async def bump(self, db, user_ids: Iterable[str]):
+        operations = [
+            UpdateOne({"_id": user_id}, {"$inc": {"version": 1}}, upsert=True)
+            for user_id in set(user_ids) if user_id
+        ]
+        if operations:
+            await db[self.collection_name].bulk_write(operations, ordered=False)
+
+# Global instance, created on first use
+alert_version_service = services.register("alert_versions", AlertVersionService)
@@ -0,0 +1,256 @@
+from typing import Dict, Any, List, Optional, Tuple, AsyncIterator
+from datetime import datetime, date, time, timedelta
+from pymongo import UpdateOne, ReplaceOne
+from pymongo.errors import BulkWriteError
+from app.core.config import settings
+from app.core.registry import services
+from app import queries
+import logging
+
+logger = logging.getLogger(__name__)
+
+class ActivityAnalyticsService:
+    """Daily per-user activity rollups.
+
+    Each rollup document holds one user's counts for one UTC day, broken down
+    by activity type and crop, so range queries read one small document per
+    day instead of aggregating raw activities.
+    """
+
+    collection_name = "activity_rollups"
+
+    async def record(self, db, activities: List[Dict], delta: int = 1):
+        """Apply inserted (delta=1) or deleted (delta=-1) activities to the rollups"""
+        updates = {}
+        for activity in activities:
+            created_at = activity.get("created_at") or datetime.utcnow()
+            day = datetime.combine(created_at.date(), time.min)
+            key = (activity["user_id"], day)
+            update = updates.setdefault(key, {"$inc": {}, "$max": {}})
+
+            activity_type = activity["type"]
+            crop = self._field_key(activity["crop"])
+            for field in ("total", f"types.{activity_type}", f"crops.{crop}",
+                          f"type_crops.{activity_type}.{crop}"):
+                update["$inc"][field] = update["$inc"].get(field, 0) + delta
+
+            if delta > 0:
+                last_field = f"last_at.{activity_type}"
+                update["$max"][last_field] = max(created_at, update["$max"].get(last_field, created_at))
+
+        if not updates:
+            return
+
+        operations = []
+        for (user_id, day), update in updates.items():
+            if not update["$max"]:
+                del update["$max"]
+            update["$set"] = {"updated_at": datetime.utcnow()}
+            operations.append(UpdateOne(
+                {"_id": self._rollup_id(user_id, day)},
+                {**update, "$setOnInsert": {"user_id": user_id, "date": day}},
+                upsert=True
+            ))
+
+        try:
+            await db[self.collection_name].bulk_write(operations, ordered=False)
+            if delta < 0:
+                await self._refresh_last_at(db, activities)
+        except Exception as e:
+            # Rollups can be recomputed by the rebuild job, so don't fail the write
+            logger.error(f"Activity rollup update error: {e}")
+
+    async def _refresh_last_at(self, db, activities: List[Dict]):
+        """Recompute last_at for deleted activities that were the latest of their type that day"""
+        for activity in activities:
+            created_at = activity.get("created_at")
+            if not created_at:
+                continue
+            day = datetime.combine(created_at.date(), time.min)
+            last_field = f"last_at.{activity['type']}"
+            latest = await db.activities.find_one(
+                queries.activities_of_type_on(activity["user_id"], activity["type"], day),
+                {"created_at": 1, "_id": 0},
+                sort=queries.ACTIVITY_SORT
+            )
+            # Only touches the rollup when the deleted activity is still recorded as the latest
+            await db[self.collection_name].update_one(
+                {"_id": self._rollup_id(activity["user_id"], day), last_field: created_at},
+                {"$set": {last_field: latest["created_at"]}} if latest else {"$unset": {last_field: ""}}
+            )
+
+    async def get_summary(self, db, user_id: str, start: date, end: date) -> Dict[str, Any]:
+        """Summarise activity counts between two dates (inclusive)"""
+        rollups = await db[self.collection_name].find(
+            queries.rollups_between(user_id, start, end),
+            {"_id": 0, "date": 1, "total": 1, "types": 1, "crops": 1, "last_at": 1}
+        ).sort(queries.ROLLUP_SORT).to_list(length=None)
+
+        total = 0
+        by_type: Dict[str, int] = {}
+        by_crop: Dict[str, int] = {}
+        last_occurrence: Dict[str, datetime] = {}
+        daily = []
+
+        for rollup in rollups:
+            total += rollup.get("total", 0)
+            for activity_type, count in rollup.get("types", {}).items():
+                by_type[activity_type] = by_type.get(activity_type, 0) + count
+            for crop, count in rollup.get("crops", {}).items():
+                by_crop[crop] = by_crop.get(crop, 0) + count
+            for activity_type, timestamp in rollup.get("last_at", {}).items():
+                if activity_type not in last_occurrence or timestamp > last_occurrence[activity_type]:
+                    last_occurrence[activity_type] = timestamp
+
+            daily.append({
+                "date": rollup["date"].strftime("%Y-%m-%d"),
+                "total": rollup.get("total", 0),
+                "types": {k: v for k, v in rollup.get("types", {}).items() if v}
+            })
+
+        return {
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "total": total,
+            "by_type": {k: v for k, v in by_type.items() if v},
+            "by_crop": {k: v for k, v in by_crop.items() if v},
+            "last_occurrence": last_occurrence,
+            "daily": daily
+        }
+
+    async def rebuild(self, db, user_id: Optional[str] = None) -> int:
+        """Recompute rollups from raw activities, for one user or everyone.
+
+        Rollups stream in user/day order and are replaced in batches, so memory
+        stays bounded however many users there are. A replace only lands on a
+        rollup record() hasn't touched since the rebuild started; contested
+        days are recomputed once more at the end.
+        """
+        match = {"is_deleted": False}
+        if user_id:
+            match["user_id"] = user_id
+
+        started = datetime.utcnow()
+        count, contested = await self._replace_all(db, self._rollups(db, match), started)
+
+        # Drop rollups with no activities left; ones record() touched meanwhile are newer
+        stale = {"updated_at": {"$lt": started}}
+        if user_id:
+            stale["user_id"] = user_id
+        await db[self.collection_name].delete_many(stale)
+
+        for rollup_user_id, day in contested:
+            retried = datetime.utcnow()
+            day_match = {
+                "user_id": rollup_user_id,
+                "is_deleted": False,
+                "created_at": {"$gte": day, "$lt": day + timedelta(days=1)}
+            }
+            _, still_contested = await self._replace_all(db, self._rollups(db, day_match), retried)
+            if still_contested:
+                logger.warning(f"Rollup {self._rollup_id(rollup_user_id, day)} kept changing during rebuild")
+
+        return count
+
+    async def _rollups(self, db, match: Dict[str, Any]) -> AsyncIterator[Dict]:
+        """Yield one complete rollup document per user and day"""
+        pipeline = [
+            {"$match": match},
+            {"$group": {
+                "_id": {
+                    "user_id": "$user_id",
+                    "day": {"$dateFromString": {"dateString": {
+                        "$dateToString": {"format": "%Y-%m-%d", "date": "$created_at"}
+                    }}},
+                    "type": "$type",
+                    "crop": "$crop"
+                },
+                "count": {"$sum": 1},
+                "last_at": {"$max": "$created_at"}
+            }},
+            # Groups for one rollup arrive together, so only that rollup is held
+            {"$sort": {"_id.user_id": 1, "_id.day": 1}}
+        ]
+
+        rollup = None
+        async for group in db.activities.aggregate(pipeline, allowDiskUse=True):
+            key = group["_id"]
+            day = key["day"]
+            rollup_id = self._rollup_id(key["user_id"], day)
+            if rollup is None or rollup["_id"] != rollup_id:
+                if rollup is not None:
+                    yield rollup
+                rollup = {
+                    "_id": rollup_id,
+                    "user_id": key["user_id"],
+                    "date": day,
+                    "total": 0,
+                    "types": {},
+                    "crops": {},
+                    "type_crops": {},
+                    "last_at": {},
+                    "updated_at": datetime.utcnow()
+                }
+
+            activity_type = key["type"]
+            crop = self._field_key(key["crop"])
+            count = group["count"]
+            rollup["total"] += count
+            rollup["types"][activity_type] = rollup["types"].get(activity_type, 0) + count
+            rollup["crops"][crop] = rollup["crops"].get(crop, 0) + count
+            type_crops = rollup["type_crops"].setdefault(activity_type, {})
+            type_crops[crop] = type_crops.get(crop, 0) + count
+            previous = rollup["last_at"].get(activity_type)
+            if previous is None or group["last_at"] > previous:
+                rollup["last_at"][activity_type] = group["last_at"]
+
+        if rollup is not None:
+            yield rollup
+
+    async def _replace_all(self, db, rollups: AsyncIterator[Dict], started: datetime) -> Tuple[int, List[tuple]]:
+        """Replace rollups in bounded batches; returns the count and the contested (user_id, day) keys"""
+        count = 0
+        contested = []
+        batch = []
+        async for rollup in rollups:
+            batch.append(rollup)
+            count += 1
+            if len(batch) >= settings.ROLLUP_REBUILD_BATCH_SIZE:
+                contested.extend(await self._replace(db, batch, started))
+                batch = []
+        if batch:
+            contested.extend(await self._replace(db, batch, started))
+        return count, contested
+
+    async def _replace(self, db, batch: List[Dict], started: datetime) -> List[tuple]:
+        """Replace rollups in place so readers never see them missing.
+
+        The filter skips rollups updated after the rebuild started: their $incs
+        may not be in the recomputed counts. The upsert then collides on _id,
+        which marks the rollup as contested.
+        """
+        try:
+            await db[self.collection_name].bulk_write([
+                ReplaceOne(
+                    {"_id": rollup["_id"], "updated_at": {"$not": {"$gte": started}}}, rollup, upsert=True
+                )
+                for rollup in batch
+            ], ordered=False)
+            return []
+        except BulkWriteError as e:
+            if any(error["code"] != 11000 for error in e.details["writeErrors"]):
+                raise
+            return [
+                (batch[error["index"]]["user_id"], batch[error["index"]]["date"])
+                for error in e.details["writeErrors"]
+            ]
+
+    def _rollup_id(self, user_id: str, day: datetime) -> str:
+        return f"{user_id}:{day.strftime('%Y-%m-%d')}"
+
+    def _field_key(self, value: str) -> str:
+        """Make a value safe to use as a MongoDB field name"""
+        return value.replace(".", "_").replace("$", "_") or "_"
+
+# Global instance, created on first use
+analytics_service = services.register("analytics", ActivityAnalyticsService)
@@ -0,0 +1,287 @@
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import datetime, timedelta
+from bson import ObjectId, encode, decode_all
+from bson.binary import Binary
+from pymongo.errors import BulkWriteError
+from app.core.config import settings
+from app.core.registry import services
+from app.services.alert_version_service import alert_version_service
+import logging
+import zlib
+
+logger = logging.getLogger(__name__)
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Documents in an archive batch stay well under Mongo's 16 MB document limit
+MAX_BATCH_BYTES = 8 * 1024 * 1024
+
+def compress(data: bytes) -> Tuple[str, bytes]:
+    """Compress with zstd when available, otherwise zlib"""
+    if zstandard is not None:
+        return "zstd", zstandard.ZstdCompressor(level=settings.ARCHIVE_COMPRESSION_LEVEL).compress(data)
+    return "zlib", zlib.compress(data, min(settings.ARCHIVE_COMPRESSION_LEVEL, 9))
+
+def decompress(codec: str, data: bytes) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("The zstandard package is required to read zstd archive batches")
+        return zstandard.ZstdDecompressor().decompress(data)
+    if codec == "zlib":
+        return zlib.decompress(data)
+    raise ValueError(f"Unknown archive codec: {codec}")
+
+class ArchiveService:
+    """Moves dead and cold documents out of the working set.
+
+    Matching documents are encoded as BSON, compressed in batches and stored
+    in archive_batches, then deleted from their collection. Batches record
+    the archived ids and users so they can be restored as they were.
+    """
+
+    collection_name = "archive_batches"
+    collections = ("chats", "activities", "alerts")
+
+    def policy(self, collection: str, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Filter selecting the documents of a collection that should be archived"""
+        now = now or datetime.utcnow()
+        deleted_before = now - timedelta(days=settings.ARCHIVE_DELETED_AFTER_DAYS)
+        if collection == "chats":
+            # Cleared sessions, and sessions nobody has written to in a long time
+            cold_before = now - timedelta(days=settings.ARCHIVE_CHAT_COLD_DAYS)
+            return {"$or": [
+                {"is_active": False, "updated_at": {"$lt": deleted_before}},
+                {"updated_at": {"$lt": cold_before}}
+            ]}
+        if collection == "activities":
+            # Activities deleted before deleted_at was recorded fall back to their creation date
+            return {"is_deleted": True, "$or": [
+                {"deleted_at": {"$lt": deleted_before}},
+                {"deleted_at": {"$exists": False}, "created_at": {"$lt": deleted_before}}
+            ]}
+        if collection == "alerts":
+            return {"$or": [
+                {"is_active": False, "updated_at": {"$lt": deleted_before}},
+                {"expires_at": {"$lt": deleted_before}}
+            ]}
+        raise ValueError(f"No retention policy for {collection}")
+
+    async def storage_stats(self, db, collection: str) -> Dict[str, int]:
+        stats = await db.command("collStats", collection)
+        return {
+            "count": stats.get("count", 0),
+            "size": stats.get("size", 0),
+            "storage_size": stats.get("storageSize", 0),
+            "index_size": stats.get("totalIndexSize", 0)
+        }
+
+    def _pack(self, documents: List[Dict[str, Any]], encoded: Optional[List[bytes]] = None) -> Dict[str, Any]:
+        """Batch fields describing and holding the given documents"""
+        raw = b"".join(encoded if encoded is not None else (encode(document) for document in documents))
+        codec, data = compress(raw)
+        dates = [document.get("created_at") for document in documents if document.get("created_at")]
+        return {
+            "codec": codec,
+            "count": len(documents),
+            "raw_bytes": len(raw),
+            "compressed_bytes": len(data),
+            "ids": [document["_id"] for document in documents],
+            "user_ids": sorted({document["user_id"] for document in documents if document.get("user_id")}),
+            "oldest": min(dates) if dates else None,
+            "newest": max(dates) if dates else None,
+            "data": Binary(data)
+        }
+
+    async def _write_batch(self, db, collection: str, query: Dict[str, Any], documents: List[Dict[str, Any]],
+                           encoded: List[bytes]) -> Dict[str, int]:
+        batch = self._pack(documents, encoded)
+        ids = batch["ids"]
+
+        # Write the archive before deleting, so a crash can only leave a duplicate behind
+        result = await db[self.collection_name].insert_one({
+            "collection": collection, **batch, "created_at": datetime.utcnow()
+        })
+        # Re-check the policy: a document written to since it was read stays live
+        deleted = await db[collection].delete_many({**query, "_id": {"$in": ids}})
+        if deleted.deleted_count < len(ids):
+            kept = {document["_id"] async for document in db[collection].find({"_id": {"$in": ids}}, {"_id": 1})}
+            documents = [document for document in documents if document["_id"] not in kept]
+            if not documents:
+                await db[self.collection_name].delete_one({"_id": result.inserted_id})
+                return {"archived": 0, "raw_bytes": 0, "compressed_bytes": 0}
+            batch = self._pack(documents)
+            await db[self.collection_name].update_one({"_id": result.inserted_id}, {"$set": batch})
+        if collection == "alerts":
+            # Removed alerts must not be served from clients' cached lists
+            await alert_version_service.bump(db, batch["user_ids"])
+        return {
+            "archived": deleted.deleted_count,
+            "raw_bytes": batch["raw_bytes"],
+            "compressed_bytes": batch["compressed_bytes"]
+        }
+
+    async def archive_collection(self, db, collection: str, dry_run: bool = False,
+                                 now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Archive everything the collection's policy selects; returns totals"""
+        query = self.policy(collection, now)
+        totals = {"archived": 0, "batches": 0, "raw_bytes": 0, "compressed_bytes": 0}
+        documents, encoded, size = [], [], 0
+
+        async def flush():
+            if dry_run:
+                totals["archived"] += len(documents)
+                totals["raw_bytes"] += size
+            else:
+                written = await self._write_batch(db, collection, query, documents, encoded)
+                for key, value in written.items():
+                    totals[key] += value
+            totals["batches"] += 1
+            documents.clear()
+            encoded.clear()
+
+        cursor = db[collection].find(query).sort("_id", 1).batch_size(settings.ARCHIVE_BATCH_SIZE)
+        async for document in cursor:
+            data = encode(document)
+            if documents and (len(documents) >= settings.ARCHIVE_BATCH_SIZE or size + len(data) > MAX_BATCH_BYTES):
+                await flush()
+                size = 0
+            documents.append(document)
+            encoded.append(data)
+            size += len(data)
+        if documents:
+            await flush()
+        return totals
+
+    async def run(self, db, collections: Optional[List[str]] = None, dry_run: bool = False,
+                  compact: bool = False) -> Dict[str, Any]:
+        """Archive each collection and report the space reclaimed"""
+        now = datetime.utcnow()
+        report = {}
+        for collection in collections or self.collections:
+            before = await self.storage_stats(db, collection)
+            totals = await self.archive_collection(db, collection, dry_run, now)
+            if compact and totals["archived"] and not dry_run:
+                # WiredTiger keeps freed pages for reuse; compact hands them back to the OS
+                await db.command("compact", collection)
+            after = await self.storage_stats(db, collection)
+            report[collection] = {
+                **totals,
+                "before": before,
+                "after": after,
+                "reclaimed": {
+                    "size": before["size"] - after["size"],
+                    "storage_size": before["storage_size"] - after["storage_size"],
+                    "index_size": before["index_size"] - after["index_size"]
+                }
+            }
+        return report
+
+    def _decode(self, batch: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return decode_all(decompress(batch["codec"], batch["data"]))
+
+    async def _insert(self, db, collection: str, documents: List[Dict[str, Any]]) -> int:
+        """Insert restored documents, skipping any that already exist"""
+        if not documents:
+            return 0
+        try:
+            result = await db[collection].insert_many(documents, ordered=False)
+            return len(result.inserted_ids)
+        except BulkWriteError as e:
+            if any(error["code"] != 11000 for error in e.details["writeErrors"]):
+                raise
+            return e.details["nInserted"]
+
+    async def _restore_chats(self, db, documents: List[Dict[str, Any]]) -> int:
+        """Restore chat sessions, merging into a live session that reused the session id"""
+        if not documents:
+            return 0
+        live = {}
+        async for chat in db.chats.find(
+            {
+                "user_id": {"$in": list({document.get("user_id") for document in documents})},
+                "session_id": {"$in": list({document.get("session_id") for document in documents})}
+            },
+            {"user_id": 1, "session_id": 1}
+        ):
+            live[(chat["user_id"], chat["session_id"])] = chat["_id"]
+
+        fresh, merged = [], 0
+        for document in documents:
+            live_id = live.get((document.get("user_id"), document.get("session_id")))
+            if live_id is None:
+                fresh.append(document)
+                continue
+            if live_id == document["_id"]:
+                # Already restored
+                continue
+            # The archived messages are older; put them first and keep the last 50 as chat does
+            update = {"$push": {"messages": {
+                "$each": document.get("messages", []),
+                "$position": 0,
+                "$slice": -50
+            }}}
+            if document.get("created_at"):
+                update["$min"] = {"created_at": document["created_at"]}
+            await db.chats.update_one({"_id": live_id}, update)
+            merged += 1
+        return merged + await self._insert(db, "chats", fresh)
+
+    async def _restore(self, db, collection: str, documents: List[Dict[str, Any]]) -> int:
+        if collection == "chats":
+            return await self._restore_chats(db, documents)
+        restored = await self._insert(db, collection, documents)
+        if collection == "alerts" and restored:
+            await alert_version_service.bump(db, (document.get("user_id") for document in documents))
+        return restored
+
+    async def restore_batch(self, db, batch_id: str) -> int:
+        """Put every document in a batch back and drop the batch"""
+        batch = await db[self.collection_name].find_one({"_id": ObjectId(batch_id)})
+        if not batch:
+            raise ValueError(f"Archive batch {batch_id} not found")
+        restored = await self._restore(db, batch["collection"], self._decode(batch))
+        await db[self.collection_name].delete_one({"_id": batch["_id"]})
+        return restored
+
+    async def restore_user(self, db, user_id: str, collection: Optional[str] = None) -> int:
+        """Put back one user's archived documents, rewriting the batches they shared"""
+        query = {"user_ids": user_id}
+        if collection:
+            query["collection"] = collection
+
+        restored = 0
+        async for batch in db[self.collection_name].find(query):
+            documents = self._decode(batch)
+            mine = [document for document in documents if document.get("user_id") == user_id]
+            rest = [document for document in documents if document.get("user_id") != user_id]
+            restored += await self._restore(db, batch["collection"], mine)
+
+            if not rest:
+                await db[self.collection_name].delete_one({"_id": batch["_id"]})
+                continue
+            await db[self.collection_name].update_one({"_id": batch["_id"]}, {"$set": self._pack(rest)})
+        return restored
+
+    async def summary(self, db) -> List[Dict[str, Any]]:
+        """Archived document counts and sizes per collection"""
+        pipeline = [
+            {"$group": {
+                "_id": "$collection",
+                "batches": {"$sum": 1},
+                "documents": {"$sum": "$count"},
+                "raw_bytes": {"$sum": "$raw_bytes"},
+                "compressed_bytes": {"$sum": "$compressed_bytes"},
+                "last_archived_at": {"$max": "$created_at"}
+            }},
+            {"$sort": {"_id": 1}}
+        ]
+        return [
+            {"collection": group.pop("_id"), **group}
+            async for group in db[self.collection_name].aggregate(pipeline)
+        ]
+
+# Global instance, created on first use
+archive_service = services.register("archive", ArchiveService)
@@ -0,0 +1,129 @@
+from typing import Dict, Any, List, Optional, Callable, Awaitable
+from app.core.config import settings
+from app import queries
+from app.core.registry import services
+from app.core.tracing import span
+from app.models.farm import FARM_PROFILE_FIELDS, ACTIVITY_LIST_FIELDS
+from app.models.alert import ALERT_LIST_FIELDS
+from app.services.digest_service import digest_service
+from app.services.weather_service import weather_service
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Sections that call the weather API get the longer external timeout
+EXTERNAL_SECTIONS = {"weather", "forecast"}
+
+class DashboardRequest:
+    """Per-request state shared by the sections; the farm is looked up at most once"""
+
+    def __init__(self, db, user_id: str, items: int, location: Optional[str] = None):
+        self.db = db
+        self.user_id = user_id
+        self.items = items
+        self.location = location
+        self._farm: Optional[asyncio.Task] = None
+
+    async def farm(self) -> Optional[Dict[str, Any]]:
+        if self._farm is None:
+            self._farm = asyncio.ensure_future(self.db.farms.find_one(
+                queries.active_farm(self.user_id),
+                {field: 1 for field in FARM_PROFILE_FIELDS}
+            ))
+        # A section timing out must not cancel the lookup the others are waiting on
+        return await asyncio.shield(self._farm)
+
+    async def weather_location(self) -> Optional[str]:
+        if self.location:
+            return self.location
+        farm = await self.farm()
+        return farm.get("location") if farm else None
+
+class DashboardService:
+    """Everything the dashboard shows on load, gathered concurrently.
+
+    Each section runs under its own timeout; a slow or failing section is
+    reported in "errors" and the rest are returned as usual.
+    """
+
+    def __init__(self):
+        self.sections: Dict[str, Callable[[DashboardRequest], Awaitable[Any]]] = {
+            "profile": self._profile,
+            "weather": self._weather,
+            "forecast": self._forecast,
+            "alerts": self._alerts,
+            "activities": self._activities,
+            "digest": self._digest,
+        }
+
+    def parse_sections(self, sections: Optional[str]) -> List[str]:
+        """Raises ValueError for unknown section names"""
+        selected = [name.strip() for name in (sections or settings.DASHBOARD_SECTIONS).split(",") if name.strip()]
+        unknown = [name for name in selected if name not in self.sections]
+        if unknown:
+            raise ValueError(f"Unknown sections: {', '.join(unknown)}")
+        return list(dict.fromkeys(selected))
+
+    async def _profile(self, request: DashboardRequest):
+        return await request.farm()
+
+    async def _weather(self, request: DashboardRequest):
+        location = await request.weather_location()
+        return await weather_service.get_current_weather(location) if location else None
+
+    async def _forecast(self, request: DashboardRequest):
+        location = await request.weather_location()
+        return await weather_service.get_weather_forecast(location, 5) if location else None
+
+    async def _alerts(self, request: DashboardRequest):
+        alerts, unread_count = await asyncio.gather(
+            request.db.alerts.find(
+                queries.alerts(request.user_id), {field: 1 for field in ALERT_LIST_FIELDS}
+            ).sort(queries.ALERT_SORT).limit(request.items).to_list(length=request.items),
+            request.db.alerts.count_documents(queries.alerts(request.user_id, unread_only=True))
+        )
+        return {"items": alerts, "unread_count": unread_count}
+
+    async def _activities(self, request: DashboardRequest):
+        return await request.db.activities.find(
+            queries.activities(request.user_id),
+            {field: 1 for field in ACTIVITY_LIST_FIELDS}
+        ).sort(queries.ACTIVITY_SORT).limit(request.items).to_list(length=request.items)
+
+    async def _digest(self, request: DashboardRequest):
+        farm = await request.farm()
+        if not farm:
+            return None
+        digest = await digest_service.get_for_farm(request.db, farm)
+        return {"date": digest["date"], "text": digest["text"]} if digest else None
+
+    async def _run(self, name: str, request: DashboardRequest):
+        timeout = (settings.DASHBOARD_EXTERNAL_TIMEOUT if name in EXTERNAL_SECTIONS
+                   else settings.DASHBOARD_SECTION_TIMEOUT)
+        with span(f"dashboard_{name}"):
+            return await asyncio.wait_for(self.sections[name](request), timeout)
+
+    async def load(self, db, user_id: str, sections: List[str], items: int = 3,
+                   location: Optional[str] = None) -> Dict[str, Any]:
+        """Returns {"data": {section: value}, "errors": {section: reason}}"""
+        request = DashboardRequest(db, user_id, items, location)
+        results = await asyncio.gather(
+            *(self._run(name, request) for name in sections),
+            return_exceptions=True
+        )
+
+        data, errors = {}, {}
+        for name, result in zip(sections, results):
+            if isinstance(result, asyncio.TimeoutError):
+                logger.warning(f"Dashboard section {name} timed out")
+                errors[name] = "timeout"
+            elif isinstance(result, Exception):
+                logger.error(f"Dashboard section {name} error: {result}")
+                errors[name] = "error"
+            else:
+                data[name] = result
+        return {"data": data, "errors": errors}
+
+# Global instance, created on first use
+dashboard_service = services.register("dashboard", DashboardService)
@@ -0,0 +1,204 @@
+from typing import Dict, Any, List, Optional
+from datetime import datetime, date, timedelta
+from app.core.config import settings
+from app.core.registry import services
+from app import queries
+from app.core import cache
+from app.services.llm_service import granite_service
+from app.services.translation_service import translation_service
+from app.services.weather_service import weather_service
+import asyncio
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+# Chat questions asking for this week's plan are answered from the digest
+WEEKLY_QUESTION = re.compile(
+    r"\b(this|next|coming) week\b|\bweekly (advice|plan|tips|schedule)\b"
+    r"|\b(plan|advice|tips|work|tasks) for (the )?(next |coming )?week\b|ഈ ആഴ്ച|അടുത്ത ആഴ്ച",
+    re.IGNORECASE
+)
+# ...unless they describe a specific problem, which the digest doesn't cover
+PROBLEM_QUESTION = re.compile(
+    r"\b(pests?|insects?|worms?|weevils?|beetles?|borers?|caterpillars?|aphids?|mites?|bugs?|diseases?"
+    r"|fung(us|al)|blight|rot(ting)?|wilt(ing)?|spots?|yellow(ing)?|holes?|dying|damaged?|infest\w*)\b"
+    r"|കീട|രോഗ|പുഴു|ചീയ|വാട്ട|വാടി|പുള്ളി|മഞ്ഞളിപ്പ്|മഞ്ഞനിറ|ഉണങ്ങ|തുരപ്പ",
+    re.IGNORECASE
+)
+# Crop names as farmers write them: (crop, English, Malayalam)
+CROP_NAMES = [
+    ("paddy", "paddy|rice", "നെല്ല്|നെൽ"),
+    ("coconut", "coconuts?", "തെങ്ങ|തേങ്ങ"),
+    ("rubber", "rubber", "റബ്ബ|റബ്ബർ"),
+    ("banana", "bananas?|plantains?", "വാഴ"),
+    ("brinjal", "brinjals?|eggplants?", "വഴുതന"),
+    ("pepper", "pepper", "കുരുമുളക്"),
+    ("cardamom", "cardamom", "ഏലം"),
+    ("ginger", "ginger", "ഇഞ്ചി"),
+    ("turmeric", "turmeric", "മഞ്ഞൾ"),
+]
+CROP_PATTERNS = [
+    (crop, re.compile(rf"\b({english})\b|{malayalam}", re.IGNORECASE)) for crop, english, malayalam in CROP_NAMES
+]
+
+def _normalize(value: Optional[str]) -> str:
+    return (value or "unknown").strip().lower() or "unknown"
+
+class CohortDigestService:
+    """Daily advice shared by every farm with the same crop, soil and district.
+
+    The batch job makes one LLM call per cohort and translates the result once
+    per language, so LLM spend grows with the number of cohorts rather than
+    the number of users.
+    """
+
+    collection_name = "advisory_digests"
+
+    def __init__(self):
+        self.cache = cache.namespace("digest", settings.DIGEST_CACHE_TTL)
+
+    @staticmethod
+    def cohort(crop: Optional[str], soil_type: Optional[str], location: Optional[str]) -> Dict[str, str]:
+        return {"crop": _normalize(crop), "soil_type": _normalize(soil_type), "district": _normalize(location)}
+
+    async def list_cohorts(self, db) -> List[Dict[str, Any]]:
+        """Group active farms by normalised (crop, soil_type, district)"""
+        pipeline = [
+            {"$match": {"is_active": True, "current_crop": {"$nin": [None, ""]}}},
+            {"$group": {
+                "_id": {
+                    "crop": {"$toLower": {"$trim": {"input": "$current_crop"}}},
+                    "soil_type": {"$toLower": {"$trim": {"input": {"$ifNull": ["$soil_type", "unknown"]}}}},
+                    "district": {"$toLower": {"$trim": {"input": {"$ifNull": ["$location", "unknown"]}}}}
+                },
+                "location": {"$first": "$location"},
+                "members": {"$sum": 1}
+            }},
+            {"$sort": {"members": -1}}
+        ]
+        cohorts = []
+        async for group in db.farms.aggregate(pipeline, allowDiskUse=True):
+            cohorts.append({**group["_id"], "location": group["location"], "members": group["members"]})
+        return cohorts
+
+    def _forecast_summary(self, forecast: Dict[str, Any]) -> str:
+        return "; ".join(
+            f"{day['date']}: {day['condition']}, {day['min_temp']}-{day['max_temp']}°C, "
+            f"rain {day['rainfall']} mm, humidity {day['humidity']}%"
+            for day in forecast.get("forecast", [])
+        )
+
+    async def generate_digest(self, db, cohort: Dict[str, Any], day: date) -> bool:
+        """Create one cohort's digest; False if the LLM call failed"""
+        forecast = await weather_service.get_weather_forecast(cohort["location"], 5)
+        forecast_summary = self._forecast_summary(forecast)
+        question = (
+            f"Give a short plan for this week for farmers growing {cohort['crop']} on "
+            f"{cohort['soil_type']} soil in {cohort['location']}. Weather forecast: {forecast_summary}. "
+            "Cover field operations, irrigation, fertilizer timing and pest or disease risks."
+        )
+        context = {"current_crop": cohort["crop"], "soil_type": cohort["soil_type"], "location": cohort["location"]}
+
+        text_en = await granite_service.generate(question, context)
+        if not text_en:
+            return False
+
+        text = {"en": text_en}
+        for language in settings.DIGEST_LANGUAGES.split(","):
+            language = language.strip()
+            if language and language != "en":
+                translated = await translation_service.translate_text(text_en, "en", language)
+                # Translation falls back to the input; readers fall back to English themselves
+                if translated != text_en:
+                    text[language] = translated
+
+        now = datetime.utcnow()
+        day_start = datetime.combine(day, datetime.min.time())
+        key = {"crop": cohort["crop"], "soil_type": cohort["soil_type"], "district": cohort["district"]}
+        await db[self.collection_name].update_one(
+            {**key, "date": day_start},
+            {"$set": {
+                "location": cohort["location"],
+                "members": cohort["members"],
+                "forecast_summary": forecast_summary,
+                "text": text,
+                "created_at": now,
+                "expires_at": day_start + timedelta(days=settings.DIGEST_RETENTION_DAYS)
+            }},
+            upsert=True
+        )
+        return True
+
+    async def generate_all(self, db, day: Optional[date] = None, concurrency: int = 4,
+                           force: bool = False, limit: Optional[int] = None) -> Dict[str, int]:
+        """Generate today's digest for every cohort that doesn't have one yet"""
+        day = day or datetime.utcnow().date()
+        day_start = datetime.combine(day, datetime.min.time())
+        cohorts = await self.list_cohorts(db)
+        if limit:
+            cohorts = cohorts[:limit]
+
+        if not force:
+            existing = set()
+            async for digest in db[self.collection_name].find(
+                queries.digests_on(day_start), {"crop": 1, "soil_type": 1, "district": 1, "_id": 0}
+            ):
+                existing.add((digest["crop"], digest["soil_type"], digest["district"]))
+            cohorts = [
+                cohort for cohort in cohorts
+                if (cohort["crop"], cohort["soil_type"], cohort["district"]) not in existing
+            ]
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def generate(cohort):
+            async with semaphore:
+                try:
+                    return await self.generate_digest(db, cohort, day)
+                except Exception as e:
+                    logger.error(f"Digest generation failed for {cohort}: {e}")
+                    return False
+
+        results = await asyncio.gather(*(generate(cohort) for cohort in cohorts))
+        generated = sum(1 for result in results if result)
+        return {
+            "cohorts": len(cohorts),
+            "generated": generated,
+            "failed": len(cohorts) - generated,
+            "farms_covered": sum(cohort["members"] for cohort, result in zip(cohorts, results) if result)
+        }
+
+    async def get_for_farm(self, db, context: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Latest recent digest for the farm's cohort"""
+        if not context.get("current_crop"):
+            return None
+        key = self.cohort(context.get("current_crop"), context.get("soil_type"), context.get("location"))
+        cache_key = ":".join(key.values())
+        digest = await self.cache.get(cache_key)
+        if digest is not None:
+            return digest or None
+
+        today = datetime.combine(datetime.utcnow().date(), datetime.min.time())
+        oldest = today - timedelta(days=settings.DIGEST_MAX_AGE_DAYS)
+        digest = await db[self.collection_name].find_one(
+            queries.cohort_digest(key, oldest),
+            {"_id": 0, "expires_at": 0},
+            sort=queries.DIGEST_SORT
+        )
+        # Cache misses too so cohorts without a digest don't hit Mongo on every request
+        await self.cache.set(cache_key, digest or {})
+        return digest
+
+    def is_weekly_question(self, message: str, crop: Optional[str] = None) -> bool:
+        """A general weekly-plan question about the farm's own crop"""
+        if not WEEKLY_QUESTION.search(message) or PROBLEM_QUESTION.search(message):
+            return False
+        mentioned = {name for name, pattern in CROP_PATTERNS if pattern.search(message)}
+        return not mentioned or _normalize(crop) in mentioned
+
+    def text(self, digest: Dict[str, Any], language: str = "en") -> str:
+        return digest["text"].get(language) or digest["text"]["en"]
+
+# Global instance, created on first use
+digest_service = services.register("digest", CohortDigestService)
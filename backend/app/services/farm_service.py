@@ -0,0 +1,37 @@
+from typing import Dict, Any
+from app.core.config import settings
+from app import queries
+from app.core.registry import services
+from app.core import cache
+import logging
+
+logger = logging.getLogger(__name__)
+
+FARM_CONTEXT_FIELDS = ["current_crop", "soil_type", "location"]
+
+class FarmService:
+    """Cached farm lookups shared by the chat pipeline and other readers"""
+
+    def __init__(self):
+        self.context_cache = cache.namespace("farm_context", settings.FARM_CACHE_TTL)
+
+    async def get_context(self, db, user_id: str) -> Dict[str, Any]:
+        """Farm fields used to ground AI responses; empty if the user has no farm"""
+        context = await self.context_cache.get(user_id)
+        if context is not None:
+            return context
+        
+        farm = await db.farms.find_one(
+            queries.active_farm(user_id),
+            {"_id": 0, **{field: 1 for field in FARM_CONTEXT_FIELDS}}
+        )
+        context = {field: farm.get(field) for field in FARM_CONTEXT_FIELDS} if farm else {}
+        await self.context_cache.set(user_id, context)
+        return context
+
+    async def invalidate(self, user_id: str):
+        """Drop cached farm data after the profile changes"""
+        await self.context_cache.delete(user_id)
+
+# Global instance, created on first use
+farm_service = services.register("farm", FarmService)
@@ -0,0 +1,69 @@
+from typing import Dict, Any, List, Optional
+from app.core.registry import services
+import logging
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6378.1
+
+class GeoService:
+    """Regional farm queries over the 2dsphere index on farms.coordinates"""
+
+    def region_filter(
+        self,
+        lat: Optional[float] = None,
+        lon: Optional[float] = None,
+        radius_km: Optional[float] = None,
+        polygon: Optional[List[List[float]]] = None
+    ) -> Dict[str, Any]:
+        """Build a $geoWithin filter for a circle or a polygon.
+
+        Raises ValueError for a region MongoDB would reject, so callers can
+        answer 400 instead of failing mid-query.
+        """
+        if polygon:
+            ring = [self._point(point) for point in polygon]
+            # Close an open ring; GeoJSON needs the first point repeated at the end
+            if ring[0] != ring[-1]:
+                ring.append(ring[0])
+            if len(ring) < 4 or len(set(map(tuple, ring))) < 3:
+                raise ValueError("Polygon needs at least three distinct points")
+            shape = {"$geometry": {"type": "Polygon", "coordinates": [ring]}}
+        elif lat is not None and lon is not None and radius_km:
+            lon, lat = self._point([lon, lat])
+            if radius_km <= 0:
+                raise ValueError("radius_km must be positive")
+            shape = {"$centerSphere": [[lon, lat], radius_km / EARTH_RADIUS_KM]}
+        else:
+            raise ValueError("Region needs a polygon or lat, lon and radius_km")
+
+        return {"coordinates": {"$geoWithin": shape}, "is_active": True}
+
+    def _point(self, point) -> List[float]:
+        """Validate a [lon, lat] pair"""
+        if not isinstance(point, (list, tuple)) or len(point) != 2:
+            raise ValueError("Polygon points must be [lon, lat] pairs")
+        if not all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in point):
+            raise ValueError("Coordinates must be numbers")
+        lon, lat = point
+        if not -180 <= lon <= 180:
+            raise ValueError(f"Longitude {lon} is outside [-180, 180]")
+        if not -90 <= lat <= 90:
+            raise ValueError(f"Latitude {lat} is outside [-90, 90]")
+        return [float(lon), float(lat)]
+
+    def find_farms(self, db, region: Dict[str, Any], projection: Optional[Dict] = None):
+        """Cursor over active farms inside the region"""
+        query = self.region_filter(**region)
+        return db.farms.find(query, projection or {"user_id": 1, "location": 1, "current_crop": 1})
+
+    async def count_farms(self, db, region: Dict[str, Any]) -> int:
+        return await db.farms.count_documents(self.region_filter(**region))
+
+    async def farm_locations(self, db, region: Dict[str, Any]) -> List[str]:
+        """Distinct location names of active farms inside the region"""
+        locations = await db.farms.distinct("location", self.region_filter(**region))
+        return [location for location in locations if location]
+
+# Global instance, created on first use
+geo_service = services.register("geo", GeoService)
@@ -0,0 +1,157 @@
+from typing import Dict, Any, Awaitable, Callable, Tuple
+from datetime import datetime, timedelta
+from pymongo.errors import DuplicateKeyError
+from app.core.config import settings
+from app.core.registry import services
+from app.core.responses import dumps
+import asyncio
+import hashlib
+import logging
+
+logger = logging.getLogger(__name__)
+
+class IdempotencyConflict(Exception):
+    """The key was already used for a different request"""
+
+class IdempotencyInProgress(Exception):
+    """Another worker is still computing the response for this key"""
+
+class _Abandoned(Exception):
+    """The request computing the response was cancelled before it finished"""
+
+class IdempotencyService:
+    """Run an operation at most once per client-supplied key.
+
+    Completed responses are stored in a TTL-indexed collection and replayed.
+    Duplicates arriving while the first request is still running wait for it:
+    in this worker on a shared future, in other workers by polling the
+    pending document. If the first request is cancelled, a waiting duplicate
+    takes over and computes the response itself.
+    """
+
+    collection_name = "idempotency_keys"
+
+    def __init__(self):
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
+    @staticmethod
+    def fingerprint(payload: Any) -> str:
+        return hashlib.sha256(dumps(payload)).hexdigest()
+
+    async def run(
+        self,
+        db,
+        scope: str,
+        user_id: str,
+        key: str,
+        fingerprint: str,
+        compute: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Tuple[Dict[str, Any], bool]:
+        """Return (response, replayed)"""
+        record_id = f"{scope}:{user_id}:{key}"
+
+        while record_id in self._in_flight:
+            in_flight = self._in_flight[record_id]
+            try:
+                result_fingerprint, response = await asyncio.shield(in_flight)
+            except _Abandoned:
+                # Its claim was released; the first waiter to get here takes over
+                continue
+            if result_fingerprint != fingerprint:
+                raise IdempotencyConflict(key)
+            return response, True
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[record_id] = future
+        try:
+            response, replayed = await self._run_once(db, record_id, user_id, fingerprint, compute)
+            future.set_result((fingerprint, response))
+            return response, replayed
+        except BaseException as e:
+            future.set_exception(e if isinstance(e, Exception) else _Abandoned(key))
+            # Mark retrieved so a future nobody waited on doesn't log a warning
+            future.exception()
+            raise
+        finally:
+            del self._in_flight[record_id]
+
+    async def _run_once(self, db, record_id: str, user_id: str, fingerprint: str, compute) -> Tuple[Dict[str, Any], bool]:
+        collection = db[self.collection_name]
+
+        if not await self._claim(collection, record_id, user_id, fingerprint):
+            response = await self._wait_for_record(collection, record_id, user_id, fingerprint)
+            if response is not None:
+                return response, True
+
+        try:
+            response = await compute()
+        except BaseException:
+            # Let a retry start over instead of waiting on a result that never comes
+            await asyncio.shield(collection.delete_one({"_id": record_id, "status": "pending"}))
+            raise
+
+        try:
+            await collection.update_one(
+                {"_id": record_id},
+                {"$set": {"status": "completed", "response": response, "completed_at": datetime.utcnow()}}
+            )
+        except Exception as e:
+            # The work is done, so answer with it: a 500 would be retried into a second
+            # run. Release the claim rather than leave retries waiting on it.
+            logger.error(f"Could not store idempotent response {record_id}: {e}")
+            try:
+                await asyncio.shield(collection.delete_one({"_id": record_id, "status": "pending"}))
+            except Exception as e:
+                logger.error(f"Could not release idempotency claim {record_id}: {e}")
+        return response, False
+
+    async def _claim(self, collection, record_id: str, user_id: str, fingerprint: str) -> bool:
+        """Insert the pending record; False if the key is already taken"""
+        now = datetime.utcnow()
+        try:
+            await collection.insert_one({
+                "_id": record_id,
+                "user_id": user_id,
+                "fingerprint": fingerprint,
+                "status": "pending",
+                "created_at": now,
+                "expires_at": now + timedelta(seconds=settings.IDEMPOTENCY_TTL)
+            })
+            return True
+        except DuplicateKeyError:
+            return False
+
+    async def _wait_for_record(self, collection, record_id: str, user_id: str, fingerprint: str):
+        """Wait for another worker's result; None means we took over a stale claim"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.IDEMPOTENCY_WAIT_TIMEOUT
+        while True:
+            record = await collection.find_one({"_id": record_id})
+            if record is None:
+                # The other request failed and released its claim
+                if await self._claim(collection, record_id, user_id, fingerprint):
+                    return None
+                continue
+
+            if record["fingerprint"] != fingerprint:
+                raise IdempotencyConflict(record_id)
+            if record["status"] == "completed":
+                return record["response"]
+
+            # A worker that died mid-request leaves a pending claim behind
+            stale_before = datetime.utcnow() - timedelta(seconds=settings.IDEMPOTENCY_LOCK_TIMEOUT)
+            if record["created_at"] < stale_before:
+                result = await collection.update_one(
+                    {"_id": record_id, "status": "pending", "created_at": record["created_at"]},
+                    {"$set": {"created_at": datetime.utcnow()}}
+                )
+                if result.modified_count:
+                    logger.warning(f"Taking over stale idempotency claim {record_id}")
+                    return None
+
+            if loop.time() >= deadline:
+                raise IdempotencyInProgress(record_id)
+            await asyncio.sleep(settings.IDEMPOTENCY_POLL_INTERVAL)
+
+# Global instance, created on first use
+idempotency_service = services.register("idempotency", IdempotencyService)
@@ -2,6 +2,8 @@ import httpx
 import json
 from typing import Dict, Any, Optional
 from app.core.config import settings
+from app.core.metrics import track_upstream
+from app.core.registry import services
 import logging
 
 logger = logging.getLogger(__name__)
@@ -15,22 +17,29 @@ class IBMGraniteService:
         
     async def get_access_token(self) -> str:
         """Get IBM Cloud access token"""
-        url = "https://iam.cloud.ibm.com/identity/token"
+        url = settings.IBM_IAM_URL
         headers = {"Content-Type": "application/x-www-form-urlencoded"}
         data = {
             "grant_type": "urn:iam:params:oauth:grant-type:apikey",
             "apikey": self.api_key
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, headers=headers, data=data)
-            if response.status_code == 200:
-                return response.json()["access_token"]
-            else:
-                raise Exception(f"Failed to get access token: {response.text}")
+        with track_upstream("ibm_iam") as call:
+            async with httpx.AsyncClient() as client:
+                response = await client.post(url, headers=headers, data=data)
+                if response.status_code == 200:
+                    return response.json()["access_token"]
+                else:
+                    call.fallback = True
+                    raise Exception(f"Failed to get access token: {response.text}")
     
     async def generate_response(self, prompt: str, context: Optional[Dict] = None) -> str:
         """Generate AI response using IBM Granite"""
+        response = await self.generate(prompt, context)
+        return response if response is not None else self._get_fallback_response(prompt)
+    
+    async def generate(self, prompt: str, context: Optional[Dict] = None) -> Optional[str]:
+        """Generate a response with IBM Granite; None if the API call fails"""
         try:
             access_token = await self.get_access_token()
             
@@ -57,19 +66,21 @@ class IBMGraniteService:
                 "project_id": self.project_id
             }
             
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(url, headers=headers, json=payload)
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    return result["results"][0]["generated_text"].strip()
-                else:
-                    logger.error(f"IBM Granite API error: {response.text}")
-                    return self._get_fallback_response(prompt)
+            with track_upstream("granite") as call:
+                async with httpx.AsyncClient(timeout=30.0) as client:
+                    response = await client.post(url, headers=headers, json=payload)
+                    
+                    if response.status_code == 200:
+                        result = response.json()
+                        return result["results"][0]["generated_text"].strip()
+                    else:
+                        logger.error(f"IBM Granite API error: {response.text}")
+                        call.fallback = True
+                        return None
                     
         except Exception as e:
             logger.error(f"Error calling IBM Granite API: {e}")
-            return self._get_fallback_response(prompt)
+            return None
     
     def _enhance_prompt(self, prompt: str, context: Optional[Dict] = None) -> str:
         """Enhance prompt with farming context and instructions"""
@@ -89,6 +100,10 @@ class IBMGraniteService:
             
             if farm_info:
                 system_prompt += f"\n\nFarm context: {farm_info}"
+            
+            if context.get("advisories"):
+                notes = "\n".join(f"- {note}" for note in context["advisories"])
+                system_prompt += f"\n\nReference advisories (use them if relevant):\n{notes}"
         
         return f"{system_prompt}\n\nFarmer question: {prompt}\n\nResponse:"
     
@@ -111,5 +126,5 @@ class IBMGraniteService:
         else:
             return "I'm here to help with your farming questions. Please provide more specific details about your concern - crops, pests, fertilizers, or other farming practices."
 
-# Global instance
-granite_service = IBMGraniteService()
\ No newline at end of file
+# Global instance, created on first use
+granite_service = services.register("granite", IBMGraniteService)
\ No newline at end of file
@@ -0,0 +1,230 @@
+from typing import Dict, Any, Optional
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from functools import partial
+from app.core.config import settings
+from app.core.registry import services
+import asyncio
+import hashlib
+import logging
+import os
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+ALLOWED_CONTENT_TYPES = {"image/jpeg", "image/png", "image/webp"}
+ALLOWED_FORMATS = {"JPEG", "PNG", "WEBP"}
+
+class InvalidUpload(Exception):
+    """The request or file is not an acceptable image upload"""
+
+class UploadTooLarge(Exception):
+    """The upload exceeds MEDIA_MAX_UPLOAD_BYTES"""
+
+@dataclass
+class ReceivedFile:
+    path: str
+    sha256: str
+    size: int
+    filename: Optional[str]
+    content_type: Optional[str]
+
+def _save_atomic(image, path: str, quality: int):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    image.save(temp_path, "JPEG", quality=quality, optimize=True, progressive=True)
+    os.replace(temp_path, path)
+
+def _process_image(source: str, image_path: str, thumbnail_path: str, max_dimension: int,
+                   thumbnail_dimension: int, quality: int, max_pixels: int) -> Dict[str, int]:
+    """Validate, downscale and thumbnail an image; runs in a worker process"""
+    from PIL import Image, ImageOps
+
+    Image.MAX_IMAGE_PIXELS = max_pixels
+    try:
+        with Image.open(source) as probe:
+            if probe.format not in ALLOWED_FORMATS:
+                raise InvalidUpload(f"Unsupported image format: {probe.format}")
+            probe.verify()
+        with Image.open(source) as original:
+            image = ImageOps.exif_transpose(original).convert("RGB")
+    except InvalidUpload:
+        raise
+    except Exception as e:
+        # Truncated files, decompression bombs and non-images all end up here
+        raise InvalidUpload(f"Not a valid image: {e}")
+
+    image.thumbnail((max_dimension, max_dimension))
+    width, height = image.size
+    _save_atomic(image, image_path, quality)
+    image.thumbnail((thumbnail_dimension, thumbnail_dimension))
+    _save_atomic(image, thumbnail_path, quality)
+    return {"width": width, "height": height}
+
+class MediaService:
+    """Content-addressed image storage on local disk.
+
+    Uploads are streamed to a temporary file while being hashed, so memory
+    use doesn't grow with file size. Images are re-encoded in a process pool,
+    stored under their sha256 and served from MEDIA_URL; uploading the same
+    file again reuses the stored copy.
+    """
+
+    collection_name = "media"
+
+    def __init__(self):
+        self.root = settings.MEDIA_ROOT
+        self.temp_dir = os.path.join(self.root, "tmp")
+        os.makedirs(self.temp_dir, exist_ok=True)
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=settings.MEDIA_PROCESS_WORKERS)
+        return self._executor
+
+    def _relative_path(self, kind: str, digest: str) -> str:
+        return f"{kind}/{digest[:2]}/{digest}.jpg"
+
+    def image_ref(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Reference stored on chat messages and activities"""
+        digest = record["_id"]
+        return {
+            "id": digest,
+            "url": f"{settings.MEDIA_URL}/{self._relative_path('images', digest)}",
+            "thumbnail_url": f"{settings.MEDIA_URL}/{self._relative_path('thumbs', digest)}",
+            "width": record.get("width"),
+            "height": record.get("height")
+        }
+
+    async def get_image(self, db, image_id: str) -> Optional[Dict[str, Any]]:
+        record = await db[self.collection_name].find_one({"_id": image_id})
+        return self.image_ref(record) if record else None
+
+    async def receive(self, request) -> ReceivedFile:
+        """Stream the "file" part of a multipart request to disk, hashing as it goes"""
+        from multipart.multipart import MultipartParser, parse_options_header
+        import aiofiles
+
+        content_length = request.headers.get("content-length")
+        if content_length and int(content_length) > settings.MEDIA_MAX_UPLOAD_BYTES + 64 * 1024:
+            raise UploadTooLarge()
+
+        content_type, options = parse_options_header(request.headers.get("content-type", ""))
+        boundary = options.get(b"boundary")
+        if content_type != b"multipart/form-data" or not boundary:
+            raise InvalidUpload("Expected a multipart/form-data request")
+
+        # Parser callbacks are synchronous; they queue data that is written after each chunk
+        state = {"field": b"", "headers": {}, "target": False, "found": False, "done": False}
+        pending = []
+
+        def on_part_begin():
+            state["headers"] = {}
+
+        def on_header_field(data, start, end):
+            state["field"] = data[start:end].lower()
+
+        def on_header_value(data, start, end):
+            state["headers"][state["field"]] = state["headers"].get(state["field"], b"") + data[start:end]
+
+        def on_headers_finished():
+            _, disposition = parse_options_header(state["headers"].get(b"content-disposition", b""))
+            state["target"] = disposition.get(b"name") == b"file" and not state["found"]
+            if state["target"]:
+                state["found"] = True
+                filename = disposition.get(b"filename")
+                state["filename"] = filename.decode("utf-8", "replace") if filename else None
+                state["content_type"] = state["headers"].get(b"content-type", b"").decode("latin-1")
+
+        def on_part_data(data, start, end):
+            if state["target"]:
+                pending.append(data[start:end])
+
+        def on_part_end():
+            if state["target"]:
+                state["target"] = False
+                state["done"] = True
+
+        parser = MultipartParser(boundary, {
+            "on_part_begin": on_part_begin,
+            "on_header_field": on_header_field,
+            "on_header_value": on_header_value,
+            "on_headers_finished": on_headers_finished,
+            "on_part_data": on_part_data,
+            "on_part_end": on_part_end
+        })
+
+        digest = hashlib.sha256()
+        size = 0
+        fd, path = tempfile.mkstemp(dir=self.temp_dir)
+        os.close(fd)
+        try:
+            async with aiofiles.open(path, "wb") as f:
+                async for chunk in request.stream():
+                    parser.write(chunk)
+                    for data in pending:
+                        size += len(data)
+                        if size > settings.MEDIA_MAX_UPLOAD_BYTES:
+                            raise UploadTooLarge()
+                        digest.update(data)
+                        await f.write(data)
+                    pending.clear()
+                    if state["done"]:
+                        break
+            parser.finalize()
+        except BaseException:
+            os.unlink(path)
+            raise
+
+        if not state["done"] or size == 0:
+            os.unlink(path)
+            raise InvalidUpload("Missing file field")
+        if state["content_type"] not in ALLOWED_CONTENT_TYPES:
+            os.unlink(path)
+            raise InvalidUpload(f"Unsupported content type: {state['content_type'] or 'unknown'}")
+
+        return ReceivedFile(path, digest.hexdigest(), size, state["filename"], state["content_type"])
+
+    async def store_image(self, db, upload: ReceivedFile, user_id: str) -> Dict[str, Any]:
+        """Process and store an uploaded image, or reuse the stored copy of identical bytes"""
+        collection = db[self.collection_name]
+        try:
+            record = await collection.find_one({"_id": upload.sha256})
+            image_path = os.path.join(self.root, self._relative_path("images", upload.sha256))
+            if record and os.path.exists(image_path):
+                return self.image_ref(record)
+
+            loop = asyncio.get_running_loop()
+            dimensions = await loop.run_in_executor(self.executor, partial(
+                _process_image,
+                upload.path,
+                image_path,
+                os.path.join(self.root, self._relative_path("thumbs", upload.sha256)),
+                settings.MEDIA_MAX_DIMENSION,
+                settings.MEDIA_THUMBNAIL_DIMENSION,
+                settings.MEDIA_JPEG_QUALITY,
+                settings.MEDIA_MAX_PIXELS
+            ))
+
+            record = {
+                "_id": upload.sha256,
+                **dimensions,
+                "original_bytes": upload.size,
+                "original_content_type": upload.content_type,
+                "uploaded_by": user_id,
+                "created_at": datetime.utcnow()
+            }
+            await collection.update_one({"_id": upload.sha256}, {"$setOnInsert": record}, upsert=True)
+            return self.image_ref(record)
+        finally:
+            os.unlink(upload.path)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+# Global instance, created on first use
+media_service = services.register("media", MediaService)
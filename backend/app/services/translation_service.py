@@ -1,21 +1,45 @@
-import boto3
-from botocore.exceptions import ClientError
 from app.core.config import settings
+from app.core.metrics import track_upstream
+from app.core.registry import services
+from app.core import cache
+import asyncio
+import hashlib
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
 class TranslationService:
     def __init__(self):
-        self.translate_client = boto3.client(
-            'translate',
-            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-            region_name=settings.AWS_REGION
-        )
+        self._translate_client = None
+        self._client_lock = threading.Lock()
+        self.cache = cache.namespace("translation", settings.TRANSLATION_CACHE_TTL)
+    
+    @property
+    def translate_client(self):
+        """Amazon Translate client, created on first use"""
+        # Calls run in worker threads, and creating a boto3 client is not thread-safe
+        with self._client_lock:
+            if self._translate_client is None:
+                # boto3 is slow to import, so keep it off the app import path
+                import boto3
+                self._translate_client = boto3.client(
+                    'translate',
+                    aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+                    aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+                    region_name=settings.AWS_REGION,
+                    endpoint_url=settings.AWS_TRANSLATE_ENDPOINT_URL or None
+                )
+        return self._translate_client
+    
+    def _call(self, operation: str, **kwargs):
+        """Blocking boto3 call; run it with asyncio.to_thread to keep the event loop free"""
+        return getattr(self.translate_client, operation)(**kwargs)
     
     async def translate_text(self, text: str, source_lang: str, target_lang: str) -> str:
         """Translate text using Amazon Translate"""
+        from botocore.exceptions import ClientError
+        
         try:
             # Map language codes
             lang_map = {
@@ -29,13 +53,24 @@ class TranslationService:
             if source_code == target_code:
                 return text
             
-            response = self.translate_client.translate_text(
-                Text=text,
-                SourceLanguageCode=source_code,
-                TargetLanguageCode=target_code
-            )
+            digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+            cache_key = f"{source_code}:{target_code}:{digest}"
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+            
+            with track_upstream("amazon_translate"):
+                response = await asyncio.to_thread(
+                    self._call,
+                    "translate_text",
+                    Text=text,
+                    SourceLanguageCode=source_code,
+                    TargetLanguageCode=target_code
+                )
             
-            return response['TranslatedText']
+            translated = response['TranslatedText']
+            await self.cache.set(cache_key, translated)
+            return translated
             
         except ClientError as e:
             logger.error(f"AWS Translate error: {e}")
@@ -47,7 +82,8 @@ class TranslationService:
     async def detect_language(self, text: str) -> str:
         """Detect language of text"""
         try:
-            response = self.translate_client.detect_dominant_language(Text=text)
+            with track_upstream("amazon_translate"):
+                response = await asyncio.to_thread(self._call, "detect_dominant_language", Text=text)
             languages = response['Languages']
             
             if languages:
@@ -64,5 +100,5 @@ class TranslationService:
             logger.error(f"Language detection error: {e}")
             return 'en'
 
-# Global instance
-translation_service = TranslationService()
\ No newline at end of file
+# Global instance, created on first use
+translation_service = services.register("translation", TranslationService)
\ No newline at end of file
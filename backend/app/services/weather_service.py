@@ -1,6 +1,10 @@
+import asyncio
 import httpx
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from app.core.config import settings
+from app.core.metrics import track_upstream
+from app.core.registry import services
+from app.core import cache
 import logging
 
 logger = logging.getLogger(__name__)
@@ -8,10 +12,17 @@ logger = logging.getLogger(__name__)
 class WeatherService:
     def __init__(self):
         self.api_key = settings.WEATHER_API_KEY
-        self.base_url = "https://api.openweathermap.org/data/2.5"
+        self.base_url = settings.WEATHER_API_URL
+        self.current_cache = cache.namespace("weather", settings.WEATHER_CACHE_TTL)
+        self.forecast_cache = cache.namespace("forecast", settings.FORECAST_CACHE_TTL)
     
-    async def get_current_weather(self, location: str) -> Dict[str, Any]:
-        """Get current weather for location"""
+    async def get_current_weather(self, location: str, refresh: bool = False) -> Dict[str, Any]:
+        """Get current weather for location; refresh skips the cached copy"""
+        cache_key = location.strip().lower()
+        cached = None if refresh else await self.current_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
             url = f"{self.base_url}/weather"
             params = {
@@ -20,21 +31,29 @@ class WeatherService:
                 "units": "metric"
             }
             
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url, params=params)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    return self._format_weather_data(data)
-                else:
-                    return self._get_mock_weather_data(location)
+            with track_upstream("openweathermap") as call:
+                async with httpx.AsyncClient() as client:
+                    response = await client.get(url, params=params)
+                    
+                    if response.status_code == 200:
+                        weather_data = self._format_weather_data(response.json())
+                        await self.current_cache.set(cache_key, weather_data)
+                        return weather_data
+                    else:
+                        call.fallback = True
+                        return self._get_mock_weather_data(location)
                     
         except Exception as e:
             logger.error(f"Weather API error: {e}")
             return self._get_mock_weather_data(location)
     
-    async def get_weather_forecast(self, location: str, days: int = 5) -> Dict[str, Any]:
-        """Get weather forecast for location"""
+    async def get_weather_forecast(self, location: str, days: int = 5, refresh: bool = False) -> Dict[str, Any]:
+        """Get weather forecast for location; refresh skips the cached copy"""
+        cache_key = f"{location.strip().lower()}:{days}"
+        cached = None if refresh else await self.forecast_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
             url = f"{self.base_url}/forecast"
             params = {
@@ -44,19 +63,36 @@ class WeatherService:
                 "cnt": days * 8  # 8 forecasts per day (3-hour intervals)
             }
             
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url, params=params)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    return self._format_forecast_data(data)
-                else:
-                    return self._get_mock_forecast_data(location, days)
+            with track_upstream("openweathermap") as call:
+                async with httpx.AsyncClient() as client:
+                    response = await client.get(url, params=params)
+                    
+                    if response.status_code == 200:
+                        forecast_data = self._format_forecast_data(response.json())
+                        await self.forecast_cache.set(cache_key, forecast_data)
+                        return forecast_data
+                    else:
+                        call.fallback = True
+                        return self._get_mock_forecast_data(location, days)
                     
         except Exception as e:
             logger.error(f"Weather forecast API error: {e}")
             return self._get_mock_forecast_data(location, days)
     
+    async def refresh_locations(self, locations: List[str], concurrency: int = 8) -> int:
+        """Re-fetch current weather and the 5-day forecast for each location into the cache"""
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def refresh(location):
+            async with semaphore:
+                await asyncio.gather(
+                    self.get_current_weather(location, refresh=True),
+                    self.get_weather_forecast(location, 5, refresh=True)
+                )
+
+        await asyncio.gather(*(refresh(location) for location in locations))
+        return len(locations)
+    
     def _format_weather_data(self, data: Dict) -> Dict[str, Any]:
         """Format weather API response"""
         return {
@@ -137,5 +173,5 @@ class WeatherService:
             "forecast": forecasts
         }
 
-# Global instance
-weather_service = WeatherService()
\ No newline at end of file
+# Global instance, created on first use
+weather_service = services.register("weather", WeatherService)
\ No newline at end of file
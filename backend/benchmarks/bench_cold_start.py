@@ -0,0 +1,91 @@
+"""Measure worker cold start: import time of app.main and time to first /health.
+
+Usage: python -m benchmarks.bench_cold_start [--runs N] [--port PORT]
+
+Time to first /health starts uvicorn in a subprocess and polls until it
+answers, so it includes MongoDB connection and index bootstrap; point
+MONGODB_URI at a local mongod. Prints one JSON object.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+IMPORT_SNIPPET = (
+    "import time; start = time.perf_counter(); import app.main; "
+    "print(time.perf_counter() - start)"
+)
+
+def measure_import(runs: int) -> dict:
+    timings = []
+    for _ in range(runs):
+        output = subprocess.check_output([sys.executable, "-c", IMPORT_SNIPPET], text=True)
+        timings.append(float(output.strip().splitlines()[-1]))
+    return {
+        "median_ms": round(statistics.median(timings) * 1000, 1),
+        "min_ms": round(min(timings) * 1000, 1),
+        "max_ms": round(max(timings) * 1000, 1)
+    }
+
+def slowest_imports(limit: int = 10) -> list:
+    """Top modules by cumulative import time from -X importtime"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        capture_output=True, text=True
+    )
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = (part.strip() for part in line[len("import time:"):].split("|"))
+        entries.append((int(cumulative), module))
+    entries.sort(reverse=True)
+    return [{"module": module, "cumulative_ms": round(us / 1000, 1)} for us, module in entries[:limit]]
+
+def measure_first_health(port: int, timeout: float = 60.0) -> float:
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env={**os.environ, "ENVIRONMENT": os.getenv("ENVIRONMENT", "benchmark")}
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/health", timeout=0.5).status_code == 200:
+                    return time.perf_counter() - start
+            except httpx.HTTPError:
+                pass
+            if process.poll() is not None:
+                raise RuntimeError("uvicorn exited before /health answered")
+            time.sleep(0.01)
+        raise RuntimeError("Timed out waiting for /health")
+    finally:
+        process.terminate()
+        process.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark worker cold start")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8799)
+    args = parser.parse_args()
+
+    health_timings = [measure_first_health(args.port) for _ in range(args.runs)]
+    report = {
+        "benchmark": "cold_start",
+        "import_app_main": measure_import(args.runs),
+        "first_health": {
+            "median_ms": round(statistics.median(health_timings) * 1000, 1),
+            "min_ms": round(min(health_timings) * 1000, 1),
+            "max_ms": round(max(health_timings) * 1000, 1)
+        },
+        "slowest_imports": slowest_imports()
+    }
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
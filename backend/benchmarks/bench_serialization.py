@@ -0,0 +1,106 @@
+"""Compare response serialization paths on typical list payloads.
+
+Usage: python -m benchmarks.bench_serialization [--iterations N]
+
+Prints one JSON object with the mean time per payload for FastAPI's
+jsonable_encoder + json.dumps path and for app.core.responses.dumps.
+"""
+import argparse
+import json
+import timeit
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+
+from app.core.responses import dumps
+
+def make_alerts(count: int = 100) -> dict:
+    now = datetime.utcnow()
+    return {
+        "success": True,
+        "data": [{
+            "_id": ObjectId(),
+            "user_id": "farmer-001",
+            "type": "weather",
+            "priority": "high",
+            "title": "Weather Alert",
+            "message": "Rain expected in Thrissur. Avoid applying fertilizers today.",
+            "location": "Thrissur",
+            "crop": "paddy",
+            "is_read": False,
+            "is_active": True,
+            "expires_at": now + timedelta(days=7),
+            "created_at": now - timedelta(hours=i)
+        } for i in range(count)],
+        "unread_count": count,
+        "pagination": {"page": 1, "limit": count, "total": count, "pages": 1}
+    }
+
+def make_activities(count: int = 100) -> dict:
+    now = datetime.utcnow()
+    return {
+        "success": True,
+        "data": [{
+            "_id": ObjectId(),
+            "user_id": "farmer-001",
+            "farm_id": ObjectId(),
+            "type": "irrigated",
+            "crop": "banana",
+            "notes": "Drip irrigation for two hours in the morning",
+            "location": "Palakkad",
+            "weather": {"temperature": 29, "humidity": 78, "condition": "cloudy"},
+            "images": [{"url": "https://example.com/a.jpg", "thumbnail_url": "https://example.com/a_t.jpg"}],
+            "is_deleted": False,
+            "created_at": now - timedelta(hours=i)
+        } for i in range(count)],
+        "pagination": {"page": 1, "limit": count, "total": count, "pages": 1}
+    }
+
+def make_chat_history(count: int = 100) -> dict:
+    now = datetime.utcnow()
+    return {
+        "success": True,
+        "data": [{
+            "id": str(ObjectId()),
+            "content": "How often should I water my pepper vines during the dry season?" * 2,
+            "sender": "user" if i % 2 == 0 else "ai",
+            "has_image": False,
+            "image_url": None,
+            "language": "en",
+            "timestamp": now - timedelta(minutes=i)
+        } for i in range(count)]
+    }
+
+def encode_current(content: dict) -> bytes:
+    return json.dumps(
+        jsonable_encoder(content, custom_encoder={ObjectId: str}),
+        ensure_ascii=False,
+        separators=(",", ":")
+    ).encode("utf-8")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark response serialization")
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+
+    payloads = {
+        "alerts": make_alerts(),
+        "activities": make_activities(),
+        "chat_history": make_chat_history()
+    }
+
+    results = {}
+    for name, payload in payloads.items():
+        current = timeit.timeit(lambda: encode_current(payload), number=args.iterations)
+        fast = timeit.timeit(lambda: dumps(payload), number=args.iterations)
+        results[name] = {
+            "jsonable_encoder_us": round(current / args.iterations * 1e6, 1),
+            "orjson_us": round(fast / args.iterations * 1e6, 1),
+            "speedup": round(current / fast, 1)
+        }
+
+    print(json.dumps({"benchmark": "serialization", "iterations": args.iterations, "results": results}, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""In-process stand-ins for IBM IAM/Granite, Amazon Translate and OpenWeatherMap.
+
+One FastAPI app serves all four upstreams so the benchmark only needs one
+extra port. Each upstream has its own latency and error rate so slow or
+flaky dependencies can be reproduced.
+"""
+import asyncio
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+UPSTREAMS = ("iam", "granite", "translate", "weather")
+
+@dataclass
+class UpstreamBehaviour:
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+
+@dataclass
+class FakeUpstreamConfig:
+    upstreams: Dict[str, UpstreamBehaviour] = field(
+        default_factory=lambda: {name: UpstreamBehaviour() for name in UPSTREAMS}
+    )
+    seed: int = 42
+
+def create_fake_upstreams(config: FakeUpstreamConfig) -> FastAPI:
+    app = FastAPI()
+    rng = random.Random(config.seed)
+    calls = {name: 0 for name in UPSTREAMS}
+    app.state.calls = calls
+
+    async def simulate(name: str) -> bool:
+        """Sleep for the configured latency; return False to inject an error"""
+        behaviour = config.upstreams[name]
+        calls[name] += 1
+        delay = behaviour.latency_ms + rng.uniform(0, behaviour.jitter_ms)
+        if delay:
+            await asyncio.sleep(delay / 1000)
+        return rng.random() >= behaviour.error_rate
+
+    @app.post("/identity/token")
+    async def iam_token():
+        if not await simulate("iam"):
+            return JSONResponse({"errorMessage": "injected failure"}, status_code=500)
+        return {"access_token": "fake-token", "expires_in": 3600, "token_type": "Bearer"}
+
+    @app.post("/ml/v1/text/generation")
+    async def granite_generate(request: Request):
+        body = await request.json()
+        if not await simulate("granite"):
+            return JSONResponse({"errors": [{"message": "injected failure"}]}, status_code=500)
+        prompt = body.get("input", "")
+        return {"results": [{
+            "generated_text": " Water the crop early in the morning and mulch to keep the soil moist. "
+                              f"({len(prompt)} prompt chars)",
+            "generated_token_count": 24
+        }]}
+
+    @app.post("/")
+    async def amazon_translate(request: Request):
+        # Amazon Translate speaks JSON 1.1 with the operation in X-Amz-Target
+        target = request.headers.get("x-amz-target", "")
+        body = await request.json()
+        if not await simulate("translate"):
+            return JSONResponse(
+                {"__type": "InternalServerException", "message": "injected failure"},
+                status_code=500
+            )
+        if target.endswith("TranslateText"):
+            return JSONResponse({
+                "TranslatedText": f"[{body['TargetLanguageCode']}] {body['Text']}",
+                "SourceLanguageCode": body["SourceLanguageCode"],
+                "TargetLanguageCode": body["TargetLanguageCode"]
+            }, media_type="application/x-amz-json-1.1")
+        return JSONResponse(
+            {"__type": "UnknownOperationException", "message": target},
+            status_code=400
+        )
+
+    @app.get("/data/2.5/weather")
+    async def current_weather(q: str = "Thrissur"):
+        if not await simulate("weather"):
+            return JSONResponse({"cod": 500, "message": "injected failure"}, status_code=500)
+        return {
+            "name": q,
+            "main": {"temp": 29.4, "humidity": 78},
+            "wind": {"speed": 3.2},
+            "rain": {"1h": 0.4},
+            "weather": [{"main": "Rain", "description": "light rain"}]
+        }
+
+    @app.get("/data/2.5/forecast")
+    async def forecast(q: str = "Thrissur", cnt: int = 40):
+        if not await simulate("weather"):
+            return JSONResponse({"cod": 500, "message": "injected failure"}, status_code=500)
+        start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        items = []
+        for i in range(cnt):
+            moment = start + timedelta(hours=3 * i)
+            items.append({
+                "dt_txt": moment.strftime("%Y-%m-%d %H:%M:%S"),
+                "main": {"temp": 24 + (i % 8), "humidity": 70 + (i % 5)},
+                "rain": {"3h": (i % 4) * 0.5},
+                "weather": [{"main": "Clouds"}]
+            })
+        return {"city": {"name": q}, "list": items}
+
+    return app
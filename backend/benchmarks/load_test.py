@@ -0,0 +1,316 @@
+"""Reproducible load test against a local mongod and fake upstreams.
+
+Usage:
+    python -m benchmarks.load_test [--mongodb-uri URI] [--requests N]
+        [--concurrency C] [--users U] [--granite-latency-ms MS]
+        [--error-rate R] [--output results.json]
+
+The API and the fake upstreams run in this process on local ports. The
+target database is dropped and reseeded before every run. Each workload runs
+on its own so the MongoDB command count per request can be attributed to it.
+Results are printed as JSON (and written to --output) so runs can be
+compared from one commit to the next.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+
+import httpx
+import uvicorn
+
+from benchmarks.fake_upstreams import FakeUpstreamConfig, UpstreamBehaviour, create_fake_upstreams
+
+CROPS = ["paddy", "coconut", "rubber", "banana", "brinjal", "pepper", "cardamom", "ginger", "turmeric"]
+SOILS = ["laterite", "alluvial", "coastal", "forest"]
+DISTRICTS = ["Thrissur", "Palakkad", "Wayanad", "Idukki", "Kottayam", "Alappuzha", "Kannur"]
+ACTIVITY_TYPES = ["sowedSeeds", "appliedFertilizer", "irrigated", "pestDisease", "weeding", "harvested"]
+
+def configure_environment(args, upstream_url: str):
+    """Point the app at the fakes; must run before app modules are imported"""
+    os.environ.update({
+        "ENVIRONMENT": "benchmark",
+        "MONGODB_URI": args.mongodb_uri,
+        "IBM_API_KEY": "fake",
+        "IBM_PROJECT_ID": "fake",
+        "IBM_API_URL": upstream_url,
+        "IBM_IAM_URL": f"{upstream_url}/identity/token",
+        "AWS_ACCESS_KEY_ID": "fake",
+        "AWS_SECRET_ACCESS_KEY": "fake",
+        "AWS_TRANSLATE_ENDPOINT_URL": upstream_url,
+        "WEATHER_API_KEY": "fake",
+        "WEATHER_API_URL": f"{upstream_url}/data/2.5",
+    })
+    # Rate limits would throttle the synthetic users, so lift them
+    for route_class in ("READ", "WRITE", "DELETE", "HEAVY", "LLM", "EXTERNAL"):
+        os.environ[f"RATE_LIMIT_{route_class}"] = "1000000/minute"
+
+def user_id(index: int) -> str:
+    return f"bench-user-{index:05d}"
+
+async def seed(database, users: int, activities_per_user: int, alerts_per_user: int, rng: random.Random):
+    """Drop and reseed the benchmark database with realistic volumes"""
+    for name in ("farms", "activities", "activity_rollups", "alerts", "chats"):
+        await database[name].delete_many({})
+
+    now = datetime.utcnow()
+    farms = []
+    for index in range(users):
+        farms.append({
+            "user_id": user_id(index),
+            "name": f"Farm {index}",
+            "location": rng.choice(DISTRICTS),
+            "land_size": round(rng.uniform(5, 200), 1),
+            "land_unit": "cents",
+            "current_crop": rng.choice(CROPS),
+            "soil_type": rng.choice(SOILS),
+            "irrigation": rng.random() < 0.5,
+            "coordinates": {"type": "Point", "coordinates": [
+                round(rng.uniform(75.0, 77.3), 4), round(rng.uniform(8.3, 12.7), 4)
+            ]},
+            "is_active": True,
+            "created_at": now,
+            "updated_at": now
+        })
+    result = await database.farms.insert_many(farms)
+
+    activities, alerts, chats = [], [], []
+    for index, (farm, farm_id) in enumerate(zip(farms, result.inserted_ids)):
+        for i in range(activities_per_user):
+            activities.append({
+                "user_id": farm["user_id"],
+                "farm_id": farm_id,
+                "type": rng.choice(ACTIVITY_TYPES),
+                "crop": farm["current_crop"],
+                "notes": "Routine field work logged from the app",
+                "location": farm["location"],
+                "weather": {"temperature": 29, "humidity": 80},
+                "images": [],
+                "is_deleted": False,
+                "created_at": now - timedelta(hours=6 * i)
+            })
+        for i in range(alerts_per_user):
+            alerts.append({
+                "user_id": farm["user_id"],
+                "type": rng.choice(["weather", "pest", "irrigation"]),
+                "priority": rng.choice(["high", "medium", "low"]),
+                "title": "Field advisory",
+                "message": "Check drainage channels before the expected rain.",
+                "location": farm["location"],
+                "crop": farm["current_crop"],
+                "is_read": rng.random() < 0.5,
+                "is_active": True,
+                "expires_at": now + timedelta(days=7),
+                "created_at": now - timedelta(hours=i)
+            })
+        chats.append({
+            "user_id": farm["user_id"],
+            "session_id": f"session-{index}",
+            "messages": [{
+                "id": f"{index}-{i}",
+                "content": "When should I apply fertilizer to my crop?",
+                "sender": "user" if i % 2 == 0 else "ai",
+                "has_image": False,
+                "image_url": None,
+                "language": "en",
+                "timestamp": now - timedelta(minutes=i)
+            } for i in range(20)],
+            "is_active": True,
+            "created_at": now,
+            "updated_at": now
+        })
+
+    for name, documents in (("activities", activities), ("alerts", alerts), ("chats", chats)):
+        for start in range(0, len(documents), 5000):
+            await database[name].insert_many(documents[start:start + 5000], ordered=False)
+
+    from app.services.analytics_service import analytics_service
+    await analytics_service.rebuild(database)
+
+def build_workloads(users: int, rng: random.Random) -> Dict[str, Callable]:
+    """Each workload issues one logical client action for a random user"""
+
+    def headers() -> Dict[str, str]:
+        return {"X-User-Id": user_id(rng.randrange(users))}
+
+    async def chat(client):
+        language = "ml" if rng.random() < 0.3 else "en"
+        return [await client.post("/api/chat/message", headers=headers(), json={
+            "message": "How do I control pests on my crop this week?",
+            "language": language
+        })]
+
+    async def dashboard(client):
+        return [await client.get("/api/dashboard/", params={"location": "Thrissur", "items": 5}, headers=headers())]
+
+    async def dashboard_fanout(client):
+        # Baseline: what the client did before /api/dashboard, one request per section
+        user_headers = headers()
+        return list(await asyncio.gather(
+            client.get("/api/farm/profile", headers=user_headers),
+            client.get("/api/weather/current", params={"location": "Thrissur"}, headers=user_headers),
+            client.get("/api/weather/forecast", params={"location": "Thrissur"}, headers=user_headers),
+            client.get("/api/alerts/", params={"limit": 5}, headers=user_headers),
+            client.get("/api/farm/activities", params={"limit": 5}, headers=user_headers),
+        ))
+
+    async def alerts(client):
+        return [await client.get("/api/alerts/", params={"limit": 100}, headers=headers())]
+
+    async def activities(client):
+        return [await client.get("/api/farm/activities", params={"limit": 100}, headers=headers())]
+
+    async def add_activity(client):
+        return [await client.post("/api/farm/activities", headers=headers(), json={
+            "type": rng.choice(ACTIVITY_TYPES),
+            "crop": rng.choice(CROPS),
+            "notes": "Logged by the benchmark",
+            "location": rng.choice(DISTRICTS)
+        })]
+
+    return {
+        "chat": chat,
+        "dashboard": dashboard,
+        "dashboard_fanout": dashboard_fanout,
+        "alerts": alerts,
+        "activities": activities,
+        "add_activity": add_activity
+    }
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(q * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+def mongo_command_count() -> int:
+    from app.core.db_metrics import mongo_metrics
+    return sum(histogram.count for _, histogram in mongo_metrics.commands.items())
+
+async def run_workload(client, workload: Callable, requests: int, concurrency: int) -> Dict:
+    latencies: List[float] = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            start = time.perf_counter()
+            try:
+                responses = await workload(client)
+                if any(response.status_code >= 400 for response in responses):
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    commands_before = mongo_command_count()
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    commands = mongo_command_count() - commands_before
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "throughput_rps": round(requests / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "mongo_commands_per_request": round(commands / requests, 2)
+    }
+
+async def start_server(app, port: int) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+    return server
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except Exception:
+        return "unknown"
+
+async def main_async(args) -> Dict:
+    rng = random.Random(args.seed)
+
+    behaviour = {
+        "iam": UpstreamBehaviour(latency_ms=args.iam_latency_ms, error_rate=args.error_rate),
+        "granite": UpstreamBehaviour(latency_ms=args.granite_latency_ms, jitter_ms=args.granite_latency_ms / 2,
+                                     error_rate=args.error_rate),
+        "translate": UpstreamBehaviour(latency_ms=args.translate_latency_ms, error_rate=args.error_rate),
+        "weather": UpstreamBehaviour(latency_ms=args.weather_latency_ms, error_rate=args.error_rate),
+    }
+    fakes = await start_server(create_fake_upstreams(FakeUpstreamConfig(behaviour, args.seed)), args.upstream_port)
+    configure_environment(args, f"http://127.0.0.1:{args.upstream_port}")
+
+    from app.main import app
+    from app.database import db
+
+    api = await start_server(app, args.api_port)
+    try:
+        await seed(db.database, args.users, args.activities_per_user, args.alerts_per_user, rng)
+
+        workloads = build_workloads(args.users, rng)
+        selected = args.workloads.split(",") if args.workloads else list(workloads)
+        results = {}
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.api_port}", timeout=60.0) as client:
+            for name in selected:
+                # Warm up connections and caches before measuring
+                await run_workload(client, workloads[name], min(args.concurrency, args.requests), args.concurrency)
+                results[name] = await run_workload(client, workloads[name], args.requests, args.concurrency)
+
+        return {
+            "benchmark": "load_test",
+            "revision": git_revision(),
+            "timestamp": datetime.utcnow().isoformat(),
+            "config": {
+                key: value for key, value in vars(args).items()
+                if key not in ("output", "api_port", "upstream_port")
+            },
+            "upstream_calls": dict(fakes.config.app.state.calls),
+            "results": results
+        }
+    finally:
+        api.should_exit = True
+        fakes.should_exit = True
+        await asyncio.sleep(0.2)
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the API against local stand-ins")
+    parser.add_argument("--mongodb-uri", default="mongodb://localhost:27017/krishi-sakhi-bench")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per workload")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--activities-per-user", type=int, default=50)
+    parser.add_argument("--alerts-per-user", type=int, default=20)
+    parser.add_argument("--workloads", default="", help="Comma-separated subset of workloads")
+    parser.add_argument("--iam-latency-ms", type=float, default=50)
+    parser.add_argument("--granite-latency-ms", type=float, default=800)
+    parser.add_argument("--translate-latency-ms", type=float, default=80)
+    parser.add_argument("--weather-latency-ms", type=float, default=120)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--api-port", type=int, default=8765)
+    parser.add_argument("--upstream-port", type=int, default=8766)
+    parser.add_argument("--output", help="Also write results to this file")
+    args = parser.parse_args()
+
+    report = asyncio.run(main_async(args))
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+
+if __name__ == "__main__":
+    sys.exit(main())
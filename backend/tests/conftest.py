@@ -0,0 +1,103 @@
+"""Shared test fixtures.
+
+Tests that need MongoDB run against the server in MONGODB_TEST_URL, each in a
+throwaway database, and are skipped when it is unset:
+
+    MONGODB_TEST_URL=mongodb://localhost:27017 python -m pytest
+"""
+import asyncio
+import os
+import uuid
+import pytest
+from pymongo import monitoring
+
+# Keep request handling in-process and deterministic
+os.environ.setdefault("CACHE_URL", "memory://")
+os.environ.setdefault("ADMISSION_CONTROL_ENABLED", "false")
+os.environ.setdefault("LOOP_MONITOR_ENABLED", "false")
+os.environ.setdefault("CREATE_INDEXES_ON_STARTUP", "false")
+# Every test client shares one IP, so rate limits would leak between tests
+for route_class in ("READ", "WRITE", "DELETE", "HEAVY", "LLM", "EXTERNAL"):
+    os.environ.setdefault(f"RATE_LIMIT_{route_class}", "1000000/minute")
+
+# Connection handshakes and session bookkeeping are not round trips made by handlers
+IGNORED_COMMANDS = {
+    "hello", "ismaster", "isMaster", "ping", "buildInfo", "buildinfo",
+    "saslStart", "saslContinue", "endSessions", "killCursors",
+}
+
+class CommandCounter(monitoring.CommandListener):
+    """Record every command a Mongo client sends, as (command, collection)"""
+
+    def __init__(self):
+        self.commands = []
+
+    def started(self, event):
+        if event.command_name not in IGNORED_COMMANDS:
+            self.commands.append((event.command_name, event.command.get(event.command_name)))
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+    def reset(self):
+        self.commands.clear()
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+@pytest.fixture
+def command_counter():
+    return CommandCounter()
+
+@pytest.fixture
+async def mongo_db(command_counter):
+    url = os.getenv("MONGODB_TEST_URL")
+    if not url:
+        pytest.skip("MONGODB_TEST_URL is not set")
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    client = AsyncIOMotorClient(url, event_listeners=[command_counter])
+    database = client[f"krishi_test_{uuid.uuid4().hex[:12]}"]
+    try:
+        yield database
+    finally:
+        await client.drop_database(database.name)
+        client.close()
+
+@pytest.fixture
+async def api(mongo_db, command_counter):
+    """HTTP client for the app, with its database pointed at mongo_db"""
+    import httpx
+    from app.main import app
+    from app.database import get_database
+
+    app.dependency_overrides[get_database] = lambda: mongo_db
+    try:
+        async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+            yield client
+    finally:
+        app.dependency_overrides.pop(get_database, None)
+
+@pytest.fixture
+def user_headers():
+    # A fresh user per test keeps the shared in-memory caches out of the counts
+    return {"X-User-Id": f"test-{uuid.uuid4().hex[:12]}"}
+
+@pytest.fixture
+async def loop_budget():
+    """Fail the test if any event loop callback ran longer than LOOP_BLOCK_BUDGET_MS (50 ms if unset)"""
+    from app.core.config import settings
+    from app.core.loop_monitor import loop_monitor
+
+    loop = asyncio.get_running_loop()
+    debug = loop.get_debug()
+    loop_monitor.enforce_budget(loop, settings.LOOP_BLOCK_BUDGET_MS or 50)
+    try:
+        yield loop_monitor
+        loop_monitor.assert_within_budget()
+    finally:
+        loop.set_debug(debug)
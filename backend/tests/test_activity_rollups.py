@@ -0,0 +1,74 @@
+"""Activity rollups stay consistent with the raw activities."""
+import pytest
+from datetime import datetime
+from app.core.config import settings
+from app.services.analytics_service import analytics_service
+
+pytestmark = pytest.mark.anyio
+
+def activity(user_id, hour, activity_type="irrigated"):
+    return {
+        "user_id": user_id,
+        "type": activity_type,
+        "crop": "coconut",
+        "is_deleted": False,
+        "created_at": datetime(2024, 3, 1, hour)
+    }
+
+async def test_deleting_latest_activity_moves_last_at_back(mongo_db):
+    earlier, latest = activity("u1", 8), activity("u1", 17)
+    await mongo_db.activities.insert_many([earlier, latest])
+    await analytics_service.record(mongo_db, [earlier, latest])
+
+    await mongo_db.activities.update_one({"_id": latest["_id"]}, {"$set": {"is_deleted": True}})
+    await analytics_service.record(mongo_db, [latest], delta=-1)
+
+    rollup = await mongo_db.activity_rollups.find_one({"user_id": "u1"})
+    assert rollup["types"]["irrigated"] == 1
+    assert rollup["last_at"]["irrigated"] == datetime(2024, 3, 1, 8)
+
+    await mongo_db.activities.update_one({"_id": earlier["_id"]}, {"$set": {"is_deleted": True}})
+    await analytics_service.record(mongo_db, [earlier], delta=-1)
+
+    rollup = await mongo_db.activity_rollups.find_one({"user_id": "u1"})
+    assert "irrigated" not in rollup.get("last_at", {})
+
+async def test_rebuild_replaces_rollups_and_drops_stale_ones(mongo_db):
+    kept = activity("u1", 8)
+    await mongo_db.activities.insert_one(kept)
+    await mongo_db.activity_rollups.insert_many([
+        {"_id": "u1:2024-03-01", "user_id": "u1", "date": datetime(2024, 3, 1), "total": 5,
+         "updated_at": datetime(2024, 3, 1)},
+        {"_id": "u1:2024-02-01", "user_id": "u1", "date": datetime(2024, 2, 1), "total": 2,
+         "updated_at": datetime(2024, 2, 1)},
+        {"_id": "u2:2024-02-01", "user_id": "u2", "date": datetime(2024, 2, 1), "total": 2,
+         "updated_at": datetime(2024, 2, 1)},
+    ])
+
+    assert await analytics_service.rebuild(mongo_db, "u1") == 1
+
+    rollups = {rollup["_id"]: rollup async for rollup in mongo_db.activity_rollups.find()}
+    assert set(rollups) == {"u1:2024-03-01", "u2:2024-02-01"}
+    assert rollups["u1:2024-03-01"]["total"] == 1
+
+async def test_rebuild_leaves_rollups_recorded_meanwhile(mongo_db):
+    await mongo_db.activities.insert_one(activity("u1", 8))
+    # record() landed an $inc after the rebuild started
+    await mongo_db.activity_rollups.insert_one(
+        {"_id": "u1:2024-03-01", "user_id": "u1", "date": datetime(2024, 3, 1), "total": 2,
+         "updated_at": datetime(2999, 1, 1)}
+    )
+
+    await analytics_service.rebuild(mongo_db, "u1")
+
+    rollup = await mongo_db.activity_rollups.find_one({"_id": "u1:2024-03-01"})
+    assert rollup["total"] == 2
+
+async def test_rebuild_writes_in_bounded_batches(mongo_db, command_counter, monkeypatch):
+    monkeypatch.setattr(settings, "ROLLUP_REBUILD_BATCH_SIZE", 2)
+    await mongo_db.activities.insert_many([activity(f"u{i}", 8) for i in range(5)])
+    command_counter.reset()
+
+    assert await analytics_service.rebuild(mongo_db) == 5
+
+    assert command_counter.commands.count(("update", "activity_rollups")) == 3
@@ -0,0 +1,34 @@
+"""Offline activity sync."""
+import pytest
+from datetime import datetime
+
+pytestmark = pytest.mark.anyio
+
+FARM = {
+    "name": "Test farm",
+    "location": "Thrissur",
+    "land_size": 50,
+    "land_unit": "cents",
+    "current_crop": "coconut",
+    "soil_type": "laterite"
+}
+
+async def test_batch_accepts_timestamps_with_offsets(api, mongo_db, user_headers):
+    response = await api.post("/api/farm/profile", json=FARM, headers=user_headers)
+    assert response.status_code == 200
+
+    response = await api.post("/api/farm/activities/batch", json={"items": [{
+        "idempotency_key": "offline-1",
+        "type": "irrigated",
+        "crop": "coconut",
+        "location": "Thrissur",
+        "created_at": "2024-03-02T01:30:00+05:30"
+    }]}, headers=user_headers)
+
+    assert response.status_code == 200
+    assert response.json()["summary"]["created"] == 1
+    activity = await mongo_db.activities.find_one({"idempotency_key": "offline-1"})
+    # Stored as naive UTC and counted on the UTC day
+    assert activity["created_at"] == datetime(2024, 3, 1, 20, 0)
+    rollup = await mongo_db.activity_rollups.find_one({"user_id": user_headers["X-User-Id"]})
+    assert rollup["date"] == datetime(2024, 3, 1)
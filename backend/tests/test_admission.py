@@ -0,0 +1,21 @@
+"""Adaptive admission limits."""
+from app.core.admission import AdaptiveLimiter, classify
+
+def test_long_running_endpoints_are_not_judged_as_db_requests():
+    assert classify("/api/export/activities") == "bulk"
+    assert classify("/api/media/images") == "bulk"
+    assert classify("/api/farm/activities/batch") == "bulk"
+    assert classify("/api/farm/activities") == "db"
+    assert classify("/health") is None
+
+def test_limit_recovers_under_light_load():
+    limiter = AdaptiveLimiter("test", initial=40, min_limit=4, max_limit=40, target_latency=0.5)
+    assert limiter.try_acquire()
+    limiter.release(2.0)
+    assert int(limiter.limit) == 30
+
+    # One request at a time, each well under the target
+    for _ in range(400):
+        assert limiter.try_acquire()
+        limiter.release(0.01)
+    assert int(limiter.limit) == 40
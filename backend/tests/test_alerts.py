@@ -0,0 +1,52 @@
+"""Alert list caching."""
+import pytest
+from datetime import datetime, timedelta
+from app.services.archive_service import archive_service
+
+pytestmark = pytest.mark.anyio
+
+async def test_alert_list_revalidates_with_one_lookup(api, mongo_db, command_counter, user_headers):
+    user_id = user_headers["X-User-Id"]
+    now = datetime.utcnow()
+    await mongo_db.alerts.insert_many([
+        {"user_id": user_id, "type": "pest", "priority": "medium", "title": "Old", "message": "Expired",
+         "is_read": False, "is_active": True, "created_at": now - timedelta(days=60),
+         "updated_at": now - timedelta(days=60), "expires_at": now - timedelta(days=53)},
+        {"user_id": user_id, "type": "weather", "priority": "high", "title": "New", "message": "Rain",
+         "is_read": False, "is_active": True, "created_at": now, "updated_at": now,
+         "expires_at": now + timedelta(days=7)},
+    ])
+    response = await api.get("/api/alerts/", headers=user_headers)
+    assert len(response.json()["data"]) == 2
+    # First revalidation swaps the content tag for the version tag
+    response = await api.get("/api/alerts/", headers={**user_headers, "If-None-Match": response.headers["etag"]})
+    etag = response.headers["etag"]
+    command_counter.reset()
+
+    response = await api.get("/api/alerts/", headers={**user_headers, "If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert command_counter.commands == [("find", "alert_versions")]
+
+    # Archiving removes the expired alert, which is not the most recently updated one
+    await archive_service.archive_collection(mongo_db, "alerts")
+
+    response = await api.get("/api/alerts/", headers={**user_headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert [alert["title"] for alert in response.json()["data"]] == ["New"]
+
+async def test_marking_an_alert_read_changes_the_version(api, user_headers):
+    response = await api.post("/api/farm/profile", json={
+        "name": "Test farm", "location": "Thrissur", "land_size": 50, "land_unit": "cents",
+        "current_crop": "coconut", "soil_type": "laterite"
+    }, headers=user_headers)
+    assert response.status_code == 200
+    alerts = (await api.post("/api/alerts/generate", headers=user_headers)).json()["data"]
+    response = await api.get("/api/alerts/", headers={**user_headers, "If-None-Match": '"none"'})
+    etag = response.headers["etag"]
+
+    response = await api.patch(f"/api/alerts/{alerts[0]['_id']}/read", headers=user_headers)
+    assert response.status_code == 200
+
+    response = await api.get("/api/alerts/", headers={**user_headers, "If-None-Match": etag})
+    assert response.status_code == 200
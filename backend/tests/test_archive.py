@@ -0,0 +1,51 @@
+"""Archiving and restoring documents."""
+import pytest
+from bson import encode
+from datetime import datetime, timedelta
+from app.services.archive_service import archive_service
+
+pytestmark = pytest.mark.anyio
+
+def chat(session_id, updated_at, content, is_active=False):
+    return {
+        "user_id": "u1",
+        "session_id": session_id,
+        "messages": [{"content": content, "sender": "user"}],
+        "is_active": is_active,
+        "created_at": updated_at,
+        "updated_at": updated_at
+    }
+
+async def test_documents_written_after_being_read_are_not_archived(mongo_db):
+    old = datetime.utcnow() - timedelta(days=400)
+    cleared, revived = chat("s1", old, "first"), chat("s2", old, "second")
+    await mongo_db.chats.insert_many([cleared, revived])
+    query = archive_service.policy("chats")
+    documents = await mongo_db.chats.find(query).to_list(length=None)
+
+    # The user writes to one session between the read and the delete
+    await mongo_db.chats.update_one(
+        {"_id": revived["_id"]}, {"$set": {"is_active": True, "updated_at": datetime.utcnow()}}
+    )
+    written = await archive_service._write_batch(
+        mongo_db, "chats", query, documents, [encode(document) for document in documents]
+    )
+
+    assert written["archived"] == 1
+    assert await mongo_db.chats.count_documents({}) == 1
+    batch = await mongo_db.archive_batches.find_one()
+    assert batch["ids"] == [cleared["_id"]]
+    assert batch["count"] == 1
+
+async def test_restoring_into_a_reused_session_merges_messages(mongo_db):
+    old = datetime.utcnow() - timedelta(days=400)
+    await mongo_db.chats.insert_one(chat("s1", old, "archived"))
+    await archive_service.archive_collection(mongo_db, "chats")
+    await mongo_db.chats.insert_one(chat("s1", datetime.utcnow(), "new", is_active=True))
+
+    assert await archive_service.restore_user(mongo_db, "u1", "chats") == 1
+
+    sessions = await mongo_db.chats.find({"user_id": "u1", "session_id": "s1"}).to_list(length=None)
+    assert len(sessions) == 1
+    assert [message["content"] for message in sessions[0]["messages"]] == ["archived", "new"]
+    assert sessions[0]["created_at"] < datetime.utcnow() - timedelta(days=300)
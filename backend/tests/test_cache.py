@@ -0,0 +1,95 @@
+"""Cache backends expire, evict and round-trip values the same way.
+
+The Redis tests run against the server in REDIS_TEST_URL and are skipped when
+it is unset:
+
+    REDIS_TEST_URL=redis://localhost:6379/15 python -m pytest tests/test_cache.py
+"""
+import asyncio
+import os
+import uuid
+import pytest
+from datetime import datetime
+from app.core import cache
+from app.core.cache import MemoryCache, SQLiteCache, RedisCache
+
+pytestmark = pytest.mark.anyio
+
+VALUE = {"crop": "paddy", "date": datetime(2024, 3, 1), "days": [1, 2, 3], "score": 0.5}
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache.time, "monotonic", clock)
+    monkeypatch.setattr(cache.time, "time", clock)
+    return clock
+
+@pytest.fixture
+async def sqlite_cache(tmp_path):
+    backend = SQLiteCache(str(tmp_path / "cache.db"))
+    yield backend
+    await backend.close()
+
+@pytest.fixture
+async def redis_cache():
+    url = os.environ.get("REDIS_TEST_URL")
+    if not url:
+        pytest.skip("REDIS_TEST_URL is not set")
+    backend = RedisCache(url)
+    yield backend
+    await backend.close()
+
+async def test_memory_cache_evicts_least_recently_used():
+    backend = MemoryCache(max_entries=2)
+    await backend.set_many({"a": 1, "b": 2})
+    await backend.get("a")
+
+    await backend.set("c", 3)
+
+    assert await backend.get_many(["a", "b", "c"]) == {"a": 1, "c": 3}
+
+async def test_memory_cache_expires_entries(clock):
+    backend = MemoryCache()
+    await backend.set("short", 1, ttl=10)
+    await backend.set("forever", 2)
+
+    clock.now += 10
+
+    assert await backend.get_many(["short", "forever"]) == {"forever": 2}
+
+async def test_sqlite_cache_round_trips_and_expires(sqlite_cache, clock):
+    await sqlite_cache.set("digest", VALUE, ttl=10)
+    assert await sqlite_cache.get("digest") == VALUE
+
+    clock.now += 10
+
+    assert await sqlite_cache.get("digest") is None
+
+async def test_sqlite_cache_is_shared_by_every_worker(sqlite_cache):
+    other_worker = SQLiteCache(sqlite_cache.path)
+    try:
+        await sqlite_cache.set("digest", VALUE)
+        assert await other_worker.get("digest") == VALUE
+
+        await other_worker.delete("digest")
+        assert await sqlite_cache.get("digest") is None
+    finally:
+        await other_worker.close()
+
+async def test_redis_cache_round_trips_and_expires(redis_cache):
+    key = f"test:{uuid.uuid4().hex}"
+    await redis_cache.set(key, VALUE, ttl=60)
+    await redis_cache.set(key + ":short", 1, ttl=0.05)
+    assert await redis_cache.get_many([key, key + ":short"]) == {key: VALUE, key + ":short": 1}
+
+    await redis_cache.delete(key)
+    await asyncio.sleep(0.1)
+
+    assert await redis_cache.get_many([key, key + ":short"]) == {}
@@ -0,0 +1,23 @@
+"""Which chat questions are answered from the cohort digest."""
+import pytest
+from app.services.digest_service import digest_service
+
+@pytest.mark.parametrize("message", [
+    "What should I do this week?",
+    "Any weekly tips for my farm?",
+    "What is the plan for the coming week",
+    "What should I do for my paddy this week?",
+    "ഈ ആഴ്ച എന്ത് ചെയ്യണം?",
+])
+def test_weekly_plan_questions_use_the_digest(message):
+    assert digest_service.is_weekly_question(message, "paddy")
+
+@pytest.mark.parametrize("message", [
+    "What should I do about brown spots on the leaves?",
+    "The leaves started yellowing this week, what should I do?",
+    "I found weevil holes in the trunk this week",
+    "What should I do for my banana this week?",
+    "ഈ ആഴ്ച ഇലകളിൽ പുള്ളി കാണുന്നു",
+])
+def test_specific_problems_skip_the_digest(message):
+    assert not digest_service.is_weekly_question(message, "paddy")
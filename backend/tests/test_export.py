@@ -0,0 +1,34 @@
+"""A failure mid-export is visible to the client, never a silently short file."""
+import orjson
+import pytest
+from app.routers.export import _export_response
+
+pytestmark = pytest.mark.anyio
+
+class FailingCursor:
+    """Yields some documents, then fails like a cursor losing its server"""
+
+    def __init__(self, documents):
+        self.documents = documents
+
+    async def __aiter__(self):
+        for document in self.documents:
+            yield document
+        raise ConnectionError("connection reset")
+
+async def read_body(response):
+    return [chunk async for chunk in response.body_iterator]
+
+async def test_ndjson_export_ends_with_an_error_record():
+    response = _export_response(FailingCursor([{"type": "irrigated"}]), ["type"], "ndjson", "activities")
+
+    lines = b"".join(await read_body(response)).splitlines()
+
+    assert orjson.loads(lines[0]) == {"type": "irrigated"}
+    assert orjson.loads(lines[-1])["complete"] is False
+
+async def test_csv_export_aborts():
+    response = _export_response(FailingCursor([{"type": "irrigated"}]), ["type"], "csv", "activities")
+
+    with pytest.raises(ConnectionError):
+        await read_body(response)
@@ -0,0 +1,50 @@
+"""Duplicate requests never run the operation twice or lose a finished response."""
+import asyncio
+import pytest
+from app.services.idempotency_service import idempotency_service
+
+pytestmark = pytest.mark.anyio
+
+FINGERPRINT = "f"
+
+async def test_duplicate_takes_over_when_the_first_request_is_cancelled(mongo_db):
+    started = asyncio.Event()
+    calls = []
+
+    async def first_compute():
+        calls.append("first")
+        started.set()
+        await asyncio.Event().wait()
+
+    async def duplicate_compute():
+        calls.append("duplicate")
+        return {"reply": "hello"}
+
+    first = asyncio.create_task(
+        idempotency_service.run(mongo_db, "test", "u1", "key", FINGERPRINT, first_compute)
+    )
+    await started.wait()
+    duplicate = asyncio.create_task(
+        idempotency_service.run(mongo_db, "test", "u1", "key", FINGERPRINT, duplicate_compute)
+    )
+    await asyncio.sleep(0)
+
+    first.cancel()
+
+    assert await duplicate == ({"reply": "hello"}, False)
+    assert calls == ["first", "duplicate"]
+    with pytest.raises(asyncio.CancelledError):
+        await first
+    record = await mongo_db.idempotency_keys.find_one({"_id": "test:u1:key"})
+    assert record["response"] == {"reply": "hello"}
+
+async def test_response_is_returned_when_it_cannot_be_stored(mongo_db):
+    # A set can't be encoded as BSON, so storing this response fails
+    response = {"reply": "hello", "tags": {"unstorable"}}
+
+    async def compute():
+        return response
+
+    assert await idempotency_service.run(mongo_db, "test", "u1", "key", FINGERPRINT, compute) == (response, False)
+    # The claim is released instead of blocking retries until it goes stale
+    assert await mongo_db.idempotency_keys.count_documents({"_id": "test:u1:key", "status": "pending"}) == 0
@@ -0,0 +1,41 @@
+"""Blocking calls on the event loop are caught in tests."""
+import asyncio
+import time
+import httpx
+import pytest
+from fastapi import FastAPI
+from app.core.loop_monitor import LoopBlockedError
+
+pytestmark = pytest.mark.anyio
+
+app = FastAPI()
+
+@app.get("/blocking")
+async def blocking():
+    time.sleep(0.2)
+    return {"ok": True}
+
+@app.get("/awaiting")
+async def awaiting():
+    await asyncio.sleep(0.2)
+    return {"ok": True}
+
+async def get(path: str) -> httpx.Response:
+    async def request():
+        async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+            return await client.get(path)
+    # A server runs each request in its own task; the slow step is reported when it ends
+    return await asyncio.create_task(request())
+
+async def test_blocking_handler_is_caught(loop_budget):
+    response = await get("/blocking")
+
+    assert response.status_code == 200
+    with pytest.raises(LoopBlockedError, match="blocked the event loop"):
+        loop_budget.assert_within_budget()
+
+async def test_awaiting_handler_is_within_budget(loop_budget):
+    response = await get("/awaiting")
+
+    assert response.status_code == 200
+    loop_budget.assert_within_budget()
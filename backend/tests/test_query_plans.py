@@ -0,0 +1,27 @@
+"""Every registered query shape is served by an index."""
+import pytest
+from app.indexes import (
+    QUERY_SHAPES, PIPELINE_SHAPES, IndexBuildError, ensure_indexes, plan_problems, pipeline_problems
+)
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+async def indexed_db(mongo_db):
+    await ensure_indexes(mongo_db)
+    return mongo_db
+
+@pytest.mark.parametrize("shape", QUERY_SHAPES, ids=[shape[0] for shape in QUERY_SHAPES])
+async def test_query_shape_uses_an_index(indexed_db, shape):
+    assert await plan_problems(indexed_db, *shape) == []
+
+@pytest.mark.parametrize("shape", PIPELINE_SHAPES, ids=[shape[0] for shape in PIPELINE_SHAPES])
+async def test_pipeline_shape_uses_an_index(indexed_db, shape):
+    assert await pipeline_problems(indexed_db, *shape) == []
+
+async def test_failed_unique_index_fails_the_build(mongo_db):
+    cohort = {"crop": "paddy", "soil_type": "laterite", "district": "thrissur", "date": "2024-01-01"}
+    await mongo_db.advisory_digests.insert_many([dict(cohort), dict(cohort)])
+
+    with pytest.raises(IndexBuildError, match="advisory_digests"):
+        await ensure_indexes(mongo_db)
@@ -0,0 +1,13 @@
+"""Rate limits can't be reset by the caller."""
+from starlette.requests import Request
+from app.core.rate_limit import get_rate_limit_key
+
+def request(user_id):
+    return Request({
+        "type": "http",
+        "headers": [(b"x-user-id", user_id.encode())],
+        "client": ("203.0.113.7", 50000),
+    })
+
+def test_rotating_the_user_header_keeps_the_key():
+    assert get_rate_limit_key(request("a")) == get_rate_limit_key(request("b")) == "ip:203.0.113.7"
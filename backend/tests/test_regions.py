@@ -0,0 +1,36 @@
+"""Regions MongoDB would reject are refused before any query runs."""
+import pytest
+from app.core.config import settings
+from app.services.geo_service import geo_service
+
+SQUARE = [[76.0, 10.0], [76.5, 10.0], [76.5, 10.5], [76.0, 10.5]]
+
+def test_open_polygon_is_closed():
+    ring = geo_service.region_filter(polygon=SQUARE)["coordinates"]["$geoWithin"]["$geometry"]["coordinates"][0]
+    assert ring == SQUARE + [SQUARE[0]]
+
+@pytest.mark.parametrize("polygon", [
+    [[76.0, 10.0], [76.5, 10.0], [76.0, 10.0]],
+    [[76.0, 10.0], [76.0, 10.0], [76.0, 10.0], [76.0, 10.0]],
+    [[76.0, 10.0], [76.5], [76.5, 10.5]],
+    [[76.0, 10.0], [196.5, 10.0], [76.5, 10.5]],
+    [[76.0, 10.0], [76.5, 91.0], [76.5, 10.5]],
+], ids=["two points", "degenerate", "not a pair", "longitude", "latitude"])
+def test_invalid_polygon_is_refused(polygon):
+    with pytest.raises(ValueError):
+        geo_service.region_filter(polygon=polygon)
+
+@pytest.mark.anyio
+async def test_regional_alert_with_invalid_polygon_is_a_bad_request(api, monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_API_KEY", "admin")
+
+    response = await api.post("/api/alerts/regional", headers={"X-Admin-Key": "admin"}, json={
+        "type": "weather",
+        "priority": "high",
+        "title": "Heavy rain",
+        "message": "Clear drainage channels",
+        "region": {"polygon": [[76.0, 10.0], [196.5, 10.0], [76.5, 10.5]]}
+    })
+
+    assert response.status_code == 400
+    assert "Longitude" in response.json()["detail"]
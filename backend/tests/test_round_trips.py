@@ -0,0 +1,103 @@
+"""Each endpoint makes the expected number of Mongo round trips."""
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+FARM = {
+    "name": "Test farm",
+    "location": "Thrissur",
+    "land_size": 50,
+    "land_unit": "cents",
+    "current_crop": "coconut",
+    "soil_type": "laterite",
+    "irrigation": True
+}
+
+async def create_farm(api, headers):
+    response = await api.post("/api/farm/profile", json=FARM, headers=headers)
+    assert response.status_code == 200
+    return response.json()["data"]
+
+async def test_create_farm_profile_is_one_command(api, command_counter, user_headers):
+    command_counter.reset()
+    farm = await create_farm(api, user_headers)
+
+    assert command_counter.commands == [("findAndModify", "farms")]
+    assert farm["current_crop"] == "coconut"
+    assert farm["is_active"] is True
+
+async def test_update_farm_profile_is_one_command(api, command_counter, user_headers):
+    await create_farm(api, user_headers)
+    command_counter.reset()
+
+    response = await api.post("/api/farm/profile", json={**FARM, "current_crop": "banana"}, headers=user_headers)
+
+    assert response.status_code == 200
+    assert response.json()["data"]["current_crop"] == "banana"
+    assert command_counter.commands == [("findAndModify", "farms")]
+
+async def test_saving_after_deactivation_creates_an_active_farm(api, mongo_db, command_counter, user_headers):
+    await create_farm(api, user_headers)
+    await mongo_db.farms.update_one({"user_id": user_headers["X-User-Id"]}, {"$set": {"is_active": False}})
+    command_counter.reset()
+
+    farm = await create_farm(api, user_headers)
+
+    assert farm["is_active"] is True
+    assert command_counter.commands == [("findAndModify", "farms")]
+    response = await api.get("/api/farm/profile", headers=user_headers)
+    assert response.status_code == 200
+    assert await mongo_db.farms.count_documents({"user_id": user_headers["X-User-Id"]}) == 2
+
+async def test_get_farm_profile_is_one_query(api, command_counter, user_headers):
+    await create_farm(api, user_headers)
+    command_counter.reset()
+
+    response = await api.get("/api/farm/profile", headers=user_headers)
+
+    assert response.status_code == 200
+    assert command_counter.commands == [("find", "farms")]
+
+async def test_add_activity_does_not_read_back(api, command_counter, user_headers):
+    await create_farm(api, user_headers)
+    command_counter.reset()
+
+    response = await api.post(
+        "/api/farm/activities",
+        json={"type": "irrigated", "crop": "coconut", "location": "Thrissur", "notes": "Basin irrigation"},
+        headers=user_headers
+    )
+
+    assert response.status_code == 200
+    assert "_id" in response.json()["data"]
+    # Farm lookup, the insert, and the analytics rollup; no read-back of the activity
+    assert command_counter.commands == [
+        ("find", "farms"), ("insert", "activities"), ("update", "activity_rollups")
+    ]
+
+async def test_generate_alerts_does_not_read_back(api, command_counter, user_headers):
+    await create_farm(api, user_headers)
+    command_counter.reset()
+
+    response = await api.post("/api/alerts/generate", headers=user_headers)
+
+    assert response.status_code == 200
+    alerts = response.json()["data"]
+    assert len(alerts) == 2
+    assert all("_id" in alert and alert["is_active"] for alert in alerts)
+    assert command_counter.commands == [("find", "farms"), ("insert", "alerts"), ("update", "alert_versions")]
+
+async def test_chat_message_is_one_write(api, command_counter, user_headers):
+    await create_farm(api, user_headers)
+    command_counter.reset()
+
+    # Answered from the advisory index, so no LLM or translation calls are made
+    response = await api.post(
+        "/api/chat/message",
+        json={"message": "How do I treat red palm weevil holes in the trunk?", "language": "en"},
+        headers=user_headers
+    )
+
+    assert response.status_code == 200
+    # Farm context (cached after this) and one upsert that creates the session and appends both messages
+    assert command_counter.commands == [("find", "farms"), ("update", "chats")]
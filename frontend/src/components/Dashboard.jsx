@@ -21,18 +21,16 @@ const Dashboard = () => {
     try {
       setIsLoading(true)
       
-      // Load recent activities
-      const activitiesData = await farmService.getActivities()
-      const activities = activitiesData?.data || activitiesData || []
+      // Activities, alerts and weather arrive in a single request
+      const dashboard = await farmService.getDashboard() || {}
+      const activities = dashboard.activities || []
       setRecentActivities(Array.isArray(activities) ? activities.slice(0, 3) : [])
       
-      // Load alerts
-      const alertsData = await farmService.getAlerts()
-      const alerts = alertsData?.data || alertsData || []
+      const alerts = dashboard.alerts?.items || []
       setAlerts(Array.isArray(alerts) ? alerts.slice(0, 3) : [])
       
-      // Mock weather data
-      setWeather({
+      // Fall back to sample weather when the section is missing or timed out
+      setWeather(dashboard.weather?.current || {
         temperature: 28,
         condition: 'partly_cloudy',
         humidity: 75,
@@ -113,6 +113,17 @@ export const farmService = {
   },
 
   // Alerts operations
+  // Dashboard: profile, weather, alerts and activities in one round trip
+  async getDashboard() {
+    try {
+      const response = await api.get('/dashboard', { params: { sections: 'weather,alerts,activities' } })
+      return response.success ? response.data : response
+    } catch (error) {
+      const [activities, alerts] = await Promise.all([this.getActivities(), this.getAlerts()])
+      return { activities, alerts: { items: alerts } }
+    }
+  },
+
   async getAlerts() {
     try {
       const response = await api.get('/alerts')